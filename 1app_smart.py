@@ -1,218 +1,245 @@
-import streamlit as st
-import google.generativeai as genai
-from pypdf import PdfReader
-import requests
-from io import BytesIO
-import pandas as pd
-import altair as alt
-import json
-
-# --- 1. ΡΥΘΜΙΣΕΙΣ ---
-st.set_page_config(page_title="Legislative Auditor AI", page_icon=":balance_scale:", layout="wide")
-
-WEIGHTS = {
-    "1": 15, "2": 5, "3": 10, "4": 10, "5": 5,
-    "6": 15, "7": 10, "8": 10, "9": 10, "10": 10
-}
-
-st.markdown("""
-<style>
-    .score-card { background-color: #e8f5e9; padding: 20px; border-radius: 10px; text-align: center; border: 2px solid #2e7d32; }
-    .big-score { font-size: 48px; font-weight: bold; color: #2e7d32; }
-    .stButton>button { width: 100%; background-color: #1565C0; color: white; border-radius: 5px; }
-</style>
-""", unsafe_allow_html=True)
-
-st.title("⚖️ Legislative Auditor AI")
-st.caption("Έκδοση συμβατή με Gemini 2.0 Flash")
-
-# --- 2. SIDEBAR ---
-with st.sidebar:
-    st.header("Ρυθμίσεις")
-    if "GEMINI_API_KEY" in st.secrets:
-        api_key = st.secrets["GEMINI_API_KEY"]
-        st.success("API Key loaded!")
-    else:
-        api_key = st.text_input("Google Gemini API Key", type="password")
-    
-    if api_key: 
-        genai.configure(api_key=api_key)
-
-# --- 3. FUNCTIONS ---
-
-def get_law_data(lawnum):
-    """Κλήση στο API της Βουλής"""
-    base_url = "https://www.hellenicparliament.gr/api.ashx"
-    params = { "q": "laws", "lawnum": lawnum, "format": "json" }
-    try:
-        response = requests.get(base_url, params=params, timeout=15)
-        response.raise_for_status()
-        result = response.json()
-        if result.get('TotalRecords', 0) > 0:
-            return result['Data'][0]
-        else:
-            return None
-    except Exception as e:
-        st.error(f"Σφάλμα API: {e}")
-        return None
-
-def download_pdf_text(url):
-    """Κατέβασμα PDF"""
-    if not url: return ""
-    try:
-        if not url.startswith("http"): url = "https://www.hellenicparliament.gr" + url
-        res = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=30)
-        with BytesIO(res.content) as f:
-            reader = PdfReader(f)
-            text = ""
-            for i, page in enumerate(reader.pages):
-                if i > 50: break  # περιορισμός σε 50 σελίδες για μεγάλους νόμους
-                text += page.extract_text() or ""
-        return text
-    except Exception as e:
-        print(f"PDF Error: {e}")
-        return ""
-
-def run_ai_audit(law_text, reports_text, metadata_str):
-    """
-    Χρήση του Gemini 2.0 Flash που υπάρχει στη λίστα.
-    """
-    try:
-        model = genai.GenerativeModel('models/gemini-2.0-flash')
-        prompt = f"""
-Ενεργείς ως Ελεγκτής Νομοθεσίας.
-
-ΣΤΟΙΧΕΙΑ: {metadata_str}
-
-ΚΕΙΜΕΝΑ ΝΟΜΟΥ: {law_text[:35000]}
-ΕΚΘΕΣΕΙΣ: {reports_text[:30000]}
-
-ΚΡΙΤΗΡΙΑ (1=ΝΑΙ, 0.5=Μερικώς, 0=ΟΧΙ):
-1. Διαβούλευση
-2. Χρόνος Ακρόασης
-3. Νομοθετική Διαδικασία
-4. Gold-plating
-5. Νησιωτικότητα
-6. Ανάλυση Κόστους
-7. Απλούστευση
-8. Εξουσιοδοτήσεις
-9. Μηχανισμοί Εφαρμογής
-10. Σαφήνεια Γλώσσας
-
-OUTPUT JSON ONLY:
-{{
-    "criteria": [
-        {{"id": "1", "title": "Διαβούλευση", "score_text": "...", "score_val": 1.0, "reason": "..."}},
-        {{"id": "2", "title": "Χρόνος Ακρόασης", "score_text": "...", "score_val": 1.0, "reason": "..."}},
-        {{"id": "3", "title": "Νομοθετική Διαδικασία", "score_text": "...", "score_val": 1.0, "reason": "..."}},
-        {{"id": "4", "title": "Gold-plating", "score_text": "...", "score_val": 1.0, "reason": "..."}},
-        {{"id": "5", "title": "Νησιωτικότητα", "score_text": "...", "score_val": 1.0, "reason": "..."}},
-        {{"id": "6", "title": "Ανάλυση Κόστους", "score_text": "...", "score_val": 1.0, "reason": "..."}},
-        {{"id": "7", "title": "Απλούστευση", "score_text": "...", "score_val": 1.0, "reason": "..."}},
-        {{"id": "8", "title": "Εξουσιοδοτήσεις", "score_text": "...", "score_val": 1.0, "reason": "..."}},
-        {{"id": "9", "title": "Μηχανισμοί Εφαρμογής", "score_text": "...", "score_val": 1.0, "reason": "..."}},
-        {{"id": "10", "title": "Σαφήνεια Γλώσσας", "score_text": "...", "score_val": 1.0, "reason": "..."}}
-    ],
-    "summary": "..."
-}}
-"""
-        response = model.generate_content(prompt)
-        txt = response.text.strip()
-        if txt.startswith("```json"): txt = txt[7:]
-        if txt.startswith("```"): txt = txt[3:]
-        if txt.endswith("```"): txt = txt[:-3]
-        return json.loads(txt.strip())
-    except Exception as e:
-        # fallback
-        try:
-             model = genai.GenerativeModel('models/gemini-2.0-flash-exp')
-             response = model.generate_content(prompt)
-             txt = response.text.strip().replace("```json","").replace("```","")
-             return json.loads(txt.strip())
-        except Exception as e2:
-             return {"error": f"Primary error: {str(e)} | Backup error: {str(e2)}"}
-
-# --- 4. UI ---
-
-st.subheader("🔍 Αναζήτηση Νόμου")
-col1, col2 = st.columns([3, 1])
-
-with col1:
-    law_input = st.text_input("Αριθμός ή Τίτλος Νόμου", placeholder="π.χ. 4940 ή Τίτλος νόμου")
-
-with col2:
-    st.write("") 
-    st.write("")
-    start_btn = st.button("🚀 Εκκίνηση", type="primary")
-
-if start_btn and law_input:
-    if not api_key: st.error("⚠️ Λείπει το API Key!"); st.stop()
-    
-    clean_num = law_input.split("/")[0].strip()
-    status = st.status("📡 Σύνδεση με Βουλή...", expanded=True)
-    
-    # 1. API
-    law_data = get_law_data(clean_num)
-    if not law_data:
-        status.update(label="❌ Δεν βρέθηκε ο νόμος.", state="error"); st.stop()
-        
-    title = law_data.get('Title', '')
-    st.success(f"**Βρέθηκε:** {title}")
-    
-    # 2. PDF Files
-    status.write("📥 Λήψη και ανάγνωση όλων των PDF...")
-    files_list = law_data.get('LawPhotocopy', [])
-    full_law_text = ""
-    full_reports_text = ""
-    count_files = 0
-    
-    for f in files_list:
-        f_url = f.get('File')
-        f_type = f.get('FileType', '')
-        if f_url:
-            content = download_pdf_text(f_url)
-            if content:
-                count_files += 1
-                # Όλα τα αρχεία μπαίνουν σε reports αν δεν είναι ο κύριος νόμος
-                if "Νόμου" in f_type or "Ψηφισθέν" in f_type: 
-                    full_law_text += content + "\n"
-                else:
-                    full_reports_text += f"\n--- {f_type} ---\n" + content
-
-    if count_files == 0:
-        status.update(label="⚠️ Δεν βρέθηκαν PDF.", state="error"); st.stop()
-        
-    status.write(f"✅ Διαβάστηκαν {count_files} αρχεία.")
-    
-    # 3. AI Analysis
-    status.write("🤖 AI Grading (Gemini 2.0 Flash)...")
-    meta = json.dumps(law_data, ensure_ascii=False)
-    res = run_ai_audit(full_law_text, full_reports_text, meta)
-    
-    if "error" in res:
-        status.update(label="❌ Σφάλμα AI", state="error")
-        st.error(res['error'])
-        st.stop()
-        
-    status.update(label="✅ Ολοκληρώθηκε!", state="complete", expanded=False)
-    
-    # 4. RESULTS
-    score = 0
-    for c in res.get('criteria', []):
-        score += c.get('score_val', 0) * WEIGHTS.get(str(c.get('id')), 0)
-        
-    st.divider()
-    c1, c2 = st.columns([1, 2])
-    with c1:
-        st.markdown(f"""<div class="score-card"><h3>Βαθμολογία</h3><div class="big-score">{int(score)}/100</div></div>""", unsafe_allow_html=True)
-    with c2:
-        st.info(res.get('summary', ''))
-        
-    # Chart
-    data = [{"Κριτήριο": c['title'], "Πόντοι": c['score_val']*WEIGHTS.get(str(c['id']),0)} for c in res.get('criteria', [])]
-    st.altair_chart(alt.Chart(pd.DataFrame(data)).mark_bar().encode(
-        x='Πόντοι', y=alt.Y('Κριτήριο', sort=None), color=alt.value("#2e7d32")), use_container_width=True)
-    
-    for c in res.get('criteria', []):
-        with st.expander(f"{'✅' if c['score_val']==1 else '❌'} {c['title']}"):
-            st.write(c['reason'])
+import streamlit as st
+import google.generativeai as genai
+import pandas as pd
+import altair as alt
+
+from nomoskor.analytics import record_audit
+from nomoskor.audit import run_map_reduce, stream_audit, AUDIT_PROMPT, PROMPTS as PARALLEL_PROMPTS, DEFAULT_MODEL
+from nomoskor.cache import get_cache
+from nomoskor.criteria import WEIGHTS, total_score
+from nomoskor.documents import Document
+from nomoskor.lawindex import get_index
+from nomoskor.packer import pack, gemini_counter
+from nomoskor.parliament import law_metadata, ministry_of, record_year
+from nomoskor.pipeline import iter_bundle
+from nomoskor.results import audit_key, get_store, manifest
+from nomoskor.rules import prescore, hints, summary_text
+from nomoskor.trace import Trace, span, record_documents
+
+# --- 1. ΡΥΘΜΙΣΕΙΣ ---
+st.set_page_config(page_title="Legislative Auditor AI", page_icon=":balance_scale:", layout="wide")
+
+st.markdown("""
+<style>
+    .score-card { background-color: #e8f5e9; padding: 20px; border-radius: 10px; text-align: center; border: 2px solid #2e7d32; }
+    .big-score { font-size: 48px; font-weight: bold; color: #2e7d32; }
+    .stButton>button { width: 100%; background-color: #1565C0; color: white; border-radius: 5px; }
+</style>
+""", unsafe_allow_html=True)
+
+st.title("⚖️ Legislative Auditor AI")
+st.caption("Έκδοση συμβατή με Gemini 2.0 Flash")
+
+# --- 2. SIDEBAR ---
+with st.sidebar:
+    st.header("Ρυθμίσεις")
+    if "GEMINI_API_KEY" in st.secrets:
+        api_key = st.secrets["GEMINI_API_KEY"]
+        st.success("API Key loaded!")
+    else:
+        api_key = st.text_input("Google Gemini API Key", type="password")
+    
+    if api_key: 
+        genai.configure(api_key=api_key)
+    
+    token_budget = st.slider("Tokens κειμένων στο prompt", 5000, 200000, 22000, step=1000)
+    map_reduce = st.toggle("⚡ Παράλληλος έλεγχος ανά κριτήριο", help="Για πολύ μεγάλους (π.χ. πολυνομοσχέδια) νόμους")
+    rules_only = st.toggle("📏 Μόνο κανόνες (χωρίς AI)", help="Άμεση προσωρινή βαθμολογία από μηχανικούς ελέγχους")
+    
+    st.subheader("💾 Αποθηκευμένοι έλεγχοι")
+    force_audit = st.checkbox("🔁 Νέος έλεγχος (αγνόησε την cache)")
+    ttl_days = st.number_input("Ισχύς αποτελέσματος (ημέρες)", min_value=1, max_value=365, value=30)
+    if st.button("🗑️ Διαγραφή όλων των αποθηκευμένων"):
+        st.caption(f"Διαγράφηκαν {get_store().invalidate()} έλεγχοι.")
+    
+    cs = get_cache().summary()
+    st.caption(f"📦 PDF cache: {cs['size_bytes'] // (1024*1024)} MB · "
+               f"hits {cs['bytes_hit'] + cs['text_hit']} / misses {cs['bytes_miss'] + cs['text_miss']}")
+
+# --- 3. FUNCTIONS ---
+
+def get_law_data(lawnum):
+    """Κλήση στο API της Βουλής"""
+    try:
+        return get_index().find(lawnum)
+    except Exception as e:
+        st.error(f"Σφάλμα API: {e}")
+        return None
+
+# περιορισμός σε 51 σελίδες για μεγάλους νόμους
+MAX_PAGES = 51
+# η ανάγνωση κάθε εγγράφου σταματά εδώ· τα κείμενα περνούν μετά από τον packer
+DOC_CHAR_BUDGET = 200000
+# μερίδιο του προϋπολογισμού tokens για το κείμενο του νόμου (το υπόλοιπο στις εκθέσεις)
+LAW_SHARE = 0.55
+
+def show_criteria(criteria, pillars=()):
+    """Γράφημα, πυλώνες και ένα expander ανά κριτήριο."""
+    data = [{"Κριτήριο": c['title'], "Πόντοι": (c['score_val'] or 0)*WEIGHTS.get(str(c['id']),0)} for c in criteria]
+    st.altair_chart(alt.Chart(pd.DataFrame(data)).mark_bar().encode(
+        x='Πόντοι', y=alt.Y('Κριτήριο', sort=None), color=alt.value("#2e7d32")), use_container_width=True)
+    
+    for p in pillars:
+        st.markdown(f"**Πυλώνας {p['id']}: {p['title']}**")
+        st.write(p['findings'])
+    
+    for c in criteria:
+        with st.expander(f"{'✅' if c['score_val']==1 else '❌'} {c['title']}"):
+            st.write(c['reason'])
+
+def run_ai_audit(law_text, reports_text, metadata_str, card):
+    """
+    Το φθηνότερο μοντέλο του DEFAULT_MODEL που χωρά το prompt (βλ. nomoskor.models).
+    Κάθε κριτήριο εμφανίζεται μόλις το γράψει το μοντέλο (streaming).
+    """
+    live = st.empty()
+    seen = []
+    res = None
+    for kind, value in stream_audit(law_text, reports_text, metadata_str, model_name=DEFAULT_MODEL,
+                                     hints=summary_text(card)):
+        if kind == "criterion":
+            seen.append(value)
+            with live.container():
+                show_criteria(seen)
+        else:
+            res = value
+    live.empty()
+    return res
+
+# --- 4. UI ---
+
+st.subheader("🔍 Αναζήτηση Νόμου")
+col1, col2 = st.columns([3, 1])
+
+with col1:
+    law_input = st.text_input("Αριθμός ή Τίτλος Νόμου", placeholder="π.χ. 4940 ή Τίτλος νόμου")
+
+with col2:
+    st.write("") 
+    st.write("")
+    start_btn = st.button("🚀 Εκκίνηση", type="primary")
+
+if start_btn and law_input:
+    if not api_key and not rules_only: st.error("⚠️ Λείπει το API Key!"); st.stop()
+    
+    clean_num = law_input.split("/")[0].strip()
+    status = st.status("📡 Σύνδεση με Βουλή...", expanded=True)
+    trace = Trace("1app", query=clean_num).start()
+    
+    # 1. API
+    with span("parliament_api"):
+        law_data = get_law_data(clean_num)
+    if not law_data:
+        status.update(label="❌ Δεν βρέθηκε ο νόμος.", state="error"); st.stop()
+        
+    title = law_data.get('Title', '')
+    st.success(f"**Βρέθηκε:** {title}")
+    
+    # 2. PDF Files
+    status.write("📥 Λήψη και ανάγνωση όλων των PDF...")
+    files_list = law_data.get('LawPhotocopy', [])
+    law_docs = []
+    report_docs = []
+    count_files = 0
+    
+    # Παράλληλη λήψη/ανάγνωση, με συναρμολόγηση στην αρχική σειρά των αρχείων
+    bundle = [{"url": f.get('File')} for f in files_list]
+    results = [None] * len(bundle)
+    with span("documents"):
+        for i, r in iter_bundle(bundle, max_pages=MAX_PAGES, cache=get_cache(),
+                                char_budget=DOC_CHAR_BUDGET):
+            if r['error']: print(f"PDF Error: {r['error']}")
+            results[i] = r
+    record_documents(results, [{"type": f.get('FileType')} for f in files_list])
+    doc_hashes = [r['sha'] for r in results]
+    pages = sum(r['pages_parsed'] for r in results)
+    nbytes = sum(r['bytes_read'] for r in results)
+    
+    for f, r in zip(files_list, results):
+        f_type = f.get('FileType', '')
+        if r['text']:
+            count_files += 1
+            # Όλα τα αρχεία μπαίνουν σε reports αν δεν είναι ο κύριος νόμος
+            if "Νόμου" in f_type or "Ψηφισθέν" in f_type: 
+                law_docs.append(Document.from_result(f, r))
+            else:
+                report_docs.append(Document.from_result(f, r))
+
+    if count_files == 0:
+        status.update(label="⚠️ Δεν βρέθηκαν PDF.", state="error"); st.stop()
+        
+    status.write(f"✅ Διαβάστηκαν {count_files} αρχεία ({pages} σελίδες, {nbytes / (1024*1024):.1f} MB).")
+    
+    # Μηχανικοί έλεγχοι: προσωρινή βαθμολογία που το μοντέλο καλείται να επιβεβαιώσει
+    with span("rules"):
+        card = prescore(law_docs + report_docs)
+    status.write(f"📏 Έλεγχος με κανόνες σε {card['elapsed_ms']} ms")
+    
+    # 3. AI Analysis
+    if rules_only:
+        res = {"criteria": card['criteria'], "summary": "Προσωρινή βαθμολογία από κανόνες, χωρίς AI."}
+    else:
+        # Το κλειδί εξαρτάται μόνο από τα έγγραφα, το prompt και το μοντέλο: πρώτα η αποθήκη,
+        # ώστε ένα αποθηκευμένο αποτέλεσμα να μη χρειάζεται ούτε count_tokens ούτε packing
+        prompt_id = (PARALLEL_PROMPTS if map_reduce else AUDIT_PROMPT) + f"|{token_budget}"
+        key = audit_key(clean_num, doc_hashes, prompt_id, DEFAULT_MODEL)
+        res = None if force_audit else get_store().get(key, ttl=ttl_days * 24 * 3600)
+        from_store = res is not None
+        if from_store:
+            status.write("💾 Αποτέλεσμα από προηγούμενο έλεγχο με τα ίδια έγγραφα.")
+        else:
+            # Οι πιο σχετικές ενότητες για τα κριτήρια, αντί για τους πρώτους Ν χαρακτήρες
+            counter = gemini_counter('models/gemini-2.0-flash')
+            with span("pack"):
+                full_law_text, _ = pack(law_docs, int(token_budget * LAW_SHARE), counter=counter)
+                full_reports_text, _ = pack(report_docs, int(token_budget * (1 - LAW_SHARE)), counter=counter)
+
+            status.write(f"🤖 AI Grading ({DEFAULT_MODEL})...")
+            meta = law_metadata(law_data)
+            with span("llm", map_reduce=map_reduce):
+                if map_reduce:
+                    res = run_map_reduce(law_docs + report_docs, title, extra=hints(card), counter=counter,
+                                         model_name=DEFAULT_MODEL, card=card)
+                else:
+                    res = run_ai_audit(full_law_text, full_reports_text, meta, card)
+    
+        if "error" in res:
+            trace.finish()
+            status.update(label="❌ Σφάλμα AI", state="error")
+            st.error(res['error'])
+            st.stop()
+        if not from_store:
+            get_store().put(key, clean_num, res, DEFAULT_MODEL, manifest=manifest(files_list, results))
+        
+    # Για το dashboard ανάλυσης (pages/)
+    if rules_only or not from_store:
+        record_audit({"law_num": clean_num, "title": title, "year": record_year(law_data),
+                      "ministry": ministry_of(law_data), "criteria": res.get('criteria', []),
+                      "provisional": rules_only, "files": len(files_list), "pages": pages, "bytes": nbytes,
+                      "ocr_skipped": sum(1 for r in results if r['scanned']), "ocr_local": sum(r['ocr'] for r in results)},
+                     "1app", model=None if rules_only else DEFAULT_MODEL)
+        
+    status.update(label="✅ Ολοκληρώθηκε!", state="complete", expanded=False)
+    perf = trace.finish()
+    
+    # 4. RESULTS
+    score = total_score(res.get('criteria', []))
+        
+    st.divider()
+    c1, c2 = st.columns([1, 2])
+    with c1:
+        st.markdown(f"""<div class="score-card"><h3>Βαθμολογία</h3><div class="big-score">{int(score)}/100</div></div>""", unsafe_allow_html=True)
+    with c2:
+        st.info(res.get('summary', ''))
+        
+    show_criteria(res.get('criteria', []), res.get('pillars', []))
+    
+    with st.expander("⏱️ Απόδοση"):
+        tokens = perf['tokens']
+        st.caption(f"Σύνολο {perf['wall']:.1f}s · {perf['llm_calls']} κλήσεις LLM · "
+                   f"{tokens.get('prompt', 0)} tokens εισόδου / {tokens.get('output', 0)} εξόδου")
+        mem = perf.get('rss')
+        if mem:
+            st.caption(f"Μνήμη: μέγιστη {mem['peak'] / 2**20:.0f} MB "
+                       f"(+{(mem['peak'] - mem['start']) / 2**20:.0f} MB σε αυτόν τον έλεγχο)")
+        st.dataframe(pd.DataFrame(perf['spans']), hide_index=True)
@@ -0,0 +1,4 @@
+"""
+Κοινά εργαλεία του Legislative Auditor, χωρίς εξάρτηση από το Streamlit,
+ώστε να χρησιμοποιούνται τόσο από τα UI όσο και από scripts.
+"""
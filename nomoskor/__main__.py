@@ -0,0 +1,28 @@
+"""
+Γραμμή εντολών:  python -m nomoskor <εντολή> ...
+"""
+import argparse
+import logging
+import os
+import sys
+
+from nomoskor import batch, incremental
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(prog="python -m nomoskor")
+    parser.add_argument("--api-key", default=os.environ.get("GEMINI_API_KEY"), help="κλειδί Gemini")
+    sub = parser.add_subparsers(dest="command", required=True)
+    batch.add_parser(sub)
+    incremental.add_parser(sub)
+    args = parser.parse_args(argv)
+
+    if args.api_key:
+        import google.generativeai as genai
+        genai.configure(api_key=args.api_key)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,400 @@
+"""
+Στηλοθήκη (Parquet) με όλους τους ολοκληρωμένους ελέγχους, για αναλύσεις σε
+όλο το σώμα των νόμων: τάση βαθμολογίας ανά υπουργείο και έτος, κατανομή
+ανά κριτήριο, χειρότεροι νόμοι, χρόνοι σταδίων.
+
+Δύο πίνακες: `audits` (μία γραμμή ανά έλεγχο: ταυτότητα νόμου, βαθμολογία,
+στατιστικά εγγράφων, tokens και χρόνοι σταδίων) και `criteria` (μία γραμμή
+ανά κριτήριο, με τους πόντους κατά τα WEIGHTS). Κάθε έλεγχος γράφεται σε
+μικρό αρχείο στο `<πίνακας>/incoming/` και μόλις μαζευτούν COMPACT_AFTER
+συγχωνεύονται στο `<πίνακας>/data.parquet`. Τα ερωτήματα τρέχουν με DuckDB
+αν είναι εγκατεστημένο, αλλιώς με pandas· και στις δύο περιπτώσεις
+επιστρέφουν μικρούς, ήδη συγκεντρωτικούς πίνακες για τα γραφήματα.
+
+    python -m nomoskor.analytics summary
+    python -m nomoskor.analytics compact
+"""
+import argparse
+import glob
+import hashlib
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+
+from nomoskor.cache import CACHE_DIR
+from nomoskor.criteria import CRITERIA_BY_ID, WEIGHTS, total_score
+from nomoskor.trace import current
+
+ANALYTICS_DIR = os.environ.get("NOMOSKOR_ANALYTICS_DIR", os.path.join(CACHE_DIR, "analytics"))
+COMPACT_AFTER = int(os.environ.get("NOMOSKOR_ANALYTICS_COMPACT", "50"))
+# Στάδια του trace που κρατάμε ως στήλες (t_<στάδιο>, δευτερόλεπτα)
+STAGES = ("parliament_api", "opengov_search", "opengov_scrape", "documents", "rules", "pack", "ocr_wait", "llm")
+UNKNOWN = "—"
+WORST = 25
+
+log = logging.getLogger(__name__)
+
+
+def available():
+    """True αν υπάρχει το pyarrow (χωρίς αυτό δεν γράφεται ούτε διαβάζεται η αποθήκη)."""
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _schemas():
+    import pyarrow as pa
+    audits = [("audit_id", pa.string()), ("created", pa.timestamp("s")), ("source", pa.string()),
+              ("law_num", pa.string()), ("title", pa.string()), ("year", pa.int32()), ("ministry", pa.string()),
+              ("model", pa.string()), ("provisional", pa.bool_()), ("score", pa.float64()),
+              ("docs", pa.int32()), ("pages", pa.int32()), ("bytes", pa.int64()), ("scanned", pa.int32()),
+              ("ocr", pa.int32()), ("consultation", pa.bool_()), ("tokens_prompt", pa.int64()),
+              ("tokens_output", pa.int64()), ("elapsed", pa.float64())]
+    audits += [(f"t_{s}", pa.float64()) for s in STAGES]
+    criteria = [("audit_id", pa.string()), ("criterion", pa.string()), ("title", pa.string()),
+                ("score_val", pa.float64()), ("weight", pa.int32()), ("points", pa.float64())]
+    return {"audits": pa.schema(audits), "criteria": pa.schema(criteria)}
+
+
+def _float(v):
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def rows(record, source, model=None, stages=None, tokens=None):
+    """
+    Οι γραμμές των δύο πινάκων για μια εγγραφή ελέγχου (όπως του
+    nomoskor.service: law_num, title, year, ministry, criteria, provisional,
+    files, pages, bytes, ocr_local, ocr_skipped, opengov, elapsed).
+    """
+    audit_id = uuid.uuid4().hex
+    criteria = record.get("criteria") or []
+    stages = stages or {}
+    tokens = tokens or {}
+    audit = {"audit_id": audit_id, "created": int(time.time()), "source": source,
+             "law_num": None if record.get("law_num") is None else str(record["law_num"]),
+             "title": record.get("title"), "year": record.get("year"), "ministry": record.get("ministry"),
+             "model": model, "provisional": bool(record.get("provisional")),
+             "score": float(record["score"]) if record.get("score") is not None else total_score(criteria),
+             "docs": record.get("files"), "pages": record.get("pages"), "bytes": record.get("bytes"),
+             "scanned": record.get("ocr_skipped"), "ocr": record.get("ocr_local"),
+             "consultation": bool(record.get("opengov")), "tokens_prompt": tokens.get("prompt"),
+             "tokens_output": tokens.get("output"), "elapsed": record.get("elapsed")}
+    for s in STAGES:
+        audit[f"t_{s}"] = stages.get(s)
+    crit = []
+    for c in criteria:
+        cid = str(c.get("id"))
+        val = _float(c.get("score_val"))
+        weight = WEIGHTS.get(cid, 0)
+        title = c.get("title") or CRITERIA_BY_ID.get(cid, {}).get("title")
+        crit.append({"audit_id": audit_id, "criterion": cid, "title": title, "score_val": val,
+                     "weight": weight, "points": None if val is None else val * weight})
+    return audit, crit
+
+
+class AnalyticsStore:
+    TABLES = ("audits", "criteria")
+
+    def __init__(self, root=ANALYTICS_DIR, compact_after=COMPACT_AFTER):
+        self.root = root
+        self.compact_after = compact_after
+        self._lock = threading.Lock()
+        for t in self.TABLES:
+            os.makedirs(os.path.join(root, t, "incoming"), exist_ok=True)
+
+    def _data(self, table):
+        return os.path.join(self.root, table, "data.parquet")
+
+    def _incoming(self, table):
+        return sorted(glob.glob(os.path.join(self.root, table, "incoming", "*.parquet")))
+
+    def files(self, table):
+        data = self._data(table)
+        return ([data] if os.path.exists(data) else []) + self._incoming(table)
+
+    def version(self):
+        """Αλλάζει σε κάθε νέο έλεγχο ή συγχώνευση (για cache των ερωτημάτων)."""
+        h = hashlib.sha1()
+        for t in self.TABLES:
+            for path in self.files(t):
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                h.update(f"{path}:{st.st_size}:{st.st_mtime_ns}".encode())
+        return h.hexdigest()[:16]
+
+    def add(self, audit, criteria):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        schemas = _schemas()
+        name = f"{time.strftime('%Y%m%d%H%M%S')}-{audit['audit_id']}.parquet"
+        with self._lock:
+            for table, data in (("criteria", criteria), ("audits", [audit])):
+                path = os.path.join(self.root, table, "incoming", name)
+                pq.write_table(pa.Table.from_pylist(data, schema=schemas[table]), path + ".tmp")
+                os.replace(path + ".tmp", path)
+            pending = len(self._incoming("audits"))
+        if pending >= self.compact_after:
+            self.compact()
+        return audit["audit_id"]
+
+    def compact(self):
+        """Συγχωνεύει τα μικρά αρχεία κάθε πίνακα στο data.parquet. Επιστρέφει πόσα συγχωνεύτηκαν."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        merged = 0
+        with self._lock:
+            for table in self.TABLES:
+                incoming = self._incoming(table)
+                if not incoming: continue
+                parts = []
+                for path in self.files(table):
+                    try:
+                        parts.append(pq.read_table(path))
+                    except OSError:
+                        continue  # το συγχώνευσε ήδη άλλη διεργασία
+                data = pa.concat_tables(parts, promote_options="default")
+                data = _dedupe(data, ("audit_id",) if table == "audits" else ("audit_id", "criterion"))
+                tmp = f"{self._data(table)}.{os.getpid()}.tmp"
+                pq.write_table(data, tmp)
+                os.replace(tmp, self._data(table))
+                for path in incoming:
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                merged += len(incoming)
+        return merged
+
+    # --- Ερωτήματα ---
+
+    def aggregates(self, provisional=True, years=None, ministries=None, worst=WORST):
+        """
+        Συγκεντρωτικά για το dashboard, μόνο με τον πιο πρόσφατο έλεγχο κάθε
+        νόμου (προτιμώνται οι πλήρεις από τους προσωρινούς):
+        {"kpis": dict, "trend", "by_year", "criteria", "distribution", "worst", "stages": DataFrame}.
+        `years`: (από, έως)· `ministries`: λίστα.
+        """
+        if not self.files("audits"):
+            return _empty()
+        try:
+            import duckdb
+        except ImportError:
+            duckdb = None
+        errors = (OSError, duckdb.Error) if duckdb else (OSError,)
+        for attempt in range(2):
+            try:
+                if duckdb is None:
+                    return self._pandas(provisional, years, ministries, worst)
+                return self._duckdb(duckdb, provisional, years, ministries, worst)
+            except errors as e:
+                # ένα αρχείο συγχωνεύτηκε όσο διαβάζαμε
+                if attempt: raise
+                log.warning("Analytics retry: %s", e)
+
+    def _duckdb(self, duckdb, provisional, years, ministries, worst):
+        con = duckdb.connect()
+        try:
+            where, params = ["TRUE"], []
+            if not provisional: where.append("NOT provisional")
+            if years:
+                where.append("year BETWEEN ? AND ?")
+                params += [int(years[0]), int(years[1])]
+            if ministries:
+                where.append(f"coalesce(ministry, '{UNKNOWN}') IN ({', '.join('?' * len(ministries))})")
+                params += list(ministries)
+            con.execute(f"""
+                CREATE TEMP TABLE latest AS
+                SELECT * EXCLUDE (rn) FROM (
+                    SELECT *, coalesce(ministry, '{UNKNOWN}') AS ministry_label,
+                           row_number() OVER (PARTITION BY law_num ORDER BY provisional, created DESC) AS rn
+                    FROM read_parquet({self.files('audits')!r}, union_by_name = true)
+                    WHERE {' AND '.join(where)}
+                ) WHERE rn = 1""", params)
+            con.execute(f"""
+                CREATE TEMP TABLE crit AS
+                SELECT c.* FROM read_parquet({self.files('criteria')!r}, union_by_name = true) c
+                SEMI JOIN latest USING (audit_id)""")
+            out = {
+                "trend": con.execute("""
+                    SELECT year, ministry_label AS ministry, count(*) AS laws, avg(score) AS score
+                    FROM latest WHERE year IS NOT NULL GROUP BY ALL ORDER BY year, ministry""").df(),
+                "by_year": con.execute("""
+                    SELECT year, count(*) AS laws, avg(score) AS score, quantile_cont(score, 0.25) AS p25,
+                           quantile_cont(score, 0.75) AS p75
+                    FROM latest WHERE year IS NOT NULL GROUP BY year ORDER BY year""").df(),
+                "criteria": con.execute("""
+                    SELECT criterion, any_value(title) AS title, max(weight) AS weight, avg(points) AS points,
+                           avg(points) / nullif(max(weight), 0) AS share, count(score_val) AS rated
+                    FROM crit GROUP BY criterion ORDER BY try_cast(criterion AS INTEGER)""").df(),
+                "distribution": con.execute("""
+                    SELECT criterion, any_value(title) AS title, coalesce(cast(score_val AS VARCHAR), '?') AS score_val,
+                           count(*) AS laws
+                    FROM crit GROUP BY criterion, score_val ORDER BY try_cast(criterion AS INTEGER), score_val""").df(),
+                "worst": con.execute("""
+                    SELECT law_num, title, year, ministry_label AS ministry, score, provisional, created
+                    FROM latest ORDER BY score, year DESC NULLS LAST LIMIT ?""", [worst]).df(),
+                "stages": con.execute(" UNION ALL ".join(
+                    f"SELECT '{s}' AS stage, count(t_{s}) AS audits, quantile_cont(t_{s}, 0.5) AS p50, "
+                    f"quantile_cont(t_{s}, 0.95) AS p95 FROM latest" for s in STAGES)).df(),
+            }
+            laws, avg, prov, mins = con.execute("""
+                SELECT count(*), avg(score), avg(provisional::INTEGER), count(DISTINCT ministry_label)
+                FROM latest""").fetchone()
+            out["kpis"] = {"laws": laws, "score": avg, "provisional": prov, "ministries": mins}
+        finally:
+            con.close()
+        out["stages"] = out["stages"][out["stages"]["audits"] > 0].reset_index(drop=True)
+        return out
+
+    def _pandas(self, provisional, years, ministries, worst):
+        audits = _read(self.files("audits"))
+        audits["ministry"] = audits["ministry"].fillna(UNKNOWN)
+        if not provisional: audits = audits[~audits["provisional"]]
+        if years: audits = audits[audits["year"].between(int(years[0]), int(years[1]))]
+        if ministries: audits = audits[audits["ministry"].isin(list(ministries))]
+        latest = (audits.sort_values(["law_num", "provisional", "created"], ascending=[True, True, False])
+                  .drop_duplicates("law_num"))
+        if latest.empty:
+            return _empty()
+        crit = _read(self.files("criteria"))
+        crit = crit[crit["audit_id"].isin(latest["audit_id"])]
+        dated = latest.dropna(subset=["year"])
+        by_year = dated.groupby("year")["score"]
+        crit_groups = crit.groupby("criterion")
+        criteria = crit_groups.agg(title=("title", "first"), weight=("weight", "max"), points=("points", "mean"),
+                                   rated=("score_val", "count")).reset_index()
+        criteria["share"] = criteria["points"] / criteria["weight"].where(criteria["weight"] > 0)
+        dist = (crit.assign(score_val=crit["score_val"].map(lambda v: "?" if v != v else str(v)))
+                .groupby(["criterion", "score_val"]).agg(title=("title", "first"), laws=("audit_id", "size"))
+                .reset_index())
+        stages = [{"stage": s, "audits": int(latest[f"t_{s}"].count()), "p50": latest[f"t_{s}"].quantile(0.5),
+                   "p95": latest[f"t_{s}"].quantile(0.95)} for s in STAGES if f"t_{s}" in latest]
+        import pandas as pd
+        return {
+            "trend": dated.groupby(["year", "ministry"]).agg(laws=("score", "size"), score=("score", "mean"))
+                          .reset_index(),
+            "by_year": pd.DataFrame({"laws": by_year.size(), "score": by_year.mean(), "p25": by_year.quantile(0.25),
+                                     "p75": by_year.quantile(0.75)}).reset_index(),
+            "criteria": _by_criterion(criteria[["criterion", "title", "weight", "points", "share", "rated"]]),
+            "distribution": _by_criterion(dist[["criterion", "title", "score_val", "laws"]]),
+            "worst": latest.sort_values(["score", "year"], ascending=[True, False])
+                           [["law_num", "title", "year", "ministry", "score", "provisional", "created"]]
+                           .head(worst).reset_index(drop=True),
+            "stages": pd.DataFrame([s for s in stages if s["audits"]]),
+            "kpis": {"laws": len(latest), "score": float(latest["score"].mean()),
+                     "provisional": float(latest["provisional"].mean()), "ministries": latest["ministry"].nunique()},
+        }
+
+    def facets(self):
+        """Τιμές για τα φίλτρα: (ελάχιστο έτος, μέγιστο έτος), υπουργεία."""
+        if not self.files("audits"):
+            return None, []
+        audits = _read(self.files("audits"), columns=["year", "ministry"])
+        years = audits["year"].dropna()
+        span = (int(years.min()), int(years.max())) if len(years) else None
+        return span, sorted(audits["ministry"].fillna(UNKNOWN).unique().tolist())
+
+
+def _read(paths, columns=None):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    parts = []
+    for path in paths:
+        try:
+            parts.append(pq.read_table(path, columns=columns))
+        except OSError:
+            continue
+    if not parts:
+        return _schemas()["audits"].empty_table().to_pandas()
+    return pa.concat_tables(parts, promote_options="default").to_pandas()
+
+
+def _dedupe(table, keys):
+    """Κρατά την τελευταία γραμμή για κάθε κλειδί (δύο συγχωνεύσεις μαζί δεν διπλασιάζουν γραμμές)."""
+    cols = [table.column(k).to_pylist() for k in keys]
+    last = {}
+    for i, key in enumerate(zip(*cols)):
+        last[key] = i
+    if len(last) == table.num_rows: return table
+    return table.take(sorted(last.values()))
+
+
+def _by_criterion(df):
+    """Σειρά 1, 2, ..., 10 (και όχι 1, 10, 2)."""
+    keys = ["criterion_no"] + [c for c in ("score_val",) if c in df]
+    df = df.assign(criterion_no=df["criterion"].map(lambda c: int(c) if str(c).isdigit() else 99))
+    return df.sort_values(keys).drop(columns="criterion_no").reset_index(drop=True)
+
+
+def _empty():
+    import pandas as pd
+    return {"trend": pd.DataFrame(), "by_year": pd.DataFrame(), "criteria": pd.DataFrame(),
+            "distribution": pd.DataFrame(), "worst": pd.DataFrame(), "stages": pd.DataFrame(),
+            "kpis": {"laws": 0, "score": None, "provisional": None, "ministries": 0}}
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_analytics():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = AnalyticsStore()
+    return _store
+
+
+def record_audit(record, source, model=None, stages=None, tokens=None):
+    """
+    Καταγράφει έναν ολοκληρωμένο έλεγχο. Χρόνοι σταδίων και tokens, αν δεν
+    δοθούν, από το τρέχον trace. Ένα σφάλμα εδώ δεν χαλάει τον έλεγχο. Χωρίς
+    pyarrow δεν καταγράφεται τίποτα.
+    """
+    if not available():
+        log.debug("Analytics disabled: pyarrow is not installed")
+        return None
+    tr = current()
+    if tr is not None:
+        if stages is None: stages = {name: s["wall"] for name, s in tr.summary().items()}
+        if tokens is None: tokens = dict(tr.tokens)
+    try:
+        return get_analytics().add(*rows(record, source, model, stages, tokens))
+    except Exception:
+        log.exception("Analytics error")
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m nomoskor.analytics")
+    parser.add_argument("command", choices=["summary", "compact"])
+    parser.add_argument("--dir", default=ANALYTICS_DIR)
+    args = parser.parse_args(argv)
+
+    store = AnalyticsStore(args.dir)
+    if args.command == "compact":
+        print(f"Συγχωνεύτηκαν {store.compact()} αρχεία.")
+        return 0
+    agg = store.aggregates()
+    k = agg["kpis"]
+    if not k["laws"]:
+        print("Δεν υπάρχουν έλεγχοι.")
+        return 0
+    print(f"{k['laws']} νόμοι · μέση βαθμολογία {k['score']:.1f} · {k['provisional']:.0%} προσωρινές")
+    print(agg["by_year"].to_string(index=False))
+    print(agg["worst"].head(10).to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
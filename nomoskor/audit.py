@@ -0,0 +1,373 @@
+"""
+Έλεγχος νόμου με το Gemini: με ένα αίτημα (`run_audit`) ή παράλληλα ανά
+κριτήριο (map-reduce) για πολύ μεγάλους νόμους.
+
+Στον παράλληλο έλεγχο κάθε κριτήριο (και οι πυλώνες Β/Γ) στέλνεται ως ξεχωριστό, μικρό αίτημα με
+το δικό του κομμάτι του context. Τα αιτήματα τρέχουν ταυτόχρονα με asyncio,
+με όριο ταυτόχρονων κλήσεων και επαναλήψεις, και στο τέλος ενώνονται στο ίδιο
+JSON {"criteria": [...], "summary": ...} που περιμένει η βαθμολόγηση.
+
+Ο έλεγχος με ένα αίτημα γίνεται με streaming (`stream_audit`), ώστε κάθε
+κριτήριο να εμφανίζεται μόλις γραφτεί. Χαλασμένο JSON διορθώνεται τοπικά
+(nomoskor.streaming) αντί να ξαναζητηθεί όλη η απάντηση.
+
+Το `model_name` είναι όνομα μοντέλου ή "cascade" (βλ. nomoskor.models): στον
+καταρράκτη κάθε αίτημα πάει πρώτα στο φθηνότερο μοντέλο που χωρά το context
+του και ανεβαίνει βαθμίδα μόνο για τα κριτήρια με χαμηλή βεβαιότητα.
+"""
+import asyncio
+import random
+
+from nomoskor import models
+from nomoskor.criteria import CRITERIA, PILLARS
+from nomoskor.packer import estimate_tokens, pack
+from nomoskor.streaming import CriteriaParser, loads
+from nomoskor.trace import record_usage, span
+
+MODEL_NAME = "models/gemini-2.0-flash"
+DEFAULT_MODEL = models.DEFAULT_MODEL
+# Tokens context για κάθε κριτήριο
+CRITERION_TOKEN_BUDGET = 12000
+CONCURRENCY = 4
+RETRIES = 2
+
+# Ο έλεγχος με ένα μόνο αίτημα (1app_smart, batch)
+AUDIT_PROMPT = """
+Ενεργείς ως Ελεγκτής Νομοθεσίας.
+
+ΣΤΟΙΧΕΙΑ: {metadata}
+
+ΚΕΙΜΕΝΑ ΝΟΜΟΥ: {law_text}
+ΕΚΘΕΣΕΙΣ: {reports_text}
+
+ΠΡΟΚΑΤΑΡΚΤΙΚΟΣ ΕΛΕΓΧΟΣ ΜΕ ΚΑΝΟΝΕΣ (επιβεβαίωσε ή διόρθωσε με βάση τα κείμενα):
+{hints}
+
+ΚΡΙΤΗΡΙΑ (1=ΝΑΙ, 0.5=Μερικώς, 0=ΟΧΙ· confidence: πόσο βέβαιος είσαι από τα κείμενα, 0-1):
+1. Διαβούλευση
+2. Χρόνος Ακρόασης
+3. Νομοθετική Διαδικασία
+4. Gold-plating
+5. Νησιωτικότητα
+6. Ανάλυση Κόστους
+7. Απλούστευση
+8. Εξουσιοδοτήσεις
+9. Μηχανισμοί Εφαρμογής
+10. Σαφήνεια Γλώσσας
+
+OUTPUT JSON ONLY:
+{{
+    "criteria": [
+        {{"id": "1", "title": "Διαβούλευση", "score_text": "...", "score_val": 1.0, "confidence": 0.9, "reason": "..."}},
+        {{"id": "2", "title": "Χρόνος Ακρόασης", "score_text": "...", "score_val": 1.0, "confidence": 0.9, "reason": "..."}},
+        {{"id": "3", "title": "Νομοθετική Διαδικασία", "score_text": "...", "score_val": 1.0, "confidence": 0.9, "reason": "..."}},
+        {{"id": "4", "title": "Gold-plating", "score_text": "...", "score_val": 1.0, "confidence": 0.9, "reason": "..."}},
+        {{"id": "5", "title": "Νησιωτικότητα", "score_text": "...", "score_val": 1.0, "confidence": 0.9, "reason": "..."}},
+        {{"id": "6", "title": "Ανάλυση Κόστους", "score_text": "...", "score_val": 1.0, "confidence": 0.9, "reason": "..."}},
+        {{"id": "7", "title": "Απλούστευση", "score_text": "...", "score_val": 1.0, "confidence": 0.9, "reason": "..."}},
+        {{"id": "8", "title": "Εξουσιοδοτήσεις", "score_text": "...", "score_val": 1.0, "confidence": 0.9, "reason": "..."}},
+        {{"id": "9", "title": "Μηχανισμοί Εφαρμογής", "score_text": "...", "score_val": 1.0, "confidence": 0.9, "reason": "..."}},
+        {{"id": "10", "title": "Σαφήνεια Γλώσσας", "score_text": "...", "score_val": 1.0, "confidence": 0.9, "reason": "..."}}
+    ],
+    "summary": "..."
+}}
+"""
+
+CRITERION_PROMPT = """
+Ενεργείς ως Ελεγκτής Νομοθεσίας και εξετάζεις ΜΟΝΟ το παρακάτω κριτήριο.
+
+ΣΤΟΙΧΕΙΑ ΝΟΜΟΥ: {metadata}
+
+ΚΡΙΤΗΡΙΟ {id}. {title}
+{question}
+
+ΣΧΕΤΙΚΑ ΑΠΟΣΠΑΣΜΑΤΑ:
+{context}
+
+Βαθμολόγησε με 1=ΝΑΙ, 0.5=Μερικώς, 0=ΟΧΙ και τεκμηρίωσε. Στο "confidence" (0-1)
+δήλωσε πόσο βέβαιος είσαι· χαμηλά αν τα αποσπάσματα δεν αρκούν.
+OUTPUT JSON ONLY:
+{{"id": "{id}", "title": "{title}", "score_text": "...", "score_val": 1.0, "confidence": 0.9, "reason": "..."}}
+"""
+
+PILLAR_PROMPT = """
+Ενεργείς ως Ελεγκτής Νομοθεσίας.
+
+ΣΤΟΙΧΕΙΑ ΝΟΜΟΥ: {metadata}
+
+ΠΥΛΩΝΑΣ {id}: {title}
+{question}
+
+ΣΧΕΤΙΚΑ ΑΠΟΣΠΑΣΜΑΤΑ:
+{context}
+
+OUTPUT JSON ONLY:
+{{"id": "{id}", "title": "{title}", "findings": "..."}}
+"""
+
+SUMMARY_PROMPT = """
+Με βάση τα παρακάτω ευρήματα ελέγχου του νόμου "{metadata}", γράψε σύντομο
+συνολικό πόρισμα (έως 5 προτάσεις) με τα 3 σοβαρότερα "Κόκκινα Σημεία".
+
+{findings}
+"""
+
+# Για το κλειδί της αποθήκης αποτελεσμάτων (nomoskor.results)
+PROMPTS = CRITERION_PROMPT + PILLAR_PROMPT + SUMMARY_PROMPT
+
+
+def _score(value):
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def parse_json(txt):
+    """Αφαιρεί τα ``` του markdown και διαβάζει το JSON (με τοπική διόρθωση αν χρειαστεί)."""
+    return loads(txt)
+
+
+def _criterion(c, model=None):
+    c = dict(c, id=str(c.get("id", "")), score_val=_score(c.get("score_val")))
+    if model: c["model"] = model
+    return c
+
+
+def _audit_prompt(law_text, reports_text, metadata, hints):
+    return AUDIT_PROMPT.format(metadata=metadata, law_text=law_text, reports_text=reports_text, hints=hints or "-")
+
+
+def _stream(prompt, tiers):
+    """
+    ("criterion", dict) για κάθε κριτήριο και στο τέλος ("done", αποτέλεσμα με
+    "model") από το πρώτο μοντέλο που απαντά. Το επόμενο μοντέλο δοκιμάζεται
+    μόνο αν το προηγούμενο αποτύχει πριν δώσει κριτήρια, όχι για λάθη στο JSON.
+    """
+    tokens = estimate_tokens(prompt)
+    names = models.chain(tiers, tokens)
+    errors = [] if names else [f"Κανένα διαθέσιμο μοντέλο για {tokens} tokens"]
+    for name in names:
+        parser = CriteriaParser()
+        chunk = None
+        try:
+            for chunk in models.stream(name, prompt):
+                for c in parser.feed(chunk.text):
+                    yield "criterion", _criterion(c, name)
+            # το usage_metadata έρχεται ολόκληρο στο τελευταίο chunk
+            record_usage(chunk)
+        except Exception as e:
+            errors.append(f"{name}: {e}")
+            # ό,τι ήρθε ήδη το κρατάμε και το διορθώνουμε, δεν το ξαναζητάμε
+            if not parser.items: continue
+        res = parser.finish()
+        if "criteria" in res:
+            res["criteria"] = [_criterion(c, name) for c in res["criteria"]]
+        yield "done", dict(res, model=name)
+        return
+    yield "done", {"error": " | ".join(errors)}
+
+
+def _result(events):
+    res = None
+    for kind, value in events:
+        if kind == "done": res = value
+    return res
+
+
+def stream_audit(law_text, reports_text, metadata, model_name=DEFAULT_MODEL, hints=""):
+    """
+    Έλεγχος με ένα αίτημα, με streaming. Generator που δίνει ("criterion", dict)
+    για κάθε κριτήριο μόλις ολοκληρωθεί και στο τέλος ("done", αποτέλεσμα ή
+    {"error": ...}). Στον καταρράκτη το αίτημα πάει στο φθηνότερο μοντέλο που
+    χωρά το prompt, χωρίς κλιμάκωση (βλ. `run_audit`).
+    `hints`: τα ευρήματα του nomoskor.rules (βλ. rules.summary_text).
+    """
+    yield from _stream(_audit_prompt(law_text, reports_text, metadata, hints), models.plan(model_name))
+
+
+def run_audit(law_text, reports_text, metadata, model_name=DEFAULT_MODEL, hints=""):
+    """
+    Έλεγχος με ένα αίτημα· επιστρέφει το JSON των κριτηρίων ή {"error": ...}.
+    Στον καταρράκτη, αν κάποια κριτήρια έχουν χαμηλή βεβαιότητα, το ίδιο prompt
+    πάει στην επόμενη βαθμίδα και από τη νέα απάντηση κρατιούνται αυτά τα
+    κριτήρια και το πόρισμα.
+    """
+    prompt = _audit_prompt(law_text, reports_text, metadata, hints)
+    tiers = models.plan(model_name)
+    res = _result(_stream(prompt, tiers))
+    while "criteria" in res:
+        low = {c["id"] for c in res["criteria"] if not models.confident(c)}
+        tiers = tiers[next(i for i, names in enumerate(tiers) if res["model"] in names) + 1:]
+        if not low or not tiers: break
+        with span("escalate", criteria=len(low)):
+            better = _result(_stream(prompt, tiers))
+        if "criteria" not in better: break
+        new = {c["id"]: c for c in better["criteria"]}
+        res = dict(res, criteria=[new.get(c["id"], c) if c["id"] in low else c for c in res["criteria"]],
+                   summary=better.get("summary") or res.get("summary", ""), model=better["model"])
+    return res
+
+
+async def _generate(names, contents, sem, retries, parse=True):
+    """
+    Μία κλήση με όριο ταυτοχρονίας και επαναλήψεις (exponential backoff). Κάθε
+    επανάληψη πάει στο επόμενο από τα `names` που δεν έχει ανοιχτό breaker
+    (failover). Επιστρέφει (μοντέλο, απάντηση).
+    """
+    last = None
+    for attempt in range(retries + 1):
+        available = [n for n in names if models.health(n).breaker.available()]
+        if not available: break
+        name = available[attempt % len(available)]
+        try:
+            async with sem:
+                with span("llm_call", model=name, attempt=attempt):
+                    response = await models.generate_async(name, contents)
+            record_usage(response)
+            return name, parse_json(response.text) if parse else response.text.strip()
+        except Exception as e:
+            last = e
+            if attempt < retries:
+                await asyncio.sleep(2 ** attempt + random.random())
+    raise last or models.ModelUnavailable(f"{', '.join(names) or '-'}: κανένα διαθέσιμο μοντέλο")
+
+
+async def _evaluate(tiers, contents, tokens, sem, retries):
+    """
+    Ένα κριτήριο στον καταρράκτη: ξεκινά από τη φθηνότερη βαθμίδα που χωρά τα
+    `tokens` και ανεβαίνει όσο η βεβαιότητα είναι χαμηλή ή η βαθμίδα αποτυγχάνει.
+    Κρατιέται η απάντηση της υψηλότερης βαθμίδας που απάντησε.
+    """
+    best = last = None
+    for names in tiers:
+        names = models.fits(names, tokens)
+        if not names: continue
+        try:
+            name, r = await _generate(names, contents, sem, retries)
+        except Exception as e:
+            last = e
+            continue
+        if not isinstance(r, dict):
+            last = ValueError(f"{name}: μη αναγνώσιμη απάντηση")
+            continue
+        best = dict(r, model=name)
+        if models.confident(best): break
+    if best is None:
+        raise last or models.ModelUnavailable(f"Κανένα διαθέσιμο μοντέλο για {tokens} tokens")
+    return best
+
+
+def _ruled(card, ids):
+    """Τα κριτήρια όπου η βαθμολογία των κανόνων είναι αρκετά βέβαιη για να μη χρειαστεί μοντέλο."""
+    out = {}
+    for c in (card or {}).get("criteria", []):
+        if c["id"] in ids and c.get("score_val") is not None and models.confidence(c, 0) >= models.RULES_ACCEPT:
+            out[c["id"]] = {"id": c["id"], "title": c["title"], "score_text": c["score_text"],
+                            "score_val": c["score_val"], "confidence": c["confidence"], "reason": c["reason"],
+                            "model": "rules"}
+    return out
+
+
+async def audit_async(docs, metadata, attachments=None, extra=None, model_name=DEFAULT_MODEL,
+                      budget=CRITERION_TOKEN_BUDGET, concurrency=CONCURRENCY, retries=RETRIES, counter=None,
+                      only=None, previous=None, card=None):
+    """
+    `docs` όπως στο `packer.pack`. `attachments`: επιπλέον parts για κάθε κλήση
+    (π.χ. αρχεία OCR). `extra`: dict id κριτηρίου -> επιπλέον κείμενο (π.χ. Opengov).
+    Ένα κριτήριο που αποτυγχάνει επιστρέφεται με "error" χωρίς να ρίχνει τον έλεγχο.
+    Κάθε κριτήριο έχει "model": το μοντέλο που το αξιολόγησε.
+
+    Στον καταρράκτη (`model_name` "cascade") κάθε κριτήριο κλιμακώνεται χωριστά,
+    και με `card` (nomoskor.rules.prescore) όσα οι κανόνες βαθμολογούν με
+    βεβαιότητα ≥ models.RULES_ACCEPT δεν στέλνονται στο μοντέλο.
+
+    Επανέλεγχος: με `previous` (προηγούμενο αποτέλεσμα) και `only` (ids κριτηρίων)
+    αξιολογούνται μόνο αυτά τα κριτήρια και οι πυλώνες που τα αφορούν· τα
+    υπόλοιπα κρατιούνται από το `previous` και το πόρισμα ξαναγράφεται.
+    """
+    tiers = models.plan(model_name)
+    sem = asyncio.Semaphore(concurrency)
+    attachments = attachments or []
+    extra = extra or {}
+    old = {c["id"]: c for c in (previous or {}).get("criteria", []) if not c.get("error")}
+    old_pillars = {p["id"]: p for p in (previous or {}).get("pillars", [])}
+    # ό,τι λείπει από το προηγούμενο (ή απέτυχε τότε) αξιολογείται ούτως ή άλλως
+    only = {c["id"] for c in CRITERIA if only is None or c["id"] in only or c["id"] not in old}
+    ruled = _ruled(card, only) if len(tiers) > 1 else {}
+    todo = [c for c in CRITERIA if c["id"] in only and c["id"] not in ruled]
+    todo_pillars = [p for p in PILLARS if only & set(p["criteria"]) or p["id"] not in old_pillars]
+
+    def contents(template, item, focus):
+        context, _ = pack(docs, budget, criteria=focus, counter=counter)
+        if extra.get(item["id"]):
+            context = extra[item["id"]] + "\n" + context
+        return [template.format(metadata=metadata, context=context, **item)] + attachments
+
+    def evaluate(c):
+        parts = contents(CRITERION_PROMPT, c, [c["id"]])
+        return _evaluate(tiers, parts, estimate_tokens(parts[0]), sem, retries)
+
+    async def pillar(p):
+        parts = contents(PILLAR_PROMPT, p, p["criteria"])
+        return (await _generate(models.chain(tiers, estimate_tokens(parts[0])), parts, sem, retries))[1]
+
+    jobs = [evaluate(c) for c in todo] + [pillar(p) for p in todo_pillars]
+    results = await asyncio.gather(*jobs, return_exceptions=True)
+    new = {c["id"]: r for c, r in zip(todo, results[:len(todo)])}
+    new_pillars = {p["id"]: r for p, r in zip(todo_pillars, results[len(todo):])}
+
+    criteria = []
+    for c in CRITERIA:
+        if c["id"] in ruled:
+            criteria.append(ruled[c["id"]])
+            continue
+        if c["id"] not in new:
+            criteria.append(old[c["id"]])
+            continue
+        r = new[c["id"]]
+        if isinstance(r, Exception) or not isinstance(r, dict):
+            criteria.append({"id": c["id"], "title": c["title"], "score_text": "Σφάλμα", "score_val": 0,
+                             "reason": f"Το κριτήριο δεν αξιολογήθηκε: {r}", "error": True})
+        else:
+            criteria.append(dict(r, id=c["id"], title=c["title"], score_val=_score(r.get("score_val"))))
+
+    pillars = []
+    for p in PILLARS:
+        if p["id"] not in new_pillars:
+            pillars.append(old_pillars[p["id"]])
+            continue
+        r = new_pillars[p["id"]]
+        findings = r.get("findings", "") if isinstance(r, dict) else f"Σφάλμα: {r}"
+        pillars.append({"id": p["id"], "title": p["title"], "findings": findings})
+
+    evaluated = [c for c in criteria if c["id"] in new]
+    if evaluated and all(c.get("error") for c in evaluated):
+        return {"error": f"Όλα τα κριτήρια απέτυχαν: {evaluated[0]['reason']}"}
+
+    findings = "\n".join(f"{c['id']}. {c['title']}: {c['score_text']} - {c['reason']}" for c in criteria)
+    findings += "\n" + "\n".join(f"{p['title']}: {p['findings']}" for p in pillars)
+    prompt = SUMMARY_PROMPT.format(metadata=metadata, findings=findings)
+    try:
+        _, summary = await _generate(models.chain(tiers, estimate_tokens(prompt)), [prompt], sem, retries,
+                                     parse=False)
+    except Exception:
+        summary = findings
+
+    return {"criteria": criteria, "summary": summary, "pillars": pillars}
+
+
+def run_map_reduce(docs, metadata, **kwargs):
+    """Σύγχρονο wrapper για χρήση από το Streamlit."""
+    return asyncio.run(audit_async(docs, metadata, **kwargs))
+
+
+def to_markdown(res):
+    """Αναφορά markdown από το JSON του παράλληλου ελέγχου."""
+    lines = ["## Πυλώνας Α: Ο Δεκάλογος της Καλής Νομοθέτησης"]
+    for c in res.get("criteria", []):
+        lines.append(f"**{c['id']}. {c['title']}** — {c.get('score_text', '')}\n\n{c.get('reason', '')}\n")
+    for p in res.get("pillars", []):
+        lines.append(f"## Πυλώνας {p['id']}: {p['title']}\n\n{p['findings']}\n")
+    lines.append(f"## Τελικό Πόρισμα\n\n{res.get('summary', '')}")
+    return "\n".join(lines)
@@ -0,0 +1,115 @@
+"""
+Μαζικός έλεγχος νόμων χωρίς UI.
+
+    python -m nomoskor batch --laws 4900-4999 --out results.jsonl
+
+Οι νόμοι ελέγχονται ταυτόχρονα, με κοινά όρια αιτημάτων για το API της Βουλής
+και το Gemini. Κάθε αποτέλεσμα γράφεται στο JSONL μόλις ολοκληρωθεί· το ίδιο
+αρχείο λειτουργεί ως checkpoint, ώστε μια διακοπείσα εκτέλεση να συνεχίζει από
+εκεί που σταμάτησε. Με --out *.parquet γράφεται στο τέλος και Parquet.
+"""
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from nomoskor.ratelimit import TokenBucket
+from nomoskor.models import DEFAULT_MODEL
+from nomoskor.pipeline import get_extractor
+from nomoskor.service import audit_law, TOKEN_BUDGET
+
+log = logging.getLogger(__name__)
+
+
+def parse_laws(spec):
+    """ "4900-4905,4940" -> ["4900", ..., "4905", "4940"] """
+    laws = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part: continue
+        if "-" in part:
+            a, b = part.split("-", 1)
+            laws.extend(str(n) for n in range(int(a), int(b) + 1))
+        else:
+            laws.append(part)
+    return laws
+
+
+def load_done(path, retry_errors=True, rules_only=False):
+    """
+    Οι νόμοι που έχουν ήδη ολοκληρωθεί σε προηγούμενη εκτέλεση. Οι προσωρινές
+    εγγραφές (μόνο κανόνες) μετρούν μόνο για εκτέλεση με `rules_only`.
+    """
+    done = set()
+    if not os.path.exists(path): return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue  # μισογραμμένη γραμμή από διακοπή
+            if rec.get("provisional") and not rules_only:
+                continue  # βαθμολογία μόνο με κανόνες (--no-llm)· τώρα ζητείται πλήρης έλεγχος
+            if rec.get("status") in ("ok", "not_found") or not retry_errors:
+                done.add(rec["query"])
+    return done
+
+
+def write_parquet(jsonl_path, parquet_path):
+    import pandas as pd
+
+    with open(jsonl_path, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    # μετά από επανάληψη ενός νόμου που είχε αποτύχει κρατάμε την τελευταία εγγραφή
+    df = pd.DataFrame(rows).drop_duplicates("query", keep="last")
+    for col in ("criteria",):
+        if col in df: df[col] = df[col].map(lambda v: json.dumps(v, ensure_ascii=False))
+    df.to_parquet(parquet_path, index=False)
+
+
+def run(args):
+    laws = parse_laws(args.laws)
+    parquet = args.out if args.out.endswith(".parquet") else None
+    jsonl = args.out + ".jsonl" if parquet else args.out
+
+    done = load_done(jsonl, retry_errors=not args.skip_errors, rules_only=args.no_llm)
+    todo = [n for n in laws if n not in done]
+    log.info("%d νόμοι · %d ήδη έτοιμοι · %d για έλεγχο", len(laws), len(done & set(laws)), len(todo))
+
+    limits = {"parliament": TokenBucket(args.api_rate), "gemini": TokenBucket(args.llm_rate)}
+    # οι νόμοι μοιράζονται τον κοινό pool της εξαγωγής· στο batch παίρνει όλους τους πυρήνες
+    get_extractor(os.cpu_count())
+
+    def one(num):
+        try:
+            return audit_law(num, token_budget=args.token_budget, model_name=args.model, limits=limits,
+                             force=args.force, rules_only=args.no_llm)
+        except Exception as e:
+            return {"query": num, "status": "error", "error": str(e)}
+
+    with open(jsonl, "a", encoding="utf-8") as out, ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = [pool.submit(one, num) for num in todo]
+        for n, fut in enumerate(as_completed(futures), 1):
+            rec = fut.result()
+            out.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            out.flush()
+            log.info("[%d/%d] %s: %s %s", n, len(todo), rec['query'], rec['status'], rec.get('score', ''))
+
+    if parquet:
+        write_parquet(jsonl, parquet)
+    return 0
+
+
+def add_parser(sub):
+    p = sub.add_parser("batch", help="Μαζικός έλεγχος νόμων")
+    p.add_argument("--laws", required=True, help="π.χ. 4900-4999 ή 4940,4941")
+    p.add_argument("--out", required=True, help="αρχείο .jsonl ή .parquet")
+    p.add_argument("--workers", type=int, default=4, help="νόμοι που ελέγχονται ταυτόχρονα")
+    p.add_argument("--api-rate", type=float, default=2.0, help="αιτήματα/δευτ. στο API της Βουλής")
+    p.add_argument("--llm-rate", type=float, default=0.25, help="κλήσεις/δευτ. στο Gemini (όλων των μοντέλων)")
+    p.add_argument("--token-budget", type=int, default=TOKEN_BUDGET)
+    p.add_argument("--model", default=DEFAULT_MODEL, help="όνομα μοντέλου ή \"cascade\" (βλ. nomoskor.models)")
+    p.add_argument("--force", action="store_true", help="αγνόησε τους αποθηκευμένους ελέγχους")
+    p.add_argument("--no-llm", action="store_true", help="μόνο προσωρινή βαθμολογία με κανόνες, χωρίς Gemini")
+    p.add_argument("--skip-errors", action="store_true", help="μην ξαναδοκιμάσεις νόμους που απέτυχαν")
+    p.set_defaults(func=run)
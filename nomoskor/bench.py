@@ -0,0 +1,695 @@
+"""
+Benchmark του πλήρους ελέγχου χωρίς δίκτυο.
+
+Οι απαντήσεις του API της Βουλής, τα PDF και οι σελίδες του Opengov
+αναπαράγονται από καταγραφές (fixtures) μέσα από τον κοινό HTTP client, και το
+Gemini αντικαθίσταται από τοπικό μοντέλο με έτοιμες απαντήσεις. Μετριούνται
+χρόνοι ανά στάδιο (p50/p95) και ρυθμός για 1, 10 και 100 νόμους.
+
+    python -m nomoskor.bench synth --laws 100         # συνθετικά PDF (κείμενο και σκαναρισμένα)
+    python -m nomoskor.bench record 4940 5000         # ή καταγραφή πραγματικών (θέλει δίκτυο)
+    python -m nomoskor.bench run --out new.json --baseline old.json
+    python -m nomoskor.bench compare new.json old.json
+
+Με `--baseline` (ή `compare`) σημειώνονται τα στάδια που έγιναν πιο αργά από
+το `--threshold` και ο κωδικός εξόδου είναι 1, για χρήση σε CI.
+"""
+import argparse
+import hashlib
+import io
+import json
+import logging
+import os
+import platform
+import random
+import re
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unicodedata
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from requests import Response
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from nomoskor import audit, models, opengov, trace
+from nomoskor import ocr as local_ocr
+from nomoskor.cache import CACHE_DIR, PdfCache
+from nomoskor.criteria import CRITERIA, total_score
+from nomoskor.documents import Document
+from nomoskor.httpclient import HttpClient, set_client
+from nomoskor.lawindex import LawIndex
+from nomoskor.packer import doc_kind, pack
+from nomoskor.parliament import API_URL, fetch_laws, law_metadata, law_summary, select_law
+from nomoskor.pipeline import PARLIAMENT_URL, absolute_url, iter_bundle
+from nomoskor.rules import prescore, summary_text
+from nomoskor.service import DOC_CHAR_BUDGET, LAW_SHARE, TOKEN_BUDGET
+
+BENCH_DIR = os.path.join(CACHE_DIR, "bench")
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+SCALES = (1, 10, 100)
+THRESHOLD = 0.2
+# Διαφορές κάτω από τόσα δευτερόλεπτα δεν μετράνε ως επιβράδυνση (θόρυβος)
+NOISE_SECONDS = 0.01
+# Χωρίς όριο αιτημάτων: μετράμε τον κώδικα, όχι το token bucket
+UNLIMITED = (1e9, 10 ** 9)
+KEEP_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+COPY_PARAM = "bench_copy"
+VERSION = 1
+
+log = logging.getLogger(__name__)
+
+
+# =============================================================================
+# Fixtures: καταγεγραμμένες απαντήσεις HTTP
+# =============================================================================
+
+def normalize_url(url):
+    """(URL με ταξινομημένο query, αριθμός αντιγράφου) — το `bench_copy` αφαιρείται."""
+    parts = urlsplit(url)
+    query = sorted(parse_qsl(parts.query, keep_blank_values=True))
+    copy = int(dict(query).get(COPY_PARAM, 0))
+    query = [(k, v) for k, v in query if k != COPY_PARAM]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), "")), copy
+
+
+def with_copy(url, copy):
+    if not copy: return url
+    return url + ("&" if "?" in url else "?") + f"{COPY_PARAM}={copy}"
+
+
+class Fixtures:
+    """manifest.json (νόμοι + απαντήσεις ανά URL) και τα σώματα στο blobs/."""
+
+    def __init__(self, directory=FIXTURES_DIR, kind=None):
+        self.dir = directory
+        self.kind = kind
+        self.laws = []
+        self.responses = {}
+        self._lock = threading.Lock()
+        path = os.path.join(directory, "manifest.json")
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.kind = kind or data.get("kind")
+            self.laws = data["laws"]
+            self.responses = data["responses"]
+
+    def add(self, url, status, headers, body):
+        key, _ = normalize_url(url)
+        name = os.path.join("blobs", hashlib.sha1(key.encode()).hexdigest() + ".bin")
+        os.makedirs(os.path.join(self.dir, "blobs"), exist_ok=True)
+        with open(os.path.join(self.dir, name), "wb") as f:
+            f.write(body)
+        kept = {h: headers[h] for h in KEEP_HEADERS if headers.get(h)}
+        with self._lock:
+            self.responses[key] = {"status": status, "headers": kept, "file": name}
+
+    def get(self, url):
+        """(status, headers, body) ή None αν δεν υπάρχει καταγραφή."""
+        key, copy = normalize_url(url)
+        entry = self.responses.get(key)
+        if entry is None: return None
+        with open(os.path.join(self.dir, entry["file"]), "rb") as f:
+            body = f.read()
+        if copy and body.startswith(b"%PDF"):
+            # μοναδικό sha για κάθε αντίγραφο, ώστε να μην το βρίσκει η cache
+            body += b"\n%% bench copy %d\n" % copy
+        return entry["status"], dict(entry["headers"]), body
+
+    def digest(self):
+        """Ταυτότητα των fixtures: συγκρίνονται μόνο αποτελέσματα με τα ίδια."""
+        data = json.dumps([self.laws, sorted((k, v["file"]) for k, v in self.responses.items())])
+        return hashlib.sha1(data.encode()).hexdigest()[:12]
+
+    def save(self):
+        os.makedirs(self.dir, exist_ok=True)
+        with open(os.path.join(self.dir, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump({"kind": self.kind, "laws": self.laws, "responses": self.responses}, f,
+                      ensure_ascii=False, indent=1)
+
+
+class ReplayAdapter(BaseAdapter):
+    """Transport του requests που απαντά από τα fixtures (με Range και ETag όπως ένας server)."""
+
+    def __init__(self, fixtures):
+        super().__init__()
+        self.fixtures = fixtures
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        found = self.fixtures.get(request.url)
+        status, headers, body = found if found else (404, {}, b"")
+        etag = headers.get("ETag")
+        if status == 200 and etag and request.headers.get("If-None-Match") == etag:
+            status, body = 304, b""
+        m = re.match(r"bytes=(\d+)-", request.headers.get("Range") or "")
+        if status == 200 and m:
+            start = int(m.group(1))
+            headers["Content-Range"] = f"bytes {start}-{len(body) - 1}/{len(body)}"
+            status, body = 206, body[start:]
+        headers["Content-Length"] = str(len(body))
+
+        res = Response()
+        res.status_code = status
+        res.headers = CaseInsensitiveDict(headers)
+        res.encoding = get_encoding_from_headers(res.headers)
+        res.raw = io.BytesIO(body)
+        res.reason = {200: "OK", 206: "Partial Content", 304: "Not Modified"}.get(status, "Not Found")
+        res.url = request.url
+        res.request = request
+        res.connection = self
+        return res
+
+    def close(self):
+        pass
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Κανονικό transport που κρατά κάθε επιτυχημένη απάντηση στα fixtures."""
+
+    def __init__(self, fixtures, **kwargs):
+        super().__init__(**kwargs)
+        self.fixtures = fixtures
+
+    def send(self, request, stream=False, **kwargs):
+        res = super().send(request, stream=False, **kwargs)
+        if res.status_code == 200:
+            self.fixtures.add(request.url, 200, res.headers, res.content)
+        return res
+
+
+def replay_client(fixtures):
+    client = HttpClient(retries=0, default_rate=UNLIMITED)
+    adapter = ReplayAdapter(fixtures)
+    client.session.mount("https://", adapter)
+    client.session.mount("http://", adapter)
+    return client
+
+
+def record(fixtures, law_nums):
+    """Καταγράφει από το δίκτυο API, PDF και σελίδα Opengov για κάθε νόμο."""
+    client = HttpClient()
+    adapter = RecordingAdapter(fixtures)
+    client.session.mount("https://", adapter)
+    client.session.mount("http://", adapter)
+    previous = set_client(client)
+    try:
+        for num in law_nums:
+            law = select_law(fetch_laws(num), num)
+            if not law:
+                log.warning("%s: δεν βρέθηκε", num)
+                continue
+            summary = law_summary(law)
+            for f in summary["files"]:
+                if f["url"]: client.get(absolute_url(f["url"]), timeout=60)
+            og = opengov.find(summary["title"] or "")
+            if og: client.get(og, headers=opengov.HEADERS, timeout=10)
+            fixtures.laws = [l for l in fixtures.laws if l["num"] != str(num)]
+            fixtures.laws.append({"num": str(num), "opengov": og})
+            log.info("%s: %d έγγραφα%s", num, len(summary['files']), ", opengov" if og else "")
+    finally:
+        set_client(previous)
+        fixtures.save()
+
+
+# =============================================================================
+# Συνθετικά fixtures
+# =============================================================================
+
+TOPICS = ["ψηφιακή διακυβέρνηση", "ενεργειακή μετάβαση", "δημόσια υγεία", "τοπική αυτοδιοίκηση",
+          "αγορά εργασίας", "πολιτική προστασία", "δημόσιες συμβάσεις", "τουριστική ανάπτυξη",
+          "ανώτατη εκπαίδευση", "χωροταξικό σχεδιασμό", "θαλάσσιες μεταφορές", "αγροτική ανάπτυξη"]
+MINISTRIES = ["Εσωτερικών", "Οικονομικών", "Υγείας", "Παιδείας", "Ανάπτυξης", "Ψηφιακής Διακυβέρνησης",
+              "Περιβάλλοντος και Ενέργειας", "Ναυτιλίας και Νησιωτικής Πολιτικής", "Εργασίας"]
+SENTENCES = [
+    "Με απόφαση του Υπουργού {ministry} ορίζονται οι ειδικότερες λεπτομέρειες για την {topic}.",
+    "Με κοινή υπουργική απόφαση ρυθμίζεται κάθε αναγκαίο θέμα για την εφαρμογή του παρόντος.",
+    "Η παρ. {n} του άρθρου {m} του ν. {law}/{year}, όπως τροποποιήθηκε με το άρθρο {k} του ν. {law2}/{year2}, αντικαθίσταται ως εξής:",
+    "Από την εφαρμογή του παρόντος προκαλείται δαπάνη ύψους {amount} ευρώ ετησίως, η οποία καλύπτεται από τον κρατικό προϋπολογισμό.",
+    "Η αρμόδια υπηρεσία αποφαίνεται εντός ευλόγου χρόνου κατά την κρίση του οργάνου.",
+    "Για την παρακολούθηση της εφαρμογής δημιουργείται ψηφιακή πλατφόρμα και ορίζεται χρονοδιάγραμμα αξιολόγησης.",
+    "Καταργείται η υποχρέωση προσκόμισης δικαιολογητικών που τηρούνται ήδη σε δημόσια μητρώα.",
+    "Ειδικά για τους νησιωτικούς και ορεινούς δήμους προβλέπονται ευνοϊκότερες προθεσμίες.",
+    "Με το παρόν ενσωματώνεται στην ελληνική έννομη τάξη η Οδηγία (ΕΕ) {year}/{n} του Ευρωπαϊκού Κοινοβουλίου.",
+    "Η ρύθμιση αποσκοπεί στον εξορθολογισμό των διαδικασιών και στη βέλτιστη αξιοποίηση των πόρων για την {topic}.",
+    "Οι διατάξεις του παρόντος ισχύουν από τη δημοσίευσή τους στην Εφημερίδα της Κυβερνήσεως.",
+    "Η έκθεση του Γενικού Λογιστηρίου του Κράτους εκτιμά το κόστος σε {amount} ευρώ.",
+    "Οι φορείς που κλήθηκαν σε ακρόαση διατύπωσαν τις απόψεις τους ενώπιον της διαρκούς επιτροπής.",
+]
+
+
+def _glyph(ch):
+    """Όνομα glyph (Adobe Glyph List) για ελληνικό γράμμα, ή None."""
+    m = re.match(r"GREEK (CAPITAL|SMALL) LETTER (FINAL )?(\w+)( WITH (DIALYTIKA AND TONOS|DIALYTIKA|TONOS))?$",
+                 unicodedata.name(ch, ""))
+    if not m: return None
+    name = m.group(3).lower().replace("lamda", "lambda")
+    if name == "mu" and m.group(1) == "SMALL": return "mugreek"  # το "mu" είναι το µ (micro)
+    if m.group(1) == "CAPITAL": name = name.capitalize()
+    if m.group(2): name += "1"
+    return name + {"DIALYTIKA AND TONOS": "dieresistonos", "DIALYTIKA": "dieresis", "TONOS": "tonos"}.get(m.group(5), "")
+
+
+def _greek_encoding():
+    """/Differences ώστε τα bytes ISO-8859-7 να διαβάζονται ως ελληνικά από τους PDF readers."""
+    diffs = []
+    for b in range(0xA0, 0x100):
+        try:
+            name = _glyph(bytes([b]).decode("iso-8859-7"))
+        except UnicodeDecodeError:
+            continue
+        if name: diffs.append(f"{b} /{name}")
+    return f"<< /Type /Encoding /BaseEncoding /WinAnsiEncoding /Differences [{' '.join(diffs)}] >>"
+
+
+GREEK_ENCODING = _greek_encoding()
+
+
+def _pdf(objects):
+    """PDF από λίστα objects (bytes)· το 1 είναι το Catalog."""
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % i + obj + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for o in offsets:
+        out.write(b"%010d 00000 n \n" % o)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def _stream(data, extra=b""):
+    z = zlib.compress(data)
+    return b"<< /Length %d /Filter /FlateDecode %s>>\nstream\n" % (len(z), extra) + z + b"\nendstream"
+
+
+def _escape(line):
+    return line.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def text_pdf(pages):
+    """PDF με κείμενο: `pages` = λίστα σελίδων, κάθε σελίδα λίστα γραμμών."""
+    n = len(pages)
+    kids = " ".join(f"{4 + 2 * i} 0 R" for i in range(n))
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>",
+               f"<< /Type /Pages /Kids [{kids}] /Count {n} >>".encode(),
+               f"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding {GREEK_ENCODING} >>".encode()]
+    for i, lines in enumerate(pages):
+        body = b" ".join(b"(" + _escape(l.encode("iso-8859-7", "replace")) + b") '" for l in lines)
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 3 0 R >> >> "
+                       f"/Contents {5 + 2 * i} 0 R >>".encode())
+        objects.append(_stream(b"BT /F1 9 Tf 40 800 Td 11 TL " + body + b" ET"))
+    return _pdf(objects)
+
+
+# τυχαίο byte -> απόχρωση: κυρίως ανοιχτό "χαρτί" με σκούρες κουκκίδες
+SCAN_LEVELS = bytes(200 + b % 56 if b < 230 else b % 80 for b in range(256))
+
+
+def scanned_pdf(pages, rng, width=400, height=560):
+    """PDF μόνο με εικόνες (θόρυβος σε αποχρώσεις του γκρι), χωρίς κείμενο."""
+    kids = " ".join(f"{3 + 3 * i} 0 R" for i in range(pages))
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>",
+               f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode()]
+    for i in range(pages):
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /XObject << /Im0 {5 + 3 * i} 0 R >> >> "
+                       f"/Contents {4 + 3 * i} 0 R >>".encode())
+        objects.append(_stream(b"q 595 0 0 842 0 0 cm /Im0 Do Q"))
+        pixels = rng.randbytes(width * height).translate(SCAN_LEVELS)
+        objects.append(_stream(pixels, b"/Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceGray "
+                                       b"/BitsPerComponent 8 " % (width, height)))
+    return _pdf(objects)
+
+
+def _sentence(rng):
+    return rng.choice(SENTENCES).format(
+        ministry=rng.choice(MINISTRIES), topic=rng.choice(TOPICS), n=rng.randint(1, 12), m=rng.randint(1, 200),
+        k=rng.randint(1, 90), law=rng.randint(2000, 5100), law2=rng.randint(2000, 5100), year=rng.randint(1995, 2024),
+        year2=rng.randint(1995, 2024), amount=f"{rng.randint(10, 9000)}.{rng.randint(100, 999)}.000")
+
+
+def law_pages(rng, pages, lines=60, width=100):
+    """Σελίδες με άρθρα ("Άρθρο N") και προτάσεις νομοθετικού ύφους."""
+    out, page, line, article = [], [], "", 1
+    while len(out) < pages:
+        if rng.random() < 0.08:
+            if line: page.append(line)
+            page.append(f"Άρθρο {article}")
+            page.append(f"Ρυθμίσεις για την {rng.choice(TOPICS)}")
+            article += 1
+            line = ""
+        for word in _sentence(rng).split():
+            if len(line) + len(word) + 1 > width:
+                page.append(line)
+                line = ""
+            line = f"{line} {word}" if line else word
+        if len(page) >= lines:
+            out.append(page[:lines])
+            page = page[lines:]
+    return out
+
+
+def opengov_html(title, start, days, rng, comments=150):
+    end = time.localtime(time.mktime(start) + days * 86400)
+
+    def fmt(t):
+        return time.strftime("%d/%m/%Y", t)
+
+    parts = ["<html><head><title>opengov.gr</title><script>var menu = {};" + "x" * 2000 + "</script>",
+             "<style>body{font-family:sans-serif}" + ".c{}" * 300 + "</style></head><body>",
+             "<nav>" + "".join(f"<a href='/m{i}'>Υπουργείο {m}</a>" for i, m in enumerate(MINISTRIES)) + "</nav>",
+             f"<h1>{title}</h1><p>Η δημόσια διαβούλευση ξεκινά στις {fmt(start)} και ολοκληρώνεται στις {fmt(end)}.</p>"]
+    for i in range(comments):
+        when = time.localtime(time.mktime(start) + rng.randrange(days * 86400))
+        parts.append(f"<div class='comment'><p class='meta'>Σχόλιο {i + 1} | {time.strftime('%d.%m.%Y', when)}</p>"
+                     f"<p>{_sentence(rng)} {_sentence(rng)}</p></div>")
+    parts.append("<footer>" + "Όροι χρήσης · " * 40 + "</footer></body></html>")
+    return "\n".join(parts).encode("utf-8")
+
+
+def synth(fixtures, laws=max(SCALES), seed=1, scanned_every=5):
+    """
+    `laws` συνθετικοί νόμοι: εγγραφή API, 4-7 PDF με κείμενο (νόμος, εκθέσεις,
+    τροπολογίες), ένα σκαναρισμένο ανά `scanned_every` νόμους και σελίδα Opengov.
+    Ίδιο `seed` = ίδια bytes, άρα συγκρίσιμα αποτελέσματα.
+    """
+    rng = random.Random(seed)
+    fixtures.kind = "synthetic"
+    fixtures.laws = []
+    for k in range(laws):
+        num = str(90001 + k)
+        year = rng.randint(2015, 2024)
+        title = f"Ρυθμίσεις για την {rng.choice(TOPICS)} και την {rng.choice(TOPICS)} - Λοιπές διατάξεις"
+        base = f"/UserFiles/bench/{num}"
+        pdfs = {f"{base}/draft.pdf": text_pdf(law_pages(rng, rng.randint(15, 60))),
+                f"{base}/report.pdf": text_pdf(law_pages(rng, rng.randint(10, 40))),
+                f"{base}/voted.pdf": text_pdf(law_pages(rng, rng.randint(15, 60))),
+                f"{base}/committee.pdf": text_pdf(law_pages(rng, rng.randint(3, 12)))}
+        amendments = []
+        for a in range(rng.randint(0, 3)):
+            url = f"{base}/amendment-{a}.pdf"
+            scanned = a == 0 and k % scanned_every == 0
+            pdfs[url] = scanned_pdf(rng.randint(1, 3), rng) if scanned else text_pdf(law_pages(rng, rng.randint(1, 4)))
+            amendments.append({"File": url, "Description": f"Τροπολογία {a + 1} για την {rng.choice(TOPICS)}"})
+        record = {"Id": f"bench-{num}", "LawNum": num, "Title": title, "LawDate": f"{year}-06-30",
+                  "LawPhotocopy": [{"File": f"{base}/draft.pdf", "FileType": "Σχέδιο Νόμου"},
+                                   {"File": f"{base}/report.pdf", "FileType": "Ανάλυση Συνεπειών Ρύθμισης"}],
+                  "Amendments": amendments,
+                  "VotedLaws": [{"File": f"{base}/voted.pdf"}],
+                  "RecommReport": [{"File": f"{base}/committee.pdf"}]}
+
+        api = API_URL + "?" + urlencode({"q": "laws", "format": "json", "lawnum": num})
+        fixtures.add(api, 200, {"Content-Type": "application/json; charset=utf-8"},
+                     json.dumps({"TotalRecords": 1, "Data": [record]}, ensure_ascii=False).encode("utf-8"))
+        for url, data in pdfs.items():
+            fixtures.add(PARLIAMENT_URL + url, 200, {"Content-Type": "application/pdf",
+                                                     "ETag": '"%s"' % hashlib.sha1(data).hexdigest()[:16]}, data)
+        og = f"https://www.opengov.gr/bench/{num}/"
+        start = time.strptime(f"{year}-0{rng.randint(1, 5)}-{rng.randint(10, 28)}", "%Y-%m-%d")
+        fixtures.add(og, 200, {"Content-Type": "text/html; charset=UTF-8"},
+                     opengov_html(title, start, rng.randint(7, 21), rng))
+        fixtures.laws.append({"num": num, "opengov": og})
+    fixtures.save()
+
+
+# =============================================================================
+# Τοπικό "Gemini"
+# =============================================================================
+
+def canned_response(fixtures=None):
+    """Το gemini.json των fixtures αν υπάρχει, αλλιώς μια έγκυρη απάντηση για τα CRITERIA."""
+    path = os.path.join(fixtures.dir, "gemini.json") if fixtures else ""
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+    rng = random.Random(0)
+    criteria = []
+    for c in CRITERIA:
+        val = rng.choice((0, 0.5, 1))
+        criteria.append({"id": c["id"], "title": c["title"], "score_text": {0: "ΟΧΙ", 0.5: "ΜΕΡΙΚΩΣ", 1: "ΝΑΙ"}[val],
+                         "score_val": val, "reason": " ".join(_sentence(rng) for _ in range(3))})
+    summary = " ".join(_sentence(rng) for _ in range(5))
+    return json.dumps({"criteria": criteria, "summary": summary}, ensure_ascii=False, indent=2)
+
+
+# =============================================================================
+# Εκτέλεση
+# =============================================================================
+
+def audit_one(entry, copy, index, cache, ocr=True):
+    """
+    Ο έλεγχος ενός νόμου όπως στο UI (Βουλή, Opengov, έγγραφα, context,
+    κανόνες, μοντέλο, βαθμολογία), με ένα span ανά στάδιο στο τρέχον trace.
+    """
+    with trace.span("parliament_api"):
+        law = index.find(entry["num"])
+        summary = law_summary(law)
+    files = [dict(f, url=with_copy(absolute_url(f["url"]), copy)) for f in summary["files"] if f["url"]]
+
+    with trace.span("opengov_scrape") as attrs:
+        og_text, og_dates = opengov.scrape(entry.get("opengov"))
+        attrs["chars"] = len(og_text)
+
+    results = [None] * len(files)
+    with trace.span("documents") as attrs:
+        for i, r in iter_bundle(files, clean=True, cache=cache, char_budget=DOC_CHAR_BUDGET, ocr=ocr):
+            results[i] = r
+        attrs.update(bytes=sum(r["bytes_read"] for r in results), pages=sum(r["pages_parsed"] for r in results))
+    trace.record_documents(results, files)
+
+    law_docs, report_docs = [], []
+    for f, r in zip(files, results):
+        if r["text"] and not r["scanned"]:
+            doc = Document.from_result(f, r)
+            (law_docs if doc_kind(f["type"]) == "law" else report_docs).append(doc)
+
+    with trace.span("pack") as attrs:
+        law_text, lstats = pack(law_docs, int(TOKEN_BUDGET * LAW_SHARE))
+        reports_text, rstats = pack(report_docs, int(TOKEN_BUDGET * (1 - LAW_SHARE)))
+        attrs["tokens"] = lstats["tokens"] + rstats["tokens"]
+    with trace.span("rules"):
+        card = prescore(law_docs + report_docs, og_dates, og_text)
+    with trace.span("llm"):
+        res = audit.run_audit(law_text, reports_text, law_metadata(law), model_name=audit.MODEL_NAME,
+                              hints=summary_text(card))
+    with trace.span("score"):
+        score = total_score(res.get("criteria", []))
+    return {"docs": len(files), "scanned": sum(r["scanned"] for r in results), "score": score,
+            "error": res.get("error")}
+
+
+def run_scale(fixtures, n, workdir, workers=1, ocr=True, warm=False):
+    """`n` νόμοι (κυκλικά από τα fixtures) με άδεια cache· με `warm` και δεύτερο πέρασμα."""
+    laws = [(fixtures.laws[i % len(fixtures.laws)], i // len(fixtures.laws)) for i in range(n)]
+    root = os.path.join(workdir, f"scale-{n}")
+    cache = PdfCache(root=root)
+    index = LawIndex(path=os.path.join(root, "laws.db"))
+    out = {}
+    for label in ("cold", "warm") if warm else ("cold",):
+        traces, errors = [], 0
+
+        def one(item):
+            tr = trace.Trace("bench", law=item[0]["num"], copy=item[1]).start()
+            try:
+                info = audit_one(item[0], item[1], index, cache, ocr)
+            except Exception as e:
+                info = {"docs": 0, "scanned": 0, "error": str(e)}
+            tr.finish(path=None)
+            return tr.to_dict(), info
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            done = list(pool.map(one, laws))
+        wall = time.perf_counter() - started
+        for data, info in done:
+            traces.append(data)
+            errors += bool(info["error"])
+        out[label] = summarize(traces, wall, n, errors)
+    return out
+
+
+def summarize(traces, wall, n, errors):
+    stages = trace.stage_stats(traces)
+    docs = [s for t in traces for s in t["spans"] if s["name"] == "document"]
+    for phase in ("download", "extract", "ocr"):
+        values = [s[phase] for s in docs if s.get(phase) is not None]
+        if values:
+            stages[f"document.{phase}"] = {"count": len(values), "p50": round(trace.quantile(values, 0.5), 4),
+                                           "p95": round(trace.quantile(values, 0.95), 4), "sum": round(sum(values), 4)}
+    nbytes = sum(s.get("bytes", 0) for s in docs)
+    pages = sum(s.get("pages", 0) for s in docs)
+    return {"laws": n, "errors": errors, "documents": len(docs), "bytes": nbytes, "pages": pages,
+            "wall": round(wall, 3), "laws_per_s": round(n / wall, 3), "docs_per_s": round(len(docs) / wall, 2),
+            "mb_per_s": round(nbytes / 1048576 / wall, 2), "pages_per_s": round(pages / wall, 1),
+            "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            "tokens": sum((t.get("tokens") or {}).get("prompt", 0) for t in traces), "stages": stages}
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except Exception:
+        commit = None
+    import pypdf
+    return {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(),
+            "pypdf": pypdf.__version__, "html_parser": opengov.PARSER, "local_ocr": local_ocr.available(),
+            "commit": commit}
+
+
+def run(fixtures, scales=SCALES, workers=1, ocr=True, warm=False, llm_latency=0.0, workdir=None):
+    """Όλες οι κλίμακες· επιστρέφει το JSON των αποτελεσμάτων."""
+    text = canned_response(fixtures)
+    client = replay_client(fixtures)
+    previous_client = set_client(client)
+    previous_model = models.get_model
+    models.get_model = lambda name: models.MockModel(name, text, latency=llm_latency)
+    tmp = workdir or tempfile.mkdtemp(prefix="nomoskor-bench-")
+    try:
+        results = {}
+        for n in scales:
+            results[str(n)] = run_scale(fixtures, n, tmp, workers=workers, ocr=ocr, warm=warm)
+            cold = results[str(n)]["cold"]
+            log.info("%4d νόμοι: %.2fs · %.2f νόμοι/s · %.1f MB/s · σφάλματα %d",
+                     n, cold['wall'], cold['laws_per_s'], cold['mb_per_s'], cold['errors'])
+    finally:
+        models.get_model = previous_model
+        set_client(previous_client)
+        if workdir is None: shutil.rmtree(tmp, ignore_errors=True)
+    return {"version": VERSION, "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "env": environment(),
+            "fixtures": {"kind": fixtures.kind, "laws": len(fixtures.laws), "digest": fixtures.digest()},
+            "options": {"workers": workers, "ocr": ocr, "llm_latency": llm_latency},
+            "http": client.metrics(), "scales": results}
+
+
+def compare(new, old, threshold=THRESHOLD, noise=NOISE_SECONDS):
+    """
+    Λίστα με τις επιβραδύνσεις του `new` σε σχέση με το `old`: p50/p95 ανά
+    στάδιο πάνω από `threshold` (σχετικά) και `noise` (απόλυτα), ή πτώση του
+    ρυθμού νόμων/s πάνω από `threshold`.
+    """
+    flags = []
+    for n, runs in new["scales"].items():
+        for label, cur in runs.items():
+            base = old["scales"].get(n, {}).get(label)
+            if not base: continue
+            if cur["laws_per_s"] < base["laws_per_s"] * (1 - threshold):
+                flags.append({"scale": n, "run": label, "stage": "throughput", "metric": "laws_per_s",
+                              "old": base["laws_per_s"], "new": cur["laws_per_s"]})
+            for stage, s in cur["stages"].items():
+                b = base["stages"].get(stage)
+                if not b: continue
+                for metric in ("p50", "p95"):
+                    if s[metric] > b[metric] * (1 + threshold) and s[metric] - b[metric] > noise:
+                        flags.append({"scale": n, "run": label, "stage": stage, "metric": metric,
+                                      "old": b[metric], "new": s[metric]})
+    for f in flags:
+        f["change"] = round(f["new"] / f["old"] - 1, 3) if f["old"] else None
+    return flags
+
+
+def report(result, flags=None, out=sys.stdout):
+    for n, runs in result["scales"].items():
+        for label, r in runs.items():
+            print(f"\n{n} νόμοι ({label}): {r['wall']:.2f}s · {r['laws_per_s']:.2f} νόμοι/s · "
+                  f"{r['docs_per_s']:.1f} έγγραφα/s · {r['mb_per_s']:.1f} MB/s · RSS {r['max_rss_mb']} MB", file=out)
+            print(f"  {'στάδιο':<20}{'πλήθος':>8}{'p50 (s)':>10}{'p95 (s)':>10}", file=out)
+            for stage, s in sorted(r["stages"].items(), key=lambda kv: -kv[1]["sum"]):
+                print(f"  {stage:<20}{s['count']:>8}{s['p50']:>10.3f}{s['p95']:>10.3f}", file=out)
+    if flags is None: return
+    if not flags:
+        print("\nΚαμία επιβράδυνση.", file=out)
+        return
+    print(f"\n⚠️  {len(flags)} επιβραδύνσεις:", file=out)
+    for f in flags:
+        change = f"{f['change']:+.0%}" if f["change"] is not None else "-"
+        print(f"  {f['scale']:>4} {f['run']:<5}{f['stage']:<20}{f['metric']:<11}{f['old']:>10}{f['new']:>10}  {change}",
+              file=out)
+
+
+def _load(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _check(new, old):
+    if new["fixtures"]["digest"] != old["fixtures"]["digest"]:
+        print("Προσοχή: διαφορετικά fixtures, τα αποτελέσματα δεν είναι συγκρίσιμα.", file=sys.stderr)
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(prog="python -m nomoskor.bench")
+    parser.add_argument("--dir", default=FIXTURES_DIR, help="φάκελος των fixtures")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("synth", help="συνθετικά fixtures")
+    p.add_argument("--laws", type=int, default=max(SCALES))
+    p.add_argument("--seed", type=int, default=1)
+    p = sub.add_parser("record", help="καταγραφή πραγματικών νόμων από το δίκτυο")
+    p.add_argument("laws", nargs="+")
+    p = sub.add_parser("run", help="εκτέλεση του benchmark")
+    p.add_argument("--scales", default=",".join(map(str, SCALES)))
+    p.add_argument("--workers", type=int, default=1, help="νόμοι ταυτόχρονα")
+    p.add_argument("--warm", action="store_true", help="και δεύτερο πέρασμα με γεμάτη cache")
+    p.add_argument("--no-ocr", action="store_true", help="χωρίς τοπικό OCR")
+    p.add_argument("--llm-latency", type=float, default=0.0, help="δευτερόλεπτα ανά κλήση του μοντέλου")
+    p.add_argument("--out", help=f"JSON αποτελεσμάτων (προεπιλογή: {RESULTS_DIR}/<ώρα>.json)")
+    p.add_argument("--baseline", help="προηγούμενο JSON για σύγκριση")
+    p.add_argument("--threshold", type=float, default=THRESHOLD)
+    p = sub.add_parser("compare", help="σύγκριση δύο αποτελεσμάτων")
+    p.add_argument("new")
+    p.add_argument("old")
+    p.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args(argv)
+
+    if args.command == "synth":
+        fixtures = Fixtures(args.dir)
+        fixtures.responses = {}
+        synth(fixtures, args.laws, args.seed)
+        print(f"{len(fixtures.laws)} νόμοι, {len(fixtures.responses)} απαντήσεις στο {args.dir}")
+        return 0
+    if args.command == "record":
+        record(Fixtures(args.dir, kind="recorded"), args.laws)
+        return 0
+    if args.command == "compare":
+        new, old = _load(args.new), _load(args.old)
+        _check(new, old)
+        flags = compare(new, old, args.threshold)
+        report(new, flags)
+        return 1 if flags else 0
+
+    fixtures = Fixtures(args.dir)
+    if not fixtures.laws:
+        print(f"Δεν υπάρχουν fixtures στο {args.dir}· τρέξε πρώτα 'synth' ή 'record'.", file=sys.stderr)
+        return 2
+    scales = [int(s) for s in args.scales.split(",") if s.strip()]
+    result = run(fixtures, scales, workers=args.workers, ocr=not args.no_ocr, warm=args.warm,
+                 llm_latency=args.llm_latency)
+    out = args.out or os.path.join(RESULTS_DIR, time.strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=1)
+    flags = None
+    if args.baseline:
+        old = _load(args.baseline)
+        _check(result, old)
+        flags = compare(result, old, args.threshold)
+    report(result, flags)
+    print(f"\nΑποτελέσματα: {out}")
+    return 1 if flags else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
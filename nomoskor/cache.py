@@ -0,0 +1,304 @@
+"""
+Μόνιμη cache στο δίσκο για τα PDF της Βουλής και το κείμενό τους.
+
+Τα bytes αποθηκεύονται με κλειδί το sha256 του περιεχομένου (content-addressed)
+και κάθε URL δείχνει στο sha του. Το εξαγόμενο κείμενο αποθηκεύεται χωριστά, ανά
+sha και "παραλλαγή" εξαγωγής (π.χ. όριο σελίδων). Όταν ξεπεραστεί το όριο
+μεγέθους, διαγράφονται πρώτα τα λιγότερο πρόσφατα χρησιμοποιημένα (LRU).
+
+Χρήση από τη γραμμή εντολών:  python -m nomoskor.cache warm 4940 4941
+"""
+import logging
+import mmap
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from collections import defaultdict
+
+import requests
+
+from nomoskor.httpclient import get_client
+from nomoskor.pipeline import absolute_url
+
+CACHE_DIR = os.environ.get("NOMOSKOR_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "nomoskor"))
+CACHE_MAX_BYTES = int(os.environ.get("NOMOSKOR_CACHE_MAX_MB", "2048")) * 1024 * 1024
+# Τα δημοσιευμένα PDF δεν αλλάζουν· ξαναρωτάμε (conditional GET) σπάνια
+REVALIDATE_AFTER = int(os.environ.get("NOMOSKOR_CACHE_REVALIDATE", str(7 * 24 * 3600)))
+
+log = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY, sha TEXT, etag TEXT, last_modified TEXT, checked REAL);
+CREATE TABLE IF NOT EXISTS blobs (sha TEXT PRIMARY KEY, size INTEGER, accessed REAL);
+CREATE TABLE IF NOT EXISTS texts (key TEXT PRIMARY KEY, sha TEXT, size INTEGER, accessed REAL);
+"""
+
+
+class PdfCache:
+    def __init__(self, root=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, revalidate_after=REVALIDATE_AFTER):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.revalidate_after = revalidate_after
+        os.makedirs(os.path.join(root, "blobs"), exist_ok=True)
+        os.makedirs(os.path.join(root, "texts"), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(root, "index.db"), check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self.stats = {"bytes_hit": 0, "bytes_miss": 0, "text_hit": 0, "text_miss": 0, "revalidated": 0,
+                      "stale": 0}
+        # sha -> πόσοι το διαβάζουν ακόμα (fetch(hold=True) ... release)· το _evict τα παρακάμπτει
+        self._in_use = defaultdict(int)
+
+    # --- paths ---
+
+    def blob_path(self, sha):
+        return os.path.join(self.root, "blobs", sha[:2], sha + ".pdf")
+
+    def _text_path(self, key):
+        return os.path.join(self.root, "texts", key[:2], key + ".txt")
+
+    def _pages_path(self, key):
+        return os.path.join(self.root, "texts", key[:2], key + ".pages")
+
+    # --- bytes ---
+
+    def fetch(self, url, timeout=60, hold=False):
+        """
+        Επιστρέφει (sha, bytes που κατέβηκαν), κατεβάζοντας το PDF μόνο αν χρειάζεται.
+        Αν υπάρχει ETag/Last-Modified και έχει περάσει το `revalidate_after`,
+        γίνεται conditional GET (304 = κρατάμε το αποθηκευμένο)· αν αποτύχει στο
+        δίκτυο, επιστρέφεται το αποθηκευμένο και ξαναδοκιμάζουμε σε επόμενη κλήση.
+
+        Με `hold` το blob δεν σβήνεται από το LRU μέχρι το αντίστοιχο `release(sha)`.
+        """
+        url = absolute_url(url)
+        with self._lock:
+            row = self._db.execute("SELECT sha, etag, last_modified, checked FROM urls WHERE url=?", (url,)).fetchone()
+            # πριν τον έλεγχο ύπαρξης, ώστε ένα _evict στο μεταξύ να μην το σβήσει
+            if row and hold: self._in_use[row[0]] += 1
+        headers = {}
+        cached = row is not None and os.path.exists(self.blob_path(row[0]))
+        if cached:
+            sha, etag, last_modified, checked = row
+            if time.time() - (checked or 0) < self.revalidate_after:
+                self._hit(sha)
+                return sha, 0
+            if etag: headers["If-None-Match"] = etag
+            if last_modified: headers["If-Modified-Since"] = last_modified
+
+        try:
+            try:
+                got = self._store(url, headers, timeout, hold)
+            except requests.RequestException as e:
+                if not cached: raise
+                log.warning("%s: %s· χρησιμοποιείται το αποθηκευμένο αντίγραφο", url, e)
+                with self._lock:
+                    self.stats["stale"] += 1
+                self._hit(row[0])
+                return row[0], 0
+            if got is None and cached:
+                with self._lock:
+                    self._db.execute("UPDATE urls SET checked=? WHERE url=?", (time.time(), url))
+                    self._db.commit()
+                    self.stats["revalidated"] += 1
+                self._hit(row[0])
+                return row[0], 0
+        except Exception:
+            # κανένα sha δεν φτάνει στον καλούντα, άρα ούτε release από αυτόν
+            if row and hold: self.release(row[0])
+            raise
+        # το παλιό blob (αν υπήρχε) δεν είναι πια αυτό που επιστρέφουμε
+        if row and hold: self.release(row[0])
+
+        sha, size, res_headers = got
+        try:
+            with self._lock:
+                self.stats["bytes_miss"] += 1
+                self._db.execute(
+                    "INSERT OR REPLACE INTO urls VALUES (?, ?, ?, ?, ?)",
+                    (url, sha, res_headers.get("ETag"), res_headers.get("Last-Modified"), time.time()))
+                self._db.commit()
+            self._evict()
+        except Exception:
+            if hold: self.release(sha)
+            raise
+        return sha, size
+
+    def _store(self, url, headers, timeout, hold=False):
+        """
+        Κατεβάζει το PDF στο δίσκο σε κομμάτια, υπολογίζοντας το sha παράλληλα.
+        Επιστρέφει (sha, μέγεθος, headers απάντησης) ή None στο 304.
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".part")
+        try:
+            with os.fdopen(fd, "w+b") as out:
+                res = get_client().download(url, out, headers=headers, timeout=timeout)
+            if res["status"] == 304:
+                return None
+            sha, size = res["sha256"], res["bytes"]
+            path = self.blob_path(sha)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path): os.remove(tmp_path)
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO blobs VALUES (?, ?, ?)", (sha, size, time.time()))
+            self._db.commit()
+            if hold: self._in_use[sha] += 1
+        return sha, size, res["headers"]
+
+    def release(self, sha):
+        """Τέλος της ανάγνωσης ενός blob του `fetch(hold=True)`."""
+        with self._lock:
+            self._in_use[sha] -= 1
+            if self._in_use[sha] <= 0: del self._in_use[sha]
+
+    def _hit(self, sha):
+        with self._lock:
+            self.stats["bytes_hit"] += 1
+            self._db.execute("UPDATE blobs SET accessed=? WHERE sha=?", (time.time(), sha))
+            self._db.commit()
+
+    def get_bytes(self, sha):
+        with open(self.blob_path(sha), "rb") as f:
+            return f.read()
+
+    def map_bytes(self, sha):
+        """
+        Τα bytes του PDF ως memoryview πάνω σε mmap του αρχείου της cache: οι
+        σελίδες φορτώνονται από το λειτουργικό όταν διαβαστούν και δεν μετρούν
+        στη μνήμη της διεργασίας όσο το έγγραφο απλώς περιμένει (π.χ. για OCR).
+        """
+        with open(self.blob_path(sha), "rb") as f:
+            if not os.fstat(f.fileno()).st_size: return memoryview(b"")
+            return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    # --- text ---
+
+    def get_text(self, sha, variant):
+        key = f"{sha}-{variant}"
+        path = self._text_path(key)
+        with self._lock:
+            if not os.path.exists(path):
+                self.stats["text_miss"] += 1
+                return None
+            self.stats["text_hit"] += 1
+            self._db.execute("UPDATE texts SET accessed=? WHERE key=?", (time.time(), key))
+            self._db.commit()
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+
+    def get_pages(self, sha, variant):
+        """Οι θέσεις έναρξης των σελίδων στο κείμενο (array('I')) ή None για παλιές εγγραφές."""
+        try:
+            with open(self._pages_path(f"{sha}-{variant}"), "rb") as f:
+                pages = array("I")
+                pages.frombytes(f.read())
+                return pages
+        except (OSError, ValueError):
+            return None
+
+    def put_text(self, sha, variant, text, pages=None):
+        key = f"{sha}-{variant}"
+        path = self._text_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = text.encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(data)
+        if pages is not None:
+            with open(self._pages_path(key), "wb") as f:
+                f.write(array("I", pages).tobytes())
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO texts VALUES (?, ?, ?, ?)", (key, sha, len(data), time.time()))
+            self._db.commit()
+        self._evict()
+
+    # --- LRU ---
+
+    def size(self):
+        with self._lock:
+            b = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+            t = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM texts").fetchone()[0]
+        return b + t
+
+    def _evict(self):
+        total = self.size()
+        if total <= self.max_bytes:
+            return
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT 'blob', sha, size, accessed FROM blobs "
+                "UNION ALL SELECT 'text', key, size, accessed FROM texts ORDER BY accessed").fetchall()
+            for kind, key, size, _ in rows:
+                if total <= self.max_bytes: break
+                if kind == "blob":
+                    # το διαβάζει ακόμα εξαγωγή/OCR· θα σβηστεί σε επόμενο _evict
+                    if key in self._in_use: continue
+                    path = self.blob_path(key)
+                    self._db.execute("DELETE FROM blobs WHERE sha=?", (key,))
+                    self._db.execute("DELETE FROM urls WHERE sha=?", (key,))
+                else:
+                    path = self._text_path(key)
+                    self._db.execute("DELETE FROM texts WHERE key=?", (key,))
+                    _remove(self._pages_path(key))
+                _remove(path)
+                total -= size
+            self._db.commit()
+
+    def summary(self):
+        return dict(self.stats, size_bytes=self.size(), max_bytes=self.max_bytes)
+
+    # --- warm-up ---
+
+    def warm(self, law_nums, max_pages=None, clean=True):
+        """Προ-φόρτωση των PDF (και του κειμένου τους) για μια λίστα νόμων."""
+        from nomoskor.parliament import get_law
+        from nomoskor.pipeline import iter_bundle
+
+        count = 0
+        for num in law_nums:
+            try:
+                law = get_law(str(num))
+            except Exception as e:
+                log.warning("%s: %s", num, e)
+                continue
+            if not law: continue
+            for _ in iter_bundle(law["files"], max_pages=max_pages, clean=clean, cache=self):
+                count += 1
+        return count
+
+
+def _remove(path):
+    # Στα Windows ένα blob που είναι ακόμα mmap-αρισμένο (map_bytes) δεν σβήνεται· μένει στο δίσκο
+    # χωρίς εγγραφή στο index αντί να αποτύχει ο έλεγχος που το διαβάζει
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Κοινή cache της διεργασίας."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PdfCache()
+    return _cache
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if len(sys.argv) < 3 or sys.argv[1] != "warm":
+        print("Χρήση: python -m nomoskor.cache warm <αριθμός νόμου> ...")
+        sys.exit(1)
+    cache = get_cache()
+    n = cache.warm(sys.argv[2:])
+    print(f"{n} αρχεία στην cache · {cache.summary()}")
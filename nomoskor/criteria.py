@@ -0,0 +1,73 @@
+"""
+Τα δέκα κριτήρια της καλής νομοθέτησης, τα βάρη τους στη βαθμολογία και
+λέξεις-κλειδιά (πεζά, χωρίς τόνους) που δείχνουν σε ποια σημεία των κειμένων
+αφορά το καθένα.
+"""
+
+WEIGHTS = {
+    "1": 15, "2": 5, "3": 10, "4": 10, "5": 5,
+    "6": 15, "7": 10, "8": 10, "9": 10, "10": 10
+}
+
+CRITERIA = [
+    {"id": "1", "title": "Διαβούλευση",
+     "question": "Έγινε προ-κοινοβουλευτική διαβούλευση; Αν ναι, διήρκεσε ΠΕΡΙΣΣΟΤΕΡΟ ή ΛΙΓΟΤΕΡΟ από 14 ημέρες (χρησιμοποίησε τις ημερομηνίες του Opengov ή της ΑΣΡ); Παρουσιάστηκαν τα ευρήματα σε ξεχωριστή έκθεση που συνόδευε το νομοσχέδιο;",
+     "keywords": ["διαβουλευσ", "opengov", "σχολια", "σχολιων"]},
+    {"id": "2", "title": "Χρόνος Ακρόασης",
+     "question": "Ο μέσος χρόνος που δόθηκε στην ακρόαση φορέων υπερβαίνει τα 5 λεπτά; (Αναζήτησε ενδείξεις στα κείμενα).",
+     "keywords": ["ακροαση", "φορεων", "εισηγητ", "διαρκης επιτροπη"]},
+    {"id": "3", "title": "Νομοθετική Διαδικασία",
+     "question": "Συγκρίνοντας το αρχικό σχέδιο με το τελικό, υπάρχουν διατάξεις που εμφανίστηκαν ως (πολυ-)τροπολογίες; (Ψάξε για \"Λοιπές/Επείγουσες διατάξεις\" στο τέλος του νόμου που είναι άσχετες με τον τίτλο).",
+     "keywords": ["λοιπες διαταξεις", "επειγουσες", "τροπολογ", "καταληκτικες", "μεταβατικ"]},
+    {"id": "4", "title": "Gold-plating",
+     "question": "Υπάρχει «επιχρύσωση» (gold-plating); (Προσθήκη εθνικών βαρών σε διεθνείς κανόνες).",
+     "keywords": ["οδηγια", "οδηγιας", "ενσωματωση", "κανονισμ", "ενωσιακ", "ευρωπαικ"]},
+    {"id": "5", "title": "Νησιωτικότητα",
+     "question": "Υπάρχουν ειδικές διατάξεις που αφορούν τους ορεινούς όγκους και τα νησιά; (Ρήτρα Νησιωτικότητας - Έλεγξε την Έκθεση Συνεπειών).",
+     "keywords": ["νησι", "νησιωτικοτητα", "ορειν"]},
+    {"id": "6", "title": "Ανάλυση Κόστους",
+     "question": "Υπάρχει τεκμηριωμένη ανάλυση κόστους-ωφέλειας; (Υπάρχουν ΠΟΣΟΤΙΚΑ στοιχεία για το ΟΦΕΛΟΣ ή μόνο αόριστες περιγραφές; Το κόστος συνήθως υπάρχει στην έκθεση ΓΛΚ).",
+     "keywords": ["δαπαν", "κοστος", "ωφελ", "γενικου λογιστηριου", "προυπολογισμ", "ευρω"]},
+    {"id": "7", "title": "Απλούστευση",
+     "question": "Υπάρχουν διατάξεις που απλουστεύουν/καταργούν διοικητικές επιβαρύνσεις; (Ή μήπως προσθέτουν γραφειοκρατία;).",
+     "keywords": ["απλουστευσ", "διοικητικου βαρους", "διοικητικο βαρος", "γραφειοκρατ", "καταργ"]},
+    {"id": "8", "title": "Εξουσιοδοτήσεις",
+     "question": "Υπάρχουν εξουσιοδοτήσεις για την έκδοση Υπουργικών Αποφάσεων για θέματα του κυρίως αντικειμένου; (Το φαινόμενο της \"Λευκής Επιταγής\" - Μέτρα τες).",
+     "keywords": ["υπουργικη αποφαση", "αποφαση του υπουργου", "εξουσιοδοτ", "προεδρικο διαταγμα"]},
+    {"id": "9", "title": "Μηχανισμοί Εφαρμογής",
+     "question": "Αναφέρονται ειδικότεροι μηχανισμοί εφαρμογής; (Χρονοδιαγράμματα, πλατφόρμες).",
+     "keywords": ["χρονοδιαγραμμα", "πλατφορμ", "παρακολουθησ", "αξιολογησ", "εναρξη ισχυος"]},
+    {"id": "10", "title": "Σαφήνεια Γλώσσας",
+     "question": "Υπάρχουν δυσκολίες στην κατανόηση του νόμου; (Συντακτικά λάθη, αοριστίες).",
+     "keywords": ["ευλογου χρονου", "κατα την κριση", "οπως τροποποιηθηκε", "οπως ισχυει", "εξορθολογισμ"]},
+]
+
+CRITERIA_BY_ID = {c["id"]: c for c in CRITERIA}
+
+# Ποια κριτήρια μπορεί να αλλάξει ένα νέο ή διαφορετικό έγγραφο, ανά είδος
+# (packer.doc_kind)· για τον επανέλεγχο μόνο όσων επηρεάζονται
+DOC_CRITERIA = {
+    "law": ["3", "4", "5", "7", "8", "9", "10"],
+    "amendment": ["3", "7", "8", "10"],
+    "report": ["1", "2", "4", "5", "6", "7"],
+    "other": [c["id"] for c in CRITERIA],
+}
+
+# Πυλώνες Β και Γ του SYSTEM_INSTRUCTIONS, που ελέγχονται ξεχωριστά στον παράλληλο έλεγχο
+PILLARS = [
+    {"id": "B", "title": "Συμβατότητα με το Εγχειρίδιο 2020",
+     "question": "Έλεγξε την Ανάλυση Συνεπειών Ρύθμισης (ΑΣΡ) και την Αιτιολογική Έκθεση: "
+                 "Τεκμηριώνεται πειστικά γιατί χρειάζεται νέος νόμος; Υπάρχει σαφής πίνακας "
+                 "τροποποιούμενων διατάξεων; Υπολογίζεται το διοικητικό βάρος σε ανθρωποώρες;",
+     "criteria": ["6", "7"]},
+    {"id": "Γ", "title": "Γλωσσικός Έλεγχος",
+     "question": "Εντόπισε ξύλινη γλώσσα (π.χ. \"εξορθολογισμός\", \"βέλτιστη πρακτική\" χωρίς ορισμό), "
+                 "αοριστίες (π.χ. \"κατά την κρίση του οργάνου\", \"εντός ευλόγου χρόνου\") και "
+                 "αλυσίδες παραπομπών (\"όπως τροποποιήθηκε με...\").",
+     "criteria": ["10"]},
+]
+
+
+def total_score(criteria):
+    """Βαθμολογία 0-100 από τα κριτήρια (score_val x βάρος)."""
+    return sum(float(c.get('score_val', 0) or 0) * WEIGHTS.get(str(c.get('id')), 0) for c in criteria)
@@ -0,0 +1,96 @@
+"""
+Λιτή αναπαράσταση των εγγράφων ενός νόμου για τον έλεγχο.
+
+Κάθε έγγραφο κρατά το κείμενό του μία φορά (ένα str, φτιαγμένο με join από
+τις σελίδες) και τις θέσεις όπου ξεκινά κάθε σελίδα σε array('I') αντί για
+λίστα από κείμενα σελίδων. Οι σελίδες και οι ενότητες είναι (start, end) μέσα
+στο ίδιο κείμενο και κόβονται μόνο όταν χρειαστεί το περιεχόμενο τους.
+
+Το `Document` συμπεριφέρεται και ως dict ("type", "desc", "text", ...), ώστε
+packer/rules/audit να δουλεύουν όπως πριν με τα dict των UI.
+"""
+from array import array
+from bisect import bisect_right
+
+FIELDS = ("type", "desc", "url", "sha", "text", "page_offsets", "scanned", "ocr", "keep")
+
+
+def join_pages(parts, sep=""):
+    """(κείμενο, array με τη θέση έναρξης κάθε σελίδας) — οι κενές σελίδες δεν παίρνουν `sep`."""
+    offsets = array("I")
+    pos = 0
+    first = True
+    for p in parts:
+        if p and not first: pos += len(sep)
+        offsets.append(pos)
+        if p:
+            pos += len(p)
+            first = False
+    return sep.join(p for p in parts if p) if sep else "".join(parts), offsets
+
+
+def page_of(offsets, pos):
+    """Ο αριθμός σελίδας (από 1) όπου βρίσκεται η θέση `pos`· None χωρίς offsets."""
+    if not offsets: return None
+    return max(1, bisect_right(offsets, pos))
+
+
+class Document:
+    __slots__ = FIELDS
+
+    def __init__(self, type, text, desc="", url=None, sha=None, page_offsets=None, scanned=False, ocr=False,
+                 keep=False):
+        self.type = type
+        self.desc = desc or ""
+        self.url = url
+        self.sha = sha
+        self.text = text or ""
+        self.page_offsets = page_offsets if page_offsets is None or isinstance(page_offsets, array) \
+            else array("I", page_offsets)
+        self.scanned = scanned
+        self.ocr = ocr
+        self.keep = keep
+
+    @classmethod
+    def from_result(cls, f, r, **kwargs):
+        """Από ένα αρχείο του νόμου (law_summary/API) και το αποτέλεσμα του pipeline.iter_bundle."""
+        return cls(f.get("type") or f.get("FileType") or "", r["text"], desc=f.get("desc") or f.get("FileDesc"),
+                   url=f.get("url") or f.get("File"), sha=r.get("sha"), page_offsets=r.get("page_offsets"),
+                   scanned=r.get("scanned", False), ocr=r.get("ocr", False), **kwargs)
+
+    # --- σελίδες ---
+
+    def __len__(self):
+        return len(self.text)
+
+    @property
+    def pages(self):
+        return len(self.page_offsets) if self.page_offsets else 0
+
+    def page_span(self, i):
+        """(start, end) της σελίδας `i` (από 0) μέσα στο κείμενο."""
+        start = self.page_offsets[i]
+        end = self.page_offsets[i + 1] if i + 1 < len(self.page_offsets) else len(self.text)
+        return start, end
+
+    def page(self, i):
+        start, end = self.page_span(i)
+        return self.text[start:end]
+
+    def page_of(self, pos):
+        return page_of(self.page_offsets, pos)
+
+    # --- συμβατότητα με τα dict ---
+
+    def __getitem__(self, key):
+        if key not in FIELDS: raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in FIELDS
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in FIELDS else default
+
+    def __repr__(self):
+        return f"Document({self.type!r}, {len(self.text)} chars, {self.pages} pages)"
@@ -0,0 +1,201 @@
+"""
+Κοινός HTTP client για όλες τις κλήσεις δικτύου (Βουλή, Opengov, Google).
+
+- ένα requests.Session με keep-alive και connection pool ανά host
+- token bucket ανά host, ώστε πολλοί χρήστες μαζί να μη μας κόβει η Βουλή
+- επαναλήψεις με exponential backoff και jitter σε 429/5xx και σφάλματα σύνδεσης
+  (σεβόμαστε το Retry-After)
+- λήψη μεγάλων αρχείων με συνέχεια από εκεί που κόπηκε (HTTP Range)
+- μετρήσεις ανά endpoint: αιτήματα, σφάλματα, επαναλήψεις, bytes, χρόνος
+"""
+import hashlib
+import random
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from nomoskor.ratelimit import TokenBucket
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
+}
+
+CHUNK_SIZE = 64 * 1024
+RETRIES = 3
+RETRY_STATUS = {429, 500, 502, 503, 504}
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 20.0
+POOL_SIZE = 16
+
+# αιτήματα/δευτ. και burst ανά host· οι υπόλοιποι hosts παίρνουν το DEFAULT_RATE
+HOST_RATES = {
+    "www.hellenicparliament.gr": (4.0, 8),
+    "www.opengov.gr": (2.0, 4),
+    "www.google.com": (0.5, 2),
+}
+DEFAULT_RATE = (10.0, 20)
+
+
+def endpoint_of(url):
+    """host + πρώτο τμήμα του path, π.χ. "www.hellenicparliament.gr/UserFiles"."""
+    parts = urlsplit(url)
+    first = parts.path.strip("/").split("/", 1)[0]
+    return f"{parts.netloc}/{first}" if first else parts.netloc
+
+
+class HttpClient:
+    def __init__(self, rates=None, retries=RETRIES, default_rate=DEFAULT_RATE):
+        self.retries = retries
+        self.rates = dict(HOST_RATES, **(rates or {}))
+        self.default_rate = default_rate
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=POOL_SIZE)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._metrics = defaultdict(lambda: {"requests": 0, "errors": 0, "retries": 0, "bytes": 0,
+                                             "seconds": 0.0, "max_seconds": 0.0, "status": defaultdict(int)})
+
+    # --- όρια και μετρήσεις ---
+
+    def _bucket(self, host):
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(*self.rates.get(host, self.default_rate))
+            return self._buckets[host]
+
+    def _record(self, endpoint, seconds=None, status=None, error=False, retry=False, nbytes=0):
+        """`seconds` μόνο για ολοκληρωμένα αιτήματα (απάντηση ή αποτυχία σύνδεσης)."""
+        with self._lock:
+            m = self._metrics[endpoint]
+            if seconds is not None:
+                m["requests"] += 1
+                m["seconds"] += seconds
+                m["max_seconds"] = max(m["max_seconds"], seconds)
+            if status is not None: m["status"][status] += 1
+            if error: m["errors"] += 1
+            if retry: m["retries"] += 1
+            m["bytes"] += nbytes
+
+    def metrics(self):
+        """{endpoint: {"requests", "errors", "retries", "bytes", "avg_seconds", "max_seconds", "status"}}"""
+        with self._lock:
+            out = {}
+            for ep, m in self._metrics.items():
+                out[ep] = {k: v for k, v in m.items() if k not in ("seconds", "status")}
+                out[ep]["avg_seconds"] = round(m["seconds"] / m["requests"], 3) if m["requests"] else 0.0
+                out[ep]["max_seconds"] = round(m["max_seconds"], 3)
+                out[ep]["status"] = dict(m["status"])
+            return out
+
+    # --- αιτήματα ---
+
+    def _delay(self, attempt, res=None):
+        retry_after = res.headers.get("Retry-After") if res is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(BACKOFF_MAX, float(retry_after))
+        # "full jitter": τυχαία αναμονή μέχρι το εκθετικό όριο
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+    def request(self, method, url, endpoint=None, retries=None, timeout=30, **kwargs):
+        """
+        Όπως το session.request, με rate limit ανά host και επαναλήψεις σε
+        429/5xx ή σφάλμα σύνδεσης. Δεν κάνει raise_for_status.
+        """
+        endpoint = endpoint or endpoint_of(url)
+        bucket = self._bucket(urlsplit(url).netloc)
+        retries = self.retries if retries is None else retries
+        for attempt in range(retries + 1):
+            bucket.acquire()
+            started = time.monotonic()
+            try:
+                res = self.session.request(method, url, timeout=timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                self._record(endpoint, time.monotonic() - started, error=True, retry=attempt < retries)
+                if attempt == retries: raise
+                time.sleep(self._delay(attempt))
+                continue
+            elapsed = time.monotonic() - started
+            last = attempt == retries or res.status_code not in RETRY_STATUS
+            nbytes = len(res.content) if not kwargs.get("stream") else 0
+            self._record(endpoint, elapsed, status=res.status_code, error=res.status_code >= 400,
+                         retry=not last, nbytes=nbytes)
+            if last:
+                return res
+            delay = self._delay(attempt, res)
+            res.close()
+            time.sleep(delay)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def download(self, url, dest, headers=None, endpoint=None, timeout=60, resumes=RETRIES):
+        """
+        Γράφει το σώμα της απάντησης στο `dest` (file object) σε κομμάτια.
+
+        Αν η σύνδεση κοπεί στη μέση, συνεχίζει με Range από το byte που
+        έμεινε· αν ο server δεν υποστηρίζει Range, ξεκινά από την αρχή.
+        Επιστρέφει dict με "status", "bytes", "sha256" και "headers" (στο 304
+        δεν γράφεται τίποτα).
+        """
+        endpoint = endpoint or endpoint_of(url)
+        headers = dict(headers or {})
+        digest = hashlib.sha256()
+        n = 0
+        first = None
+        for attempt in range(resumes + 1):
+            h = dict(headers)
+            if n: h["Range"] = f"bytes={n}-"
+            res = self.get(url, headers=h, endpoint=endpoint, timeout=timeout, stream=True)
+            try:
+                if first is None:
+                    first = res
+                if res.status_code == 304:
+                    return {"status": 304, "bytes": 0, "sha256": None, "headers": res.headers}
+                res.raise_for_status()
+                if n and res.status_code != 206:
+                    # ο server αγνόησε το Range· από την αρχή
+                    dest.seek(0)
+                    dest.truncate()
+                    digest, n = hashlib.sha256(), 0
+                for chunk in res.iter_content(chunk_size=CHUNK_SIZE):
+                    dest.write(chunk)
+                    digest.update(chunk)
+                    n += len(chunk)
+                    self._record(endpoint, nbytes=len(chunk))
+                break
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError):
+                self._record(endpoint, error=True, retry=attempt < resumes)
+                if attempt == resumes: raise
+                time.sleep(self._delay(attempt))
+            finally:
+                res.close()
+        dest.seek(0)
+        return {"status": first.status_code, "bytes": n, "sha256": digest.hexdigest(), "headers": first.headers}
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Κοινός client για όλα τα threads (και όλους τους χρήστες του Streamlit)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+    return _client
+
+
+def set_client(client):
+    """Αντικαθιστά τον κοινό client (π.χ. με αναπαραγωγή καταγραφών στο nomoskor.bench)· επιστρέφει τον προηγούμενο."""
+    global _client
+    with _client_lock:
+        previous, _client = _client, client
+    return previous
@@ -0,0 +1,221 @@
+"""
+Επανέλεγχος νόμου όταν αλλάζει ο φάκελός του (νέες τροπολογίες, έκθεση
+επιτροπής, ψηφισθείς νόμος).
+
+Κάθε αποθηκευμένος έλεγχος κρατά το manifest των εγγράφων (URL, είδος, sha).
+Στον επανέλεγχο συγκρίνουμε τον τρέχοντα φάκελο με αυτό: τα γνωστά έγγραφα
+διαβάζονται από την cache χωρίς δίκτυο, κατεβαίνουν μόνο τα νέα, και στο
+μοντέλο ξαναστέλνονται μόνο τα κριτήρια που επηρεάζουν τα είδη των εγγράφων που
+άλλαξαν (criteria.DOC_CRITERIA). Τα υπόλοιπα κρατιούνται από τον προηγούμενο
+έλεγχο.
+
+    python -m nomoskor watch --laws 5100,5101 --interval 3600
+    python -m nomoskor watch --pending 50 --once
+"""
+import json
+import logging
+import sys
+import time
+
+from nomoskor.analytics import record_audit
+from nomoskor.audit import DEFAULT_MODEL, PROMPTS, run_map_reduce
+from nomoskor.batch import parse_laws
+from nomoskor.cache import get_cache
+from nomoskor.criteria import CRITERIA, DOC_CRITERIA, total_score
+from nomoskor.documents import Document
+from nomoskor.lawindex import get_index
+from nomoskor.opengov import dates_of, get_consultations
+from nomoskor.packer import doc_kind
+from nomoskor.parliament import law_summary
+from nomoskor.pipeline import iter_bundle
+from nomoskor.ratelimit import TokenBucket
+from nomoskor.results import audit_key, get_store, manifest, manifest_entry
+from nomoskor.rules import hints, prescore
+from nomoskor.service import DOC_CHAR_BUDGET, acquire_limit, llm_limit
+from nomoskor.trace import Trace, record_documents, span
+
+WATCH_INTERVAL = 6 * 3600
+INCREMENTAL_PROMPT = PROMPTS + "|incremental"
+
+log = logging.getLogger(__name__)
+
+
+def known_shas(previous):
+    """URL -> sha από το manifest ενός αποθηκευμένου ελέγχου (για το `known` του iter_bundle)."""
+    entries = map(manifest_entry, (previous or {}).get("manifest") or [])
+    return {e["url"]: e["sha"] for e in entries if e["url"] and e["sha"]}
+
+
+def diff(old_manifest, files, results):
+    """
+    {"added", "changed", "removed"}: λίστες από έγγραφα, με βάση το URL και το
+    sha. Έγγραφο που δεν κατέβηκε τώρα (σφάλμα) δεν μετρά ως αλλαγμένο.
+    """
+    old = {e["url"]: e for e in map(manifest_entry, old_manifest or []) if e["url"]}
+    added, changed, now = [], [], set()
+    for f, r in zip(files, results):
+        e = manifest_entry(f)
+        if not e["url"]: continue
+        now.add(e["url"])
+        prev = old.get(e["url"])
+        if prev is None:
+            added.append(e)
+        elif r and r["sha"] and prev["sha"] != r["sha"]:
+            changed.append(e)
+    removed = [e for url, e in old.items() if url not in now]
+    return {"added": added, "changed": changed, "removed": removed}
+
+
+def affected(changes):
+    """Τα ids των κριτηρίων που πρέπει να ξαναξιολογηθούν, ταξινομημένα."""
+    ids = set()
+    for docs in changes.values():
+        for e in docs:
+            ids.update(DOC_CRITERIA[doc_kind(e["type"])])
+    return [c["id"] for c in CRITERIA if c["id"] in ids]
+
+
+def describe(changes, ids):
+    """Σύντομη περιγραφή για τα μηνύματα του UI."""
+    parts = [f"{label}: {len(changes[k])}" for k, label in
+             (("added", "νέα"), ("changed", "αλλαγμένα"), ("removed", "αφαιρέθηκαν")) if changes[k]]
+    return f"{', '.join(parts)} έγγραφα · κριτήρια {', '.join(ids)}"
+
+
+def reaudit_law(query, model_name=DEFAULT_MODEL, limits=None, force=False, revalidate=False):
+    """
+    Όπως το service.audit_law, αλλά ξεκινά από τον τελευταίο αποθηκευμένο έλεγχο
+    (JSON) του νόμου. "status": "unchanged" αν ο φάκελος δεν άλλαξε (καμία κλήση
+    στο μοντέλο), αλλιώς "ok" με "changes" (πλήθος ανά είδος αλλαγής) και
+    "reaudited" (τα κριτήρια που ξαναξιολογήθηκαν). Χωρίς προηγούμενο έλεγχο
+    (ή με `force`) αξιολογούνται όλα. Με `revalidate` και τα γνωστά έγγραφα
+    ελέγχονται στο δίκτυο (conditional GET) για αλλαγμένο περιεχόμενο.
+    """
+    trace = Trace("reaudit", query=str(query)).start()
+    try:
+        record = _reaudit_law(query, model_name, limits, force, revalidate)
+    finally:
+        data = trace.finish()
+    record["stages"] = {name: s["wall"] for name, s in trace.summary().items() if name != "document"}
+    if data["tokens"]: record["tokens"] = data["tokens"]
+    if record["status"] == "ok":
+        record_audit(record, "incremental", model=model_name, stages=record["stages"], tokens=data["tokens"])
+    return record
+
+
+def _reaudit_law(query, model_name, limits, force, revalidate):
+    started = time.time()
+    record = {"query": str(query), "status": "error"}
+
+    with span("parliament_api"):
+        acquire_limit(limits, "parliament")
+        law = get_index().find(str(query))
+    if not law:
+        return dict(record, status="not_found", elapsed=round(time.time() - started, 2))
+    summary = law_summary(law)
+    files = summary["files"]
+    record.update(law_num=summary["law_num"], title=summary["title"], year=summary["year"],
+                  ministry=summary["ministry"], files=len(files))
+
+    store = get_store()
+    previous = None if force else store.latest(summary["law_num"], kind="json")
+    results = [None] * len(files)
+    with span("documents"):
+        for i, r in iter_bundle(files, cache=get_cache(), char_budget=DOC_CHAR_BUDGET,
+                                known=None if revalidate else known_shas(previous)):
+            results[i] = r
+    record_documents(results, files)
+    record.update(pages=sum(r["pages_parsed"] for r in results), bytes=sum(r["bytes_read"] for r in results),
+                  ocr_skipped=sum(1 for r in results if r["scanned"]), ocr_local=sum(r["ocr"] for r in results))
+
+    if previous:
+        changes = diff(previous["manifest"], files, results)
+        only = affected(changes)
+        record["changes"] = {k: len(v) for k, v in changes.items()}
+        if not only:
+            criteria = previous["result"].get("criteria", [])
+            return dict(record, status="unchanged", score=total_score(criteria), criteria=criteria,
+                        summary=previous["result"].get("summary", ""), elapsed=round(time.time() - started, 2))
+    else:
+        only = [c["id"] for c in CRITERIA]
+
+    docs = [Document.from_result(f, r) for f, r in zip(files, results) if r["text"] and not r["scanned"]]
+    if not docs:
+        return dict(record, error="Δεν βρέθηκαν αναγνώσιμα PDF.", elapsed=round(time.time() - started, 2))
+
+    consultation = get_consultations(background_sync=False).best(summary["title"] or "", summary["year"])
+    if consultation:
+        record["opengov"] = consultation["url"]
+        record["ministry"] = record["ministry"] or consultation["ministry"]
+    with span("rules"):
+        card = prescore(docs, dates_of(consultation))
+    with span("llm", criteria=len(only)), llm_limit(limits):
+        res = run_map_reduce(docs, summary["title"], extra=hints(card), model_name=model_name, only=only,
+                             previous=previous["result"] if previous else None, card=card)
+    if "error" in res:
+        return dict(record, error=res["error"], elapsed=round(time.time() - started, 2))
+    key = audit_key(summary["law_num"], [r["sha"] for r in results], INCREMENTAL_PROMPT, model_name)
+    store.put(key, summary["law_num"], res, model_name, manifest=manifest(files, results))
+
+    criteria = res["criteria"]
+    return dict(record, status="ok", score=total_score(criteria), criteria=criteria, reaudited=only,
+                summary=res.get("summary", ""), elapsed=round(time.time() - started, 2))
+
+
+# =============================================================================
+# Watcher
+# =============================================================================
+
+def watch(laws=None, pending=None, interval=WATCH_INTERVAL, once=False, out=sys.stdout, **kwargs):
+    """
+    Σε κάθε γύρο: σταδιακός συγχρονισμός του ευρετηρίου της Βουλής (για νέα
+    αρχεία στα records) και `reaudit_law` για κάθε νόμο. Γράφει μία γραμμή
+    JSON ανά νόμο στο `out`.
+    """
+    index = get_index(background_sync=False)
+    while True:
+        started = time.time()
+        try:
+            index.sync()
+        except Exception as e:
+            log.warning("Sync error: %s", e)
+        todo = list(laws or []) + (index.pending(pending) if pending else [])
+        for num in dict.fromkeys(todo):
+            try:
+                rec = reaudit_law(num, **kwargs)
+            except Exception as e:
+                rec = {"query": num, "status": "error", "error": str(e)}
+            out.write(json.dumps({k: rec.get(k) for k in ("query", "law_num", "status", "score", "changes",
+                                                           "reaudited", "error", "elapsed") if k in rec},
+                                 ensure_ascii=False) + "\n")
+            out.flush()
+        if once: return
+        time.sleep(max(0.0, interval - (time.time() - started)))
+
+
+def run(args):
+    if not args.laws and not args.pending:
+        print("Χρειάζεται --laws ή --pending", file=sys.stderr)
+        return 2
+    limits = {"parliament": TokenBucket(args.api_rate), "gemini": TokenBucket(args.llm_rate)}
+    out = open(args.out, "a", encoding="utf-8") if args.out else sys.stdout
+    try:
+        watch(parse_laws(args.laws) if args.laws else None, args.pending, args.interval, args.once, out=out,
+              limits=limits, revalidate=args.revalidate, model_name=args.model)
+    finally:
+        if args.out: out.close()
+    return 0
+
+
+def add_parser(sub):
+    p = sub.add_parser("watch", help="Επανέλεγχος νόμων όταν αλλάζει ο φάκελός τους")
+    p.add_argument("--laws", help="π.χ. 5100-5105 ή 5100,5101")
+    p.add_argument("--pending", type=int, help="και τα N νεότερα νομοσχέδια χωρίς ψηφισθέντα νόμο")
+    p.add_argument("--interval", type=float, default=WATCH_INTERVAL, help="δευτερόλεπτα ανάμεσα στους γύρους")
+    p.add_argument("--once", action="store_true", help="ένας γύρος και τέλος")
+    p.add_argument("--revalidate", action="store_true", help="έλεγξε και τα γνωστά έγγραφα στο δίκτυο")
+    p.add_argument("--api-rate", type=float, default=2.0, help="αιτήματα/δευτ. στο API της Βουλής")
+    p.add_argument("--llm-rate", type=float, default=0.25, help="κλήσεις/δευτ. στο Gemini (όλων των μοντέλων)")
+    p.add_argument("--model", default=DEFAULT_MODEL, help="όνομα μοντέλου ή \"cascade\" (βλ. nomoskor.models)")
+    p.add_argument("--out", help="αρχείο JSONL (αλλιώς stdout)")
+    p.set_defaults(func=run)
@@ -0,0 +1,163 @@
+"""
+Ουρά εργασιών στο background για τους ελέγχους του Streamlit.
+
+Ο έλεγχος τρέχει σε worker thread του ίδιου process και όχι μέσα στο script
+run του Streamlit, άρα ένα refresh ή δεύτερο κλικ δεν τον ξεκινά από την αρχή.
+Εργασίες με το ίδιο κλειδί (π.χ. ίδιος αριθμός νόμου και επιλογές) που
+τρέχουν ήδη δεν ξαναξεκινούν: όλες οι sessions παρακολουθούν την ίδια.
+
+    job = get_queue().submit(key, fn, *args)   # fn(job, *args)
+    job.snapshot()                              # για polling από το UI
+
+Μέσα στο `fn` η εργασία αναφέρει την πρόοδό της με `job.stage(...)`,
+`job.note(...)` (μηνύματα για το UI, π.χ. ("caption", "...")) και
+`job.append(...)` (κείμενο αναφοράς που γράφεται σταδιακά). Κάθε εργασία
+έχει δικό της `nomoskor.trace.Trace`, ενεργό όσο τρέχει το `fn`, οπότε τα
+`span(...)` μέσα του καταγράφονται σε αυτή.
+"""
+import itertools
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from nomoskor.trace import Trace
+
+MAX_JOBS = 2
+# Ολοκληρωμένη εργασία με το ίδιο κλειδί επιστρέφεται αντί για νέα εκτέλεση
+REUSE_DONE = 10 * 60
+# Μετά από τόσο οι ολοκληρωμένες εργασίες ξεχνιούνται
+KEEP_DONE = 60 * 60
+
+_ids = itertools.count(1)
+
+
+class Job:
+    def __init__(self, key):
+        self.id = f"{int(time.time())}-{next(_ids)}"
+        self.key = key
+        self.status = "queued"      # queued, running, done, error
+        self.stage_text = "Σε αναμονή..."
+        self.progress = 0.0
+        self.notes = []
+        self.partial = []
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self.trace = None
+        self._lock = threading.Lock()
+
+    def stage(self, text, progress=None):
+        with self._lock:
+            self.stage_text = text
+            if progress is not None: self.progress = min(1.0, max(0.0, progress))
+
+    def set_progress(self, progress):
+        with self._lock:
+            self.progress = min(1.0, max(0.0, progress))
+
+    def note(self, kind, text):
+        """`kind`: όνομα συνάρτησης του Streamlit (success, info, caption, warning, error, write)."""
+        with self._lock:
+            self.notes.append((kind, text))
+
+    def append(self, text):
+        with self._lock:
+            self.partial.append(text)
+
+    @property
+    def done(self):
+        return self.status in ("done", "error")
+
+    def snapshot(self):
+        with self._lock:
+            return {"id": self.id, "key": self.key, "status": self.status, "stage": self.stage_text,
+                    "progress": self.progress, "notes": list(self.notes), "partial": "".join(self.partial),
+                    "result": self.result, "error": self.error, "done": self.done,
+                    "elapsed": round((self.finished or time.time()) - self.created, 1),
+                    "trace": self.trace.to_dict() if self.trace and self.done else None}
+
+
+class JobQueue:
+    def __init__(self, workers=MAX_JOBS):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="nomoskor-job")
+        self._jobs = {}
+        self._by_key = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key, fn, *args, fresh=False, **kwargs):
+        """
+        Νέα εργασία `fn(job, *args, **kwargs)`, ή η υπάρχουσα με το ίδιο `key`
+        αν τρέχει ακόμα (ή τελείωσε πρόσφατα και δεν ζητήθηκε `fresh`).
+        """
+        with self._lock:
+            self._forget_old()
+            job = self._by_key.get(key)
+            if job and (not job.done or (not fresh and job.status == "done"
+                                         and time.time() - job.finished < REUSE_DONE)):
+                return job
+            job = Job(key)
+            self._jobs[job.id] = job
+            self._by_key[key] = job
+        self._pool.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job, fn, args, kwargs):
+        trace = Trace("job", key=job.key)
+        with job._lock:
+            job.status = "running"
+            job.trace = trace
+        result, error = None, None
+        trace.start()
+        try:
+            result = fn(job, *args, **kwargs)
+        except Exception as e:
+            traceback.print_exc()
+            error = str(e)
+        finally:
+            trace.finish()
+        with job._lock:
+            job.result, job.error = result, error
+            job.progress, job.finished = 1.0, time.time()
+            job.status = "error" if error else "done"
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def active(self):
+        """Οι εργασίες που δεν έχουν τελειώσει."""
+        with self._lock:
+            return [j for j in self._jobs.values() if not j.done]
+
+    def forget(self, prefix):
+        """
+        Οι ολοκληρωμένες εργασίες με κλειδί που αρχίζει από `prefix` δεν
+        ξαναχρησιμοποιούνται (π.χ. μετά από διαγραφή των αποθηκευμένων ελέγχων).
+        """
+        with self._lock:
+            for key, job in list(self._by_key.items()):
+                if job.done and key.startswith(prefix):
+                    del self._by_key[key]
+
+    def _forget_old(self):
+        now = time.time()
+        for job_id, job in list(self._jobs.items()):
+            if job.done and now - job.finished > KEEP_DONE:
+                del self._jobs[job_id]
+                if self._by_key.get(job.key) is job:
+                    del self._by_key[job.key]
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_queue():
+    """Κοινή ουρά για όλες τις sessions του Streamlit (ίδιο process)."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue()
+    return _queue
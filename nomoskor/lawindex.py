@@ -0,0 +1,231 @@
+"""
+Τοπικό ευρετήριο των νόμων του API της Βουλής.
+
+Τα records του api.ashx αποθηκεύονται σε SQLite και φορτώνονται σε μνήμη με
+ευρετήρια ανά αριθμό νόμου, έτος και λέξεις του τίτλου, ώστε η αναζήτηση να μη
+χρειάζεται δίκτυο. Ο συγχρονισμός γίνεται μία φορά πλήρως (σελίδα-σελίδα) και
+μετά σταδιακά: διαβάζουμε τις πρώτες (νεότερες) σελίδες μέχρι να βρούμε σελίδα
+χωρίς αλλαγές.
+
+Χρήση από τη γραμμή εντολών:  python -m nomoskor.lawindex sync [--full]
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import unicodedata
+from collections import defaultdict
+
+from nomoskor.cache import CACHE_DIR
+from nomoskor.parliament import API_URL, clean_query, fetch_laws, query_year, record_year, select_law
+from nomoskor.httpclient import get_client
+
+DB_PATH = os.path.join(CACHE_DIR, "laws.db")
+PAGE_PARAM = "pageNo"
+# Μετά από πόσο ζητάμε ξανά έναν νόμο από το API (τα νομοσχέδια αποκτούν νέα αρχεία)
+RECORD_TTL = int(os.environ.get("NOMOSKOR_LAW_TTL", str(6 * 3600)))
+# Μικρό timeout για ανανέωση όταν έχουμε ήδη τοπικό αντίγραφο
+REFRESH_TIMEOUT = 5
+
+log = logging.getLogger(__name__)
+
+STOPWORDS = {"κυρωση", "ενσωματωση", "ρυθμισεις", "διαταξεις", "λοιπες", "αλλες",
+             "του", "της", "των", "την", "τον", "και", "για", "με", "στο", "στη", "στην"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS laws (key TEXT PRIMARY KEY, law_num TEXT, year INTEGER, title TEXT,
+                                 data TEXT, digest TEXT, synced REAL);
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def normalize(text):
+    """Πεζά χωρίς τόνους, για σύγκριση λέξεων."""
+    text = unicodedata.normalize("NFD", (text or "").lower())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def tokenize(text):
+    return [w for w in re.findall(r"\w+", normalize(text)) if len(w) > 3 and w not in STOPWORDS]
+
+
+def record_key(law):
+    if law.get("Id"):
+        return str(law["Id"])
+    return f"{law.get('LawNum')}-{record_year(law)}-{hashlib.sha1((law.get('Title') or '').encode()).hexdigest()[:8]}"
+
+
+class LawIndex:
+    def __init__(self, path=DB_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self.records = {}
+        self.synced = {}
+        self.by_num = defaultdict(set)
+        self.by_year = defaultdict(set)
+        self.by_token = defaultdict(set)
+        for key, data, synced in self._db.execute("SELECT key, data, synced FROM laws"):
+            self._index(key, json.loads(data), synced)
+
+    def _index(self, key, law, synced):
+        old = self.records.get(key)
+        if old is not None:
+            self.by_num[str(old.get("LawNum"))].discard(key)
+            self.by_year[record_year(old)].discard(key)
+            for t in set(tokenize(old.get("Title"))): self.by_token[t].discard(key)
+        self.records[key] = law
+        self.synced[key] = synced
+        self.by_num[str(law.get("LawNum"))].add(key)
+        self.by_year[record_year(law)].add(key)
+        for t in set(tokenize(law.get("Title"))): self.by_token[t].add(key)
+
+    def upsert(self, laws):
+        """Αποθηκεύει records του API· επιστρέφει πόσα ήταν νέα ή άλλαξαν."""
+        changed = 0
+        now = time.time()
+        with self._lock:
+            for law in laws:
+                key = record_key(law)
+                data = json.dumps(law, ensure_ascii=False, sort_keys=True)
+                digest = hashlib.sha1(data.encode()).hexdigest()
+                row = self._db.execute("SELECT digest FROM laws WHERE key=?", (key,)).fetchone()
+                if not row or row[0] != digest: changed += 1
+                self._db.execute("INSERT OR REPLACE INTO laws VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                 (key, str(law.get("LawNum")), record_year(law), law.get("Title"), data, digest, now))
+                self._index(key, law, now)
+            self._db.commit()
+        return changed
+
+    # --- αναζήτηση ---
+
+    def by_number(self, law_num, year=None):
+        """Οι νόμοι με αυτόν τον αριθμό (και έτος), νεότεροι πρώτα."""
+        with self._lock:
+            keys = list(self.by_num.get(str(law_num), ()))
+            if year is not None:
+                keys = [k for k in keys if k in self.by_year.get(year, ())]
+            keys.sort(key=lambda k: (-(record_year(self.records[k]) or 0), k))
+            return [self.records[k] for k in keys]
+
+    def search(self, text, limit=20):
+        """Νόμοι ταξινομημένοι κατά πλήθος κοινών λέξεων με τον τίτλο."""
+        scores = defaultdict(int)
+        with self._lock:
+            for t in set(tokenize(text)):
+                for k in self.by_token.get(t, ()): scores[k] += 1
+            best = sorted(scores, key=lambda k: (-scores[k], -(record_year(self.records[k]) or 0)))
+            return [self.records[k] for k in best[:limit]]
+
+    def keywords(self, title, n=6):
+        """Οι πιο "σπάνιες" λέξεις του τίτλου (λιγότερες εμφανίσεις σε άλλους τίτλους)."""
+        # ίδιο split με το `tokenize`, ώστε π.χ. το "νόμος," να βρίσκεται στο by_token ως "νομος"
+        words = [w for w in re.findall(r"\w+", title or "") if len(w) > 3 and normalize(w) not in STOPWORDS]
+        if not self.records:
+            return words[:n]
+        with self._lock:
+            ranked = sorted(range(len(words)), key=lambda i: (len(self.by_token.get(normalize(words[i]), ())), i))
+        return [words[i] for i in sorted(ranked[:n])]
+
+    def find(self, query):
+        """
+        Επιστρέφει το record του νόμου. Χρησιμοποιεί το τοπικό αντίγραφο και
+        ανανεώνει από το API μόνο αν έχει παλιώσει· αν το API αργεί ή είναι
+        εκτός λειτουργίας, επιστρέφεται το τοπικό. Για ελεύθερο κείμενο το
+        τοπικό μετρά μόνο αν ο τίτλος του έχει όλες τις λέξεις της αναζήτησης·
+        αλλιώς ρωτάμε το freetext του API, όπως πριν από το ευρετήριο.
+        """
+        q = clean_query(query)
+        if q.isdigit():
+            local = self.by_number(q, query_year(query))
+        else:
+            words = set(tokenize(q))
+            local = [law for law in self.search(q, limit=1) if words <= set(tokenize(law.get("Title")))]
+        law = local[0] if local else None
+        if law is not None and time.time() - self.synced.get(record_key(law), 0) < RECORD_TTL:
+            return law
+        try:
+            items = fetch_laws(query, timeout=REFRESH_TIMEOUT if law else 30)
+        except Exception:
+            if law is not None: return law
+            raise
+        self.upsert(items)
+        return select_law(items, query) or law
+
+    def pending(self, limit=None):
+        """Αριθμοί νομοσχεδίων σε εξέλιξη (χωρίς VotedLaws), νεότερα πρώτα."""
+        with self._lock:
+            laws = [law for law in self.records.values() if law.get("LawNum") and not law.get("VotedLaws")]
+        laws.sort(key=lambda law: (record_year(law) or 0, str(law["LawNum"]).zfill(8)), reverse=True)
+        return [str(law["LawNum"]) for law in laws[:limit]]
+
+    # --- συγχρονισμός ---
+
+    def _page(self, page, timeout=30):
+        params = {"q": "laws", "format": "json", PAGE_PARAM: page}
+        data = get_client().get(API_URL, params=params, timeout=timeout).json()
+        return data.get("Data") or [], data.get("TotalRecords", 0)
+
+    def sync(self, full=False, max_pages=10000):
+        """Πλήρης ή σταδιακός συγχρονισμός· επιστρέφει πόσα records άλλαξαν."""
+        full = full or not self.records
+        changed = seen = 0
+        for page in range(1, max_pages + 1):
+            items, total = self._page(page)
+            if not items: break
+            n = self.upsert(items)
+            changed += n
+            seen += len(items)
+            if not full and n == 0: break
+            if total and seen >= total: break
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                             ("last_full_sync" if full else "last_sync", str(time.time())))
+            self._db.commit()
+        return changed
+
+    def last_sync(self):
+        with self._lock:
+            rows = dict(self._db.execute("SELECT name, value FROM meta").fetchall())
+        return max(float(rows.get("last_sync", 0)), float(rows.get("last_full_sync", 0)))
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index(background_sync=True):
+    """
+    Κοινό ευρετήριο της διεργασίας. Αν ο τελευταίος συγχρονισμός είναι παλιός,
+    ξεκινά σταδιακή ανανέωση σε background thread.
+    """
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = LawIndex()
+            if background_sync and time.time() - _index.last_sync() > RECORD_TTL:
+                threading.Thread(target=_safe_sync, args=(_index,), daemon=True).start()
+    return _index
+
+
+def _safe_sync(index):
+    try:
+        index.sync()
+    except Exception as e:
+        log.warning("Law index sync error: %s", e)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if len(sys.argv) < 2 or sys.argv[1] != "sync":
+        print("Χρήση: python -m nomoskor.lawindex sync [--full]")
+        sys.exit(1)
+    idx = get_index(background_sync=False)
+    n = idx.sync(full="--full" in sys.argv)
+    print(f"{n} νέοι/αλλαγμένοι νόμοι · {len(idx.records)} συνολικά")
@@ -0,0 +1,461 @@
+"""
+Τα μοντέλα του ελέγχου: backends, όρια και circuit breaker ανά μοντέλο, και
+καταρράκτης (cascade) από το φθηνό προς το ακριβό μοντέλο.
+
+Κάθε backend έχει τη διεπαφή του genai.GenerativeModel που χρησιμοποιεί το
+nomoskor.audit (generate_content με ή χωρίς stream, generate_content_async).
+Το `get_model(name)` διαλέγει backend από το όνομα:
+
+    models/gemini-...            Gemini (google.generativeai)
+    mock:<όνομα>[?επιλογές]      τοπικό, χωρίς δίκτυο (δοκιμές, bench), π.χ.
+                                 mock:small?confidence=0.4&latency=0.2&fail=0.1
+
+Ένα "σχέδιο" (`plan`) είναι λίστα από βαθμίδες (tiers), η καθεμιά με μοντέλα
+που αντικαθιστούν το ένα το άλλο (failover). Με όνομα μοντέλου το σχέδιο έχει
+μία βαθμίδα (το μοντέλο και τα εφεδρικά του)· με "cascade" όλες τις βαθμίδες
+του CASCADE. Ένα αίτημα ξεκινά από την πρώτη βαθμίδα που χωρά το context του
+και ανεβαίνει στην επόμενη μόνο αν η απάντηση έχει χαμηλή βεβαιότητα
+("confidence" < ESCALATE_BELOW) ή αν όλα τα μοντέλα της βαθμίδας είναι εκτός.
+Τα κριτήρια όπου οι κανόνες (nomoskor.rules) είναι σίγουροι δεν φτάνουν καν
+στο μοντέλο.
+
+Κάθε μοντέλο έχει όριο ταυτόχρονων κλήσεων για όλη τη διεργασία και circuit
+breaker: μετά από διαδοχικά σφάλματα ή αργές απαντήσεις "ανοίγει" και οι
+κλήσεις πάνε στο επόμενο μοντέλο μέχρι να περάσει το cooldown.
+"""
+import asyncio
+import contextvars
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from urllib.parse import parse_qsl
+
+CASCADE_NAME = "cascade"
+# Το μοντέλο των UI και του batch όταν δεν δίνεται άλλο· ο καταρράκτης ενεργοποιείται
+# με NOMOSKOR_MODEL=cascade (ή --model cascade)
+DEFAULT_MODEL = os.environ.get("NOMOSKOR_MODEL", "models/gemini-2.0-flash")
+
+# tier: βαθμίδα στον καταρράκτη · context: μέγιστα tokens του prompt που του
+# στέλνουμε · concurrency: ταυτόχρονες κλήσεις ανά διεργασία · slow_after:
+# δευτερόλεπτα μετά τα οποία η κλήση μετρά ως αποτυχία για τον circuit breaker
+MODELS = {
+    "models/gemini-2.0-flash-lite": {"tier": 0, "context": 1000000, "concurrency": 8, "slow_after": 30},
+    "models/gemini-2.0-flash": {"tier": 1, "context": 1000000, "concurrency": 4, "slow_after": 90},
+    "models/gemini-2.0-flash-exp": {"tier": 1, "context": 1000000, "concurrency": 2, "slow_after": 90},
+    "models/gemini-2.5-pro": {"tier": 2, "context": 1000000, "concurrency": 2, "slow_after": 180},
+}
+DEFAULT_SPEC = {"tier": 1, "context": 1000000, "concurrency": 4, "slow_after": 120}
+
+# Ο καταρράκτης αν δεν οριστεί άλλος (π.χ. NOMOSKOR_CASCADE=...flash-lite,...flash,...2.5-pro)
+CASCADE = tuple(n.strip() for n in os.environ.get(
+    "NOMOSKOR_CASCADE", "models/gemini-2.0-flash-lite,models/gemini-2.0-flash").split(",") if n.strip())
+# Εφεδρικά όταν ζητείται συγκεκριμένο μοντέλο
+FALLBACKS = {"models/gemini-2.0-flash": ["models/gemini-2.0-flash-exp"]}
+
+# Κάτω από αυτή τη βεβαιότητα το κριτήριο ξαναστέλνεται στην επόμενη βαθμίδα
+ESCALATE_BELOW = float(os.environ.get("NOMOSKOR_ESCALATE_BELOW", "0.6"))
+# Από αυτή τη βεβαιότητα και πάνω η βαθμολογία των κανόνων κρατιέται χωρίς μοντέλο
+RULES_ACCEPT = 0.9
+
+BREAKER_FAILURES = 3
+BREAKER_COOLDOWN = float(os.environ.get("NOMOSKOR_BREAKER_COOLDOWN", "60"))
+
+
+class ModelUnavailable(RuntimeError):
+    """Κανένα μοντέλο της βαθμίδας δεν δέχεται κλήσεις (circuit breaker ανοιχτός)."""
+
+
+def spec(name):
+    if name in MODELS: return MODELS[name]
+    if not name.startswith("mock:"): return DEFAULT_SPEC
+    s = dict(DEFAULT_SPEC, tier=0)
+    s.update(_mock_spec(name))
+    return s
+
+
+def plan(model_name):
+    """Οι βαθμίδες (λίστες μοντέλων με σειρά failover) για ένα όνομα μοντέλου ή το "cascade"."""
+    if model_name != CASCADE_NAME:
+        return [[model_name] + [n for n in FALLBACKS.get(model_name, []) if n != model_name]]
+    tiers = {}
+    for name in CASCADE:
+        tiers.setdefault(spec(name)["tier"], []).append(name)
+    return [tiers[t] for t in sorted(tiers)]
+
+
+def label(model_name):
+    """Σταθερό όνομα για κλειδιά και αναφορές: το "cascade" μαζί με τα μοντέλα του."""
+    if model_name != CASCADE_NAME: return model_name
+    return CASCADE_NAME + ":" + ">".join("|".join(t) for t in plan(model_name))
+
+
+def fits(names, tokens):
+    """Όσα από τα `names` χωρούν `tokens` στο context τους και δεν έχουν ανοιχτό breaker."""
+    return [n for n in names if spec(n)["context"] >= tokens and health(n).breaker.available()]
+
+
+def chain(tiers, tokens):
+    """Όλα τα μοντέλα που χωρούν τα `tokens`, από τη φθηνότερη βαθμίδα προς την ακριβότερη."""
+    return [name for names in tiers for name in fits(names, tokens)]
+
+
+def confidence(item, default=0.5):
+    try:
+        return float(item.get("confidence"))
+    except (AttributeError, TypeError, ValueError):
+        return default
+
+
+def confident(item):
+    return confidence(item) >= ESCALATE_BELOW
+
+
+# =============================================================================
+# Circuit breaker και όριο ταυτοχρονίας
+# =============================================================================
+
+class CircuitBreaker:
+    """
+    closed: οι κλήσεις περνούν · open: μετά από `failures` διαδοχικές αποτυχίες
+    (σφάλματα ή κλήσεις πάνω από `slow_after` δευτ.) καμία κλήση για `cooldown`
+    δευτ. · half_open: μετά το cooldown περνά μία δοκιμαστική κλήση· αν πετύχει
+    κλείνει, αλλιώς ανοίγει ξανά.
+    """
+
+    def __init__(self, failures=BREAKER_FAILURES, cooldown=BREAKER_COOLDOWN, slow_after=None):
+        self.threshold = failures
+        self.cooldown = cooldown
+        self.slow_after = slow_after
+        self.failures = 0
+        self.opened = None
+        self._probe = False
+        self._lock = threading.Lock()
+
+    def _state(self):
+        if self.opened is None: return "closed"
+        return "half_open" if time.monotonic() - self.opened >= self.cooldown else "open"
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def available(self):
+        """Αν μια κλήση θα περνούσε τώρα (χωρίς να δεσμεύει τη δοκιμαστική κλήση)."""
+        with self._lock:
+            state = self._state()
+            return state == "closed" or (state == "half_open" and not self._probe)
+
+    def allow(self):
+        with self._lock:
+            state = self._state()
+            if state == "closed": return True
+            if state == "open" or self._probe: return False
+            self._probe = True
+            return True
+
+    def record(self, ok, seconds=0.0):
+        slow = ok and self.slow_after is not None and seconds > self.slow_after
+        with self._lock:
+            probe, self._probe = self._probe, False
+            if ok and not slow:
+                self.failures = 0
+                self.opened = None
+                return
+            self.failures += 1
+            if probe or self.failures >= self.threshold:
+                self.opened = time.monotonic()
+
+
+class Slots:
+    """
+    Semaphore κοινό για threads και event loops (το καθένα στο δικό του thread).
+    Όποιος περιμένει μπαίνει σε ουρά και το `release` του δίνει απευθείας το
+    slot, χωρίς polling.
+    """
+
+    def __init__(self, n):
+        self.free = n
+        self._waiters = deque()
+        self._lock = threading.Lock()
+
+    def _take(self):
+        if self.free and not self._waiters:
+            self.free -= 1
+            return True
+        return False
+
+    def acquire(self):
+        with self._lock:
+            if self._take(): return
+            event = threading.Event()
+            self._waiters.append(event.set)
+        event.wait()
+
+    async def acquire_async(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._take(): return
+            fut = loop.create_future()
+
+            def wake():
+                loop.call_soon_threadsafe(lambda: fut.done() or fut.set_result(None))
+
+            self._waiters.append(wake)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            with self._lock:
+                waiting = wake in self._waiters
+                if waiting: self._waiters.remove(wake)
+            if not waiting: self.release()  # το slot είχε ήδη δοθεί σε εμάς
+            raise
+
+    def release(self):
+        with self._lock:
+            if not self._waiters:
+                self.free += 1
+                return
+            wake = self._waiters.popleft()
+        wake()
+
+
+class ModelHealth:
+    """Ο breaker και το όριο ταυτόχρονων κλήσεων ενός μοντέλου, κοινά για όλη τη διεργασία."""
+
+    def __init__(self, name):
+        s = spec(name)
+        self.name = name
+        self.concurrency = s["concurrency"]
+        self.breaker = CircuitBreaker(slow_after=s["slow_after"])
+        self.in_flight = 0
+        self.calls = self.errors = 0
+        self._slots = Slots(self.concurrency)
+        self._lock = threading.Lock()
+
+    def _begin(self):
+        with self._lock:
+            self.in_flight += 1
+            self.calls += 1
+        # "seconds": ο καλών μπορεί να δώσει μόνο τον χρόνο του μοντέλου (βλ. `stream`)
+        return {"started": time.monotonic(), "seconds": None}
+
+    def _end(self, call, ok):
+        with self._lock:
+            self.in_flight -= 1
+            self.errors += not ok
+        self._slots.release()
+        seconds = call["seconds"]
+        self.breaker.record(ok, time.monotonic() - call["started"] if seconds is None else seconds)
+
+    @contextmanager
+    def slot(self):
+        if not self.breaker.allow():
+            raise ModelUnavailable(f"{self.name}: circuit open")
+        self._slots.acquire()
+        call, ok = self._begin(), False
+        try:
+            yield call
+            ok = True
+        except GeneratorExit:
+            ok = True  # ο καλών σταμάτησε να διαβάζει το stream· δεν φταίει το μοντέλο
+            raise
+        finally:
+            self._end(call, ok)
+
+    @asynccontextmanager
+    async def aslot(self):
+        if not self.breaker.allow():
+            raise ModelUnavailable(f"{self.name}: circuit open")
+        await self._slots.acquire_async()
+        call, ok = self._begin(), False
+        try:
+            yield call
+            ok = True
+        finally:
+            self._end(call, ok)
+
+    def status(self):
+        with self._lock:
+            return {"model": self.name, "state": self.breaker.state, "in_flight": self.in_flight,
+                    "limit": self.concurrency, "calls": self.calls, "errors": self.errors}
+
+
+_health = {}
+_health_lock = threading.Lock()
+_rate_limit = contextvars.ContextVar("nomoskor_model_rate_limit", default=None)
+
+
+def health(name):
+    with _health_lock:
+        if name not in _health:
+            _health[name] = ModelHealth(name)
+        return _health[name]
+
+
+def status():
+    """Η κατάσταση κάθε μοντέλου που έχει χρησιμοποιηθεί (για το UI)."""
+    with _health_lock:
+        items = list(_health.values())
+    return [h.status() for h in items]
+
+
+# =============================================================================
+# Κλήσεις
+# =============================================================================
+
+@contextmanager
+def rate_limited(bucket):
+    """
+    Κάθε κλήση σε μοντέλο μέσα στο block (και στα asyncio tasks του) περιμένει
+    πρώτα ένα token από το `bucket` (nomoskor.ratelimit.TokenBucket ή None).
+    """
+    token = _rate_limit.set(bucket)
+    try:
+        yield
+    finally:
+        _rate_limit.reset(token)
+
+
+def get_model(name):
+    """Το backend για ένα όνομα μοντέλου· το nomoskor.bench το αντικαθιστά με τοπικό."""
+    if name.startswith("mock:"):
+        return MockModel(name, **_mock_options(name))
+    import google.generativeai as genai
+    return genai.GenerativeModel(name)
+
+
+def stream(name, contents):
+    """
+    Streaming κλήση μέσα στο όριο και τον breaker του μοντέλου (generator από
+    chunks). Ο breaker μετρά μόνο την αναμονή για τα chunks, όχι τον χρόνο που
+    ο καλών (π.χ. το UI) αφιερώνει σε κάθε chunk.
+    """
+    bucket = _rate_limit.get()
+    if bucket is not None: bucket.acquire()
+    with health(name).slot() as call:
+        started = time.monotonic()
+        chunks = iter(get_model(name).generate_content(contents, stream=True))
+        call["seconds"] = time.monotonic() - started
+        while True:
+            started = time.monotonic()
+            chunk = next(chunks, None)
+            call["seconds"] += time.monotonic() - started
+            if chunk is None: return
+            yield chunk
+
+
+async def generate_async(name, contents):
+    bucket = _rate_limit.get()
+    if bucket is not None: await bucket.acquire_async()
+    async with health(name).aslot():
+        return await get_model(name).generate_content_async(contents)
+
+
+# =============================================================================
+# Τοπικό backend
+# =============================================================================
+
+class _Usage:
+    def __init__(self, prompt, output):
+        self.prompt_token_count = prompt
+        self.candidates_token_count = output
+        self.total_token_count = prompt + output
+
+
+class _Chunk:
+    def __init__(self, text, usage=None):
+        self.text = text
+        self.usage_metadata = usage
+
+
+CRITERIA_LIST_RE = re.compile(r"ΚΡΙΤΗΡΙΑ \(.*?\n((?:\d+\. [^\n]+\n)+)")
+CRITERION_RE = re.compile(r"ΚΡΙΤΗΡΙΟ (\d+)\. ([^\n]+)")
+PILLAR_RE = re.compile(r"ΠΥΛΩΝΑΣ ([^:\n]+): ([^\n]+)")
+LIST_RE = re.compile(r"^(\d+)\. (.+)$", re.M)
+
+
+class MockModel:
+    """
+    Τοπικό μοντέλο με τη διεπαφή του genai.GenerativeModel. Με `text` δίνει
+    πάντα αυτή την απάντηση· αλλιώς φτιάχνει έγκυρο JSON για το prompt που
+    πήρε (ένα κριτήριο, πυλώνας, πόρισμα ή όλα τα κριτήρια), ντετερμινιστικά
+    από το hash του prompt. `latency`: δευτερόλεπτα ανά κλήση, μοιρασμένα στα
+    chunks του streaming· `fail`: πιθανότητα σφάλματος· `confidence`: η
+    βεβαιότητα που δηλώνει.
+    """
+
+    def __init__(self, name="mock:local", text=None, latency=0.0, fail=0.0, confidence=0.8, chunk_chars=400):
+        self.model_name = name
+        self.text = text
+        self.latency = float(latency)
+        self.fail = float(fail)
+        self.confidence = float(confidence)
+        self.chunk_chars = int(chunk_chars)
+
+    def _check(self):
+        if self.fail and random.random() < self.fail:
+            raise RuntimeError(f"{self.model_name}: simulated failure")
+
+    def _usage(self, contents, text):
+        return _Usage(len(str(contents)) // 4, len(text) // 4)
+
+    def respond(self, contents):
+        if self.text is not None: return self.text
+        prompt = "".join(p for p in contents if isinstance(p, str)) if isinstance(contents, list) else str(contents)
+        rng = random.Random(hashlib.sha1(prompt.encode("utf-8")).hexdigest())
+        m = CRITERIA_LIST_RE.search(prompt)
+        if m:
+            items = [self._criterion(rng, i, t.strip()) for i, t in LIST_RE.findall(m.group(1))]
+            return json.dumps({"criteria": items, "summary": f"Πόρισμα ({self.model_name})."}, ensure_ascii=False)
+        m = CRITERION_RE.search(prompt)
+        if m: return json.dumps(self._criterion(rng, m.group(1), m.group(2).strip()), ensure_ascii=False)
+        m = PILLAR_RE.search(prompt)
+        if m:
+            return json.dumps({"id": m.group(1).strip(), "title": m.group(2).strip(),
+                               "findings": f"Ευρήματα ({self.model_name})."}, ensure_ascii=False)
+        return f"Συνολικό πόρισμα ({self.model_name})."
+
+    def _criterion(self, rng, cid, title):
+        val = rng.choice((0, 0.5, 1))
+        return {"id": cid, "title": title, "score_text": {0: "ΟΧΙ", 0.5: "ΜΕΡΙΚΩΣ", 1: "ΝΑΙ"}[val],
+                "score_val": val, "confidence": self.confidence, "reason": f"Αξιολόγηση από {self.model_name}."}
+
+    def generate_content(self, contents, stream=False):
+        if not stream:
+            time.sleep(self.latency)
+            self._check()
+            text = self.respond(contents)
+            return _Chunk(text, self._usage(contents, text))
+        return self._stream(contents)
+
+    def _stream(self, contents):
+        self._check()
+        text = self.respond(contents)
+        pieces = [text[i:i + self.chunk_chars] for i in range(0, len(text), self.chunk_chars)] or [""]
+        for i, piece in enumerate(pieces):
+            time.sleep(self.latency / len(pieces))
+            yield _Chunk(piece, self._usage(contents, text) if i == len(pieces) - 1 else None)
+
+    async def generate_content_async(self, contents):
+        await asyncio.sleep(self.latency)
+        self._check()
+        text = self.respond(contents)
+        return _Chunk(text, self._usage(contents, text))
+
+
+def _mock_options(name):
+    _, _, query = name.partition("?")
+    return {k: v for k, v in parse_qsl(query) if k in ("latency", "fail", "confidence", "chunk_chars")}
+
+
+def _mock_spec(name):
+    _, _, query = name.partition("?")
+    return {k: int(v) if k != "slow_after" else float(v) for k, v in parse_qsl(query)
+            if k in ("tier", "context", "concurrency", "slow_after")}
@@ -0,0 +1,140 @@
+"""
+Τοπικό OCR για σκαναρισμένα PDF, χωρίς δίκτυο και χωρίς GPU.
+
+Κάθε σελίδα γίνεται εικόνα (pypdfium2, αλλιώς pdf2image/poppler) και περνά από
+το tesseract με ελληνικά. Οι σελίδες μοιράζονται σε process pool, ώστε να
+δουλεύουν όλοι οι πυρήνες, και το κείμενο κάθε σελίδας μένει στην cache με
+κλειδί το sha256 του PDF. Όλα τα πακέτα είναι προαιρετικά· αν λείπουν,
+`available()` επιστρέφει False και τα σκαναρισμένα πάνε στο Gemini όπως πριν.
+
+    pip install pypdfium2 pytesseract      # + apt install tesseract-ocr-ell
+"""
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from nomoskor.documents import join_pages
+
+OCR_LANG = os.environ.get("NOMOSKOR_OCR_LANG", "ell+eng")
+OCR_DPI = int(os.environ.get("NOMOSKOR_OCR_DPI", "200"))
+# Το OCR είναι αργό· πέρα από τόσες σελίδες ανά έγγραφο σταματάμε
+OCR_MAX_PAGES = int(os.environ.get("NOMOSKOR_OCR_MAX_PAGES", "60"))
+OCR_WORKERS = int(os.environ.get("NOMOSKOR_OCR_WORKERS", str(os.cpu_count() or 1)))
+
+_available = None
+_available_lock = threading.Lock()
+
+
+def _rasterizer():
+    try:
+        import pypdfium2  # noqa: F401
+        return "pdfium"
+    except ImportError:
+        pass
+    try:
+        import pdf2image  # noqa: F401
+        return "poppler"
+    except ImportError:
+        return None
+
+
+def available():
+    """True αν υπάρχουν rasterizer, pytesseract και το tesseract με τις γλώσσες του OCR_LANG."""
+    global _available
+    with _available_lock:
+        if _available is None:
+            _available = False
+            if os.environ.get("NOMOSKOR_LOCAL_OCR", "1") != "0" and _rasterizer():
+                try:
+                    import pytesseract
+                    langs = set(pytesseract.get_languages(config=""))
+                    _available = all(l in langs for l in OCR_LANG.split("+"))
+                except Exception:
+                    pass
+    return _available
+
+
+def page_count(source):
+    """Πλήθος σελίδων (`source`: διαδρομή ή bytes)."""
+    from io import BytesIO
+    from pypdf import PdfReader
+
+    try:
+        return len(PdfReader(BytesIO(source) if isinstance(source, (bytes, bytearray)) else source).pages)
+    except Exception:
+        return 0
+
+
+def _render(source, index, dpi):
+    if _rasterizer() == "pdfium":
+        import pypdfium2 as pdfium
+
+        pdf = pdfium.PdfDocument(source)
+        try:
+            return pdf[index].render(scale=dpi / 72).to_pil()
+        finally:
+            pdf.close()
+    from pdf2image import convert_from_bytes, convert_from_path
+
+    convert = convert_from_bytes if isinstance(source, (bytes, bytearray)) else convert_from_path
+    return convert(source, dpi=dpi, first_page=index + 1, last_page=index + 1)[0]
+
+
+def ocr_page(source, index, lang=OCR_LANG, dpi=OCR_DPI):
+    """OCR μίας σελίδας· τρέχει σε ξεχωριστό process."""
+    import pytesseract
+
+    image = _render(source, index, dpi)
+    return pytesseract.image_to_string(image.convert("L"), lang=lang) or ""
+
+
+def _variant(index, lang, dpi):
+    return f"ocr-{lang}-{dpi}-p{index}"
+
+
+def ocr_pdf(source, sha=None, cache=None, max_pages=None, clean=False, char_budget=None, executor=None,
+            lang=OCR_LANG, dpi=OCR_DPI):
+    """
+    OCR όλου του PDF (`source`: διαδρομή ή bytes), σελίδα-σελίδα παράλληλα.
+
+    Με `executor` χρησιμοποιείται ο δοσμένος process pool (π.χ. αυτός του
+    `iter_bundle`), αλλιώς φτιάχνεται ένας για την κλήση. Με `cache` και `sha`
+    οι σελίδες που έχουν ήδη διαβαστεί δεν ξαναπερνούν από OCR. Επιστρέφει
+    dict με "text", "page_offsets", "pages_parsed", "page_count" όπως το
+    `pipeline.extract`.
+    """
+    count = page_count(source)
+    limit = min(count, max_pages or OCR_MAX_PAGES, OCR_MAX_PAGES)
+    texts = [None] * limit
+    if cache is not None and sha:
+        for i in range(limit):
+            texts[i] = cache.get_text(sha, _variant(i, lang, dpi))
+
+    todo = [i for i in range(limit) if texts[i] is None]
+    if todo:
+        own = executor is None
+        pool = ProcessPoolExecutor(max_workers=min(OCR_WORKERS, len(todo))) if own else executor
+        try:
+            jobs = {i: pool.submit(ocr_page, source, i, lang, dpi) for i in todo}
+            for i, job in jobs.items():
+                try:
+                    texts[i] = job.result()
+                except Exception:
+                    texts[i] = ""
+                    continue
+                if cache is not None and sha:
+                    cache.put_text(sha, _variant(i, lang, dpi), texts[i])
+        finally:
+            if own: pool.shutdown()
+
+    parts = []
+    chars = 0
+    for t in texts:
+        if char_budget is not None and chars >= char_budget: break
+        if clean:
+            t = re.sub(r'\s+', ' ', t).strip()
+        parts.append(t)
+        chars += len(t)
+    text, offsets = join_pages(parts, " " if clean else "")
+    return {"text": text, "page_offsets": offsets, "pages_parsed": len(parts), "page_count": count}
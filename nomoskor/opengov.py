@@ -0,0 +1,415 @@
+"""
+Διαβούλευση στο opengov.gr: τοπικό ευρετήριο των διαβουλεύσεων και ανάγνωση
+της σελίδας μιας διαβούλευσης.
+
+Οι λίστες διαβουλεύσεων του opengov.gr αποθηκεύονται σε SQLite (τίτλος,
+υπουργείο, έναρξη/λήξη, URL) και φορτώνονται σε μνήμη με ευρετήριο τριγράμμων
+των λέξεων του τίτλου, ώστε η αντιστοίχιση ενός νόμου με τη διαβούλευσή του να
+είναι τοπικό query και όχι αναζήτηση στο Google. Ο συγχρονισμός διαβάζει τις
+πρώτες (νεότερες) σελίδες της λίστας μέχρι να βρει σελίδα χωρίς νέες
+διαβουλεύσεις· οι ημερομηνίες διαβάζονται από τη σελίδα κάθε διαβούλευσης.
+
+Για την ανάλυση HTML χρησιμοποιείται το selectolax ή το lxml αν υπάρχουν,
+αλλιώς το html.parser του BeautifulSoup.
+
+Χρήση από τη γραμμή εντολών:  python -m nomoskor.opengov sync [--full]
+                                python -m nomoskor.opengov find "τίτλος νόμου"
+"""
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import urllib.parse
+from collections import defaultdict
+from datetime import date
+
+from nomoskor.cache import CACHE_DIR
+from nomoskor.httpclient import get_client
+from nomoskor.lawindex import get_index, normalize, tokenize
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8"
+}
+
+DB_PATH = os.path.join(CACHE_DIR, "opengov.db")
+LISTING_URL = os.environ.get("NOMOSKOR_OPENGOV_LISTING", "https://www.opengov.gr/home/category/consultations")
+# Μετά από τόσο ξανακοιτάμε τη λίστα για νέες διαβουλεύσεις
+SYNC_TTL = int(os.environ.get("NOMOSKOR_OPENGOV_TTL", str(6 * 3600)))
+# Σελίδες διαβουλεύσεων (για τις ημερομηνίες) ανά συγχρονισμό· οι υπόλοιπες στον επόμενο
+MAX_DETAILS = 200
+# Σελίδες της λίστας ανά συγχρονισμό στο background (η πρώτη φορά δεν διασχίζει όλο το αρχείο·
+# μέχρι το `python -m nomoskor.opengov sync --full` το find συμπληρώνει με αναζήτηση στο Google)
+BACKGROUND_PAGES = 20
+# Κάτω από αυτή την ομοιότητα (Dice τριγράμμων) δεν θεωρούμε ότι βρέθηκε η διαβούλευση
+MIN_SCORE = 0.35
+
+log = logging.getLogger(__name__)
+
+# Το κείμενο της σελίδας κόβεται εδώ πριν πάει στο μοντέλο
+MAX_CHARS = 20000
+DATE_RE = re.compile(r"\b(\d{1,2}[./-]\d{1,2}[./-]\d{2,4})\b")
+
+CONSULTATION_RE = re.compile(r"https?://(?:www\.)?opengov\.gr/([\w-]+)/\?p=(\d+)")
+# Το κυρίως κείμενο της σελίδας (CSS για selectolax/BeautifulSoup, XPath για lxml)
+CONTENT = [("div.post", "//div[contains(concat(' ', normalize-space(@class), ' '), ' post ')]"),
+           ("#content", "//*[@id='content']"),
+           ("article", "//article")]
+DROP = ("script", "style", "nav", "footer")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS consultations (url TEXT PRIMARY KEY, title TEXT, ministry TEXT,
+                                          start TEXT, end TEXT, synced REAL);
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+# --- Ανάλυση HTML ---
+
+def _backend():
+    wanted = os.environ.get("NOMOSKOR_HTML_PARSER")
+    for name in ("selectolax", "lxml"):
+        if wanted and wanted != name: continue
+        try:
+            __import__("selectolax.lexbor" if name == "selectolax" else "lxml.html")
+            return name
+        except ImportError:
+            pass
+    return "html.parser"
+
+
+PARSER = _backend()
+
+
+def page_text(html):
+    """Το κείμενο του κυρίως περιεχομένου (ή όλης της σελίδας), χωρίς scripts/μενού."""
+    if isinstance(html, bytes): html = html.decode("utf-8", "replace")
+    if PARSER == "selectolax":
+        from selectolax.lexbor import LexborHTMLParser as HTMLParser
+        tree = HTMLParser(html)
+        tree.strip_tags(list(DROP))
+        node = next((n for n in (tree.css_first(css) for css, _ in CONTENT) if n is not None), tree.body)
+        text = node.text(separator=" ") if node is not None else ""
+    elif PARSER == "lxml":
+        import lxml.html
+        doc = lxml.html.fromstring(html or "<html></html>")
+        for el in doc.xpath("|".join(f"//{t}" for t in DROP)): el.drop_tree()
+        node = next((n[0] for n in (doc.xpath(xp) for _, xp in CONTENT) if n), doc)
+        text = " ".join(node.itertext())
+    else:
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(html, "html.parser")
+        for s in soup(list(DROP)): s.decompose()
+        node = next((n for n in (soup.select_one(css) for css, _ in CONTENT) if n is not None), soup)
+        text = node.get_text(" ")
+    return " ".join(text.split())
+
+
+def page_links(html):
+    """[(href, κείμενο)] όλων των συνδέσμων."""
+    if isinstance(html, bytes): html = html.decode("utf-8", "replace")
+    if PARSER == "selectolax":
+        from selectolax.lexbor import LexborHTMLParser as HTMLParser
+        return [(a.attributes.get("href") or "", a.text(separator=" ").strip()) for a in HTMLParser(html).css("a[href]")]
+    if PARSER == "lxml":
+        import lxml.html
+        doc = lxml.html.fromstring(html or "<html></html>")
+        return [(a.get("href") or "", a.text_content().strip()) for a in doc.xpath("//a[@href]")]
+    from bs4 import BeautifulSoup
+    return [(a["href"], a.get_text(" ").strip()) for a in BeautifulSoup(html, "html.parser").find_all("a", href=True)]
+
+
+# --- Ημερομηνίες ---
+
+MONTHS = {"ιανουαριου": 1, "φεβρουαριου": 2, "μαρτιου": 3, "απριλιου": 4, "μαιου": 5, "ιουνιου": 6,
+          "ιουλιου": 7, "αυγουστου": 8, "σεπτεμβριου": 9, "οκτωβριου": 10, "νοεμβριου": 11, "δεκεμβριου": 12}
+# Σε κείμενο πεζό χωρίς τόνους (lawindex.normalize, ίδιο μήκος με το αρχικό)
+ANY_DATE_RE = re.compile(r"\b(\d{1,2})[./-](\d{1,2})[./-](\d{4}|\d{2})\b|"
+                         r"\b(\d{1,2})(?:η|ης)?\s+(" + "|".join(MONTHS) + r")\s+(\d{4})\b")
+# Ολόκληρες λέξεις· το συχνό "από" μετράει μόνο ακριβώς πριν την ημερομηνία ("από την Τρίτη 12 ...")
+START_RE = re.compile(r"(?:\b(?:εναρξη|ξεκινα|αρχιζει)\b\W+(?:\w+\W+){0,6}|\bαπο\W+(?:\w+\W+){0,2})$")
+END_RE = re.compile(r"\b(?:ληξη|λη[γξ]ει|ολοκληρωνεται|εως|μεχρι)\b\W+(?:\w+\W+){0,6}$")
+
+
+def _date(m):
+    if m.group(1):
+        d, mo, y = int(m.group(1)), int(m.group(2)), int(m.group(3))
+        if y < 100: y += 2000
+    else:
+        d, mo, y = int(m.group(4)), MONTHS[m.group(5)], int(m.group(6))
+    try:
+        return date(y, mo, d)
+    except ValueError:
+        return None
+
+
+def period(text):
+    """
+    (έναρξη, λήξη) της διαβούλευσης από φράσεις όπως "Έναρξη ... 12/03/2024",
+    "από την Τρίτη 12 Μαρτίου 2024 ... έως ..." ή "ξεκινά ... ολοκληρώνεται ...".
+    Κάθε ημερομηνία χαρακτηρίζεται από τις λίγες λέξεις που προηγούνται· (None, None)
+    αν δεν βρεθεί έναρξη και λήξη.
+    """
+    norm = normalize(text)
+    start = end = None
+    for m in ANY_DATE_RE.finditer(norm):
+        before = norm[max(0, m.start() - 80):m.start()]
+        d = _date(m)
+        if d is None: continue
+        if start is None and START_RE.search(before):
+            start = d
+        elif start is not None and END_RE.search(before) and d >= start:
+            end = d
+            break
+    return (start, end) if start and end else (None, None)
+
+
+# --- Ευρετήριο διαβουλεύσεων ---
+
+def trigrams(text):
+    grams = set()
+    for w in tokenize(text):
+        w = f" {w} "
+        grams.update(w[i:i + 3] for i in range(len(w) - 2))
+    return grams
+
+
+class ConsultationIndex:
+    def __init__(self, path=DB_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self.records = {}
+        self.grams = {}
+        self.by_gram = defaultdict(set)
+        for url, title, ministry, start, end, synced in self._db.execute("SELECT * FROM consultations"):
+            self._index({"url": url, "title": title, "ministry": ministry, "start": start, "end": end})
+
+    def _index(self, c):
+        url = c["url"]
+        for g in self.grams.get(url, ()): self.by_gram[g].discard(url)
+        self.records[url] = c
+        self.grams[url] = trigrams(c["title"])
+        for g in self.grams[url]: self.by_gram[g].add(url)
+
+    def upsert(self, items):
+        """Αποθηκεύει διαβουλεύσεις· όσα πεδία λείπουν κρατούν την παλιά τιμή. Επιστρέφει πόσες ήταν νέες."""
+        new = 0
+        now = time.time()
+        with self._lock:
+            for item in items:
+                old = self.records.get(item["url"])
+                if old is None: new += 1
+                c = dict(old or {"title": "", "ministry": None, "start": None, "end": None})
+                c.update({k: v for k, v in item.items() if v})
+                self._db.execute("INSERT OR REPLACE INTO consultations VALUES (?, ?, ?, ?, ?, ?)",
+                                 (c["url"], c["title"], c["ministry"], c["start"], c["end"], now))
+                self._index(c)
+            self._db.commit()
+        return new
+
+    def get(self, url):
+        with self._lock:
+            return self.records.get(url)
+
+    def match(self, title, year=None, limit=5):
+        """
+        [(ομοιότητα, διαβούλευση)] ταξινομημένα, με ομοιότητα Dice στα τρίγραμμα
+        των λέξεων του τίτλου. Με `year` (έτος του νόμου) κρατάμε διαβουλεύσεις
+        που ξεκίνησαν το ίδιο ή το προηγούμενο έτος.
+        """
+        query = trigrams(title)
+        if not query: return []
+        shared = defaultdict(int)
+        with self._lock:
+            for g in query:
+                for url in self.by_gram.get(g, ()): shared[url] += 1
+            scored = []
+            for url, n in shared.items():
+                c = self.records[url]
+                if year and c["start"] and not year - 1 <= int(c["start"][:4]) <= year: continue
+                scored.append((round(2 * n / (len(query) + len(self.grams[url])), 3), c))
+        # ίδια ομοιότητα: η πιο πρόσφατη
+        scored.sort(key=lambda sc: (sc[0], sc[1]["start"] or ""), reverse=True)
+        return scored[:limit]
+
+    def best(self, title, year=None, min_score=MIN_SCORE):
+        found = self.match(title, year, limit=1)
+        return found[0][1] if found and found[0][0] >= min_score else None
+
+    # --- συγχρονισμός ---
+
+    def _listing(self, page):
+        url = LISTING_URL if page == 1 else f"{LISTING_URL.rstrip('/')}/page/{page}/"
+        res = get_client().get(url, headers=HEADERS, timeout=30)
+        if res.status_code == 404: return []
+        res.raise_for_status()
+        found = {}
+        for href, text in page_links(res.content):
+            m = CONSULTATION_RE.match(href)
+            if not m: continue
+            link = m.group(0)
+            # ο ίδιος σύνδεσμος εμφανίζεται και ως "Περισσότερα"· κρατάμε το μεγαλύτερο κείμενο
+            if len(text) > len(found.get(link, {}).get("title", "")):
+                found[link] = {"url": link, "title": text, "ministry": m.group(1)}
+        return list(found.values())
+
+    def fetch_details(self, url):
+        """Τίτλος/ημερομηνίες από τη σελίδα της διαβούλευσης· ενημερώνει το ευρετήριο."""
+        res = get_client().get(url, headers=HEADERS, timeout=30)
+        res.raise_for_status()
+        start, end = period(page_text(res.content))
+        item = {"url": url, "start": start and start.isoformat(), "end": end and end.isoformat()}
+        self.upsert([item])
+        return self.get(url)
+
+    def sync(self, full=False, max_pages=1000, max_details=MAX_DETAILS):
+        """Πλήρης ή σταδιακός συγχρονισμός· επιστρέφει πόσες διαβουλεύσεις ήταν νέες."""
+        full = full or not self.records
+        new = 0
+        exhausted = False
+        for page in range(1, max_pages + 1):
+            items = self._listing(page)
+            if not items:
+                exhausted = True
+                break
+            n = self.upsert(items)
+            new += n
+            if not full and n == 0: break
+        with self._lock:
+            missing = [u for u, c in self.records.items() if not c["end"]]
+        # οι νεότερες πρώτα (μεγαλύτερο ?p=)
+        missing.sort(key=lambda u: -int(CONSULTATION_RE.match(u).group(2)) if CONSULTATION_RE.match(u) else 0)
+        for url in missing[:max_details]:
+            try:
+                self.fetch_details(url)
+            except Exception as e:
+                log.warning("Opengov %s: %s", url, e)
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                             ("last_full_sync" if full and exhausted else "last_sync", str(time.time())))
+            self._db.commit()
+        return new
+
+    def last_sync(self):
+        with self._lock:
+            rows = dict(self._db.execute("SELECT name, value FROM meta").fetchall())
+        return max(float(rows.get("last_sync", 0)), float(rows.get("last_full_sync", 0)))
+
+    def complete(self):
+        """Αν έχει διαβαστεί ποτέ όλη η λίστα (sync --full)· μόνο τότε η απουσία από το ευρετήριο σημαίνει κάτι."""
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM meta WHERE name='last_full_sync'").fetchone() is not None
+
+
+_consultations = None
+_consultations_lock = threading.Lock()
+
+
+def get_consultations(background_sync=True):
+    """Κοινό ευρετήριο διαβουλεύσεων· αν έχει παλιώσει, ανανεώνεται σε background thread."""
+    global _consultations
+    with _consultations_lock:
+        if _consultations is None:
+            _consultations = ConsultationIndex()
+            if background_sync and time.time() - _consultations.last_sync() > SYNC_TTL:
+                threading.Thread(target=_safe_sync, args=(_consultations,), daemon=True).start()
+    return _consultations
+
+
+def _safe_sync(index):
+    try:
+        index.sync(max_pages=BACKGROUND_PAGES)
+    except Exception as e:
+        log.warning("Opengov sync error: %s", e)
+
+
+# --- Εύρεση και ανάγνωση ---
+
+def _google(law_title, year=None):
+    """Η παλιά αναζήτηση στο Google, όσο το ευρετήριο δεν έχει όλες τις διαβουλεύσεις."""
+    keywords = get_index().keywords(law_title, n=6)
+    if year: keywords.append(str(year))
+    search_query = " ".join(keywords)
+
+    query = f"site:opengov.gr {search_query} διαβούλευση"
+    url = f"https://www.google.com/search?q={urllib.parse.quote(query)}"
+
+    try:
+        res = get_client().get(url, headers=HEADERS, timeout=10, retries=1)
+        for href, _ in page_links(res.text):
+            if "opengov.gr" in href and "google" not in href:
+                return href
+            if "/url?q=" in href and "opengov.gr" in href:
+                return href.split("/url?q=")[1].split("&")[0]
+    except Exception:
+        pass
+    return None
+
+
+def lookup(law_title, year=None):
+    """Η διαβούλευση (dict με url, title, ministry, start, end) για τον τίτλο ενός νόμου, ή None."""
+    return get_consultations().best(law_title or "", year)
+
+
+def find(law_title, year=None):
+    """Το URL της διαβούλευσης για τον τίτλο ενός νόμου (του έτους `year` ή του προηγούμενου)."""
+    index = get_consultations()
+    c = index.best(law_title or "", year)
+    if c: return c["url"]
+    # παλιότερες διαβουλεύσεις λείπουν μέχρι ένα πλήρη συγχρονισμό (το background διαβάζει λίγες σελίδες)
+    return None if index.complete() else _google(law_title, year)
+
+
+def dates_of(c):
+    """[έναρξη, λήξη] μιας διαβούλευσης του ευρετηρίου ως dd/mm/yyyy (όπως τα δέχεται το rules)."""
+    if not c or not c["start"] or not c["end"]: return []
+    return [date.fromisoformat(c[k]).strftime("%d/%m/%Y") for k in ("start", "end")]
+
+
+def parse(html):
+    """(κείμενο σελίδας, έναρξη, λήξη)· οι ημερομηνίες None αν δεν βρέθηκαν."""
+    text = page_text(html)
+    start, end = period(text)
+    return text, start, end
+
+
+def scrape(url):
+    """
+    (κείμενο σελίδας, ημερομηνίες): [έναρξη, λήξη] ως dd/mm/yyyy όταν βρεθούν
+    (από το ευρετήριο ή τη σελίδα), αλλιώς όλες οι ημερομηνίες του κειμένου.
+    """
+    if not url: return "", []
+    try:
+        r = get_client().get(url, headers=HEADERS, timeout=10)
+        text, start, end = parse(r.content)
+    except Exception:
+        return "", []
+    index = _consultations
+    c = index.get(url) if index is not None else None
+    if c and start and not c["end"]:
+        index.upsert([{"url": url, "start": start.isoformat(), "end": end.isoformat()}])
+        c = index.get(url)
+    if dates_of(c):
+        return text[:MAX_CHARS], dates_of(c)
+    if start:
+        return text[:MAX_CHARS], [start.strftime("%d/%m/%Y"), end.strftime("%d/%m/%Y")]
+    return text[:MAX_CHARS], DATE_RE.findall(text)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if len(sys.argv) < 2 or sys.argv[1] not in ("sync", "find"):
+        print('Χρήση: python -m nomoskor.opengov sync [--full] | find "τίτλος νόμου"')
+        sys.exit(1)
+    idx = get_consultations(background_sync=False)
+    if sys.argv[1] == "sync":
+        n = idx.sync(full="--full" in sys.argv)
+        print(f"{n} νέες διαβουλεύσεις · {len(idx.records)} συνολικά")
+    else:
+        for score, c in idx.match(" ".join(sys.argv[2:])):
+            print(f"{score:.2f}  {c['start'] or '?'} - {c['end'] or '?'}  {c['title']}  {c['url']}")
@@ -0,0 +1,170 @@
+"""
+Συναρμολόγηση του context με βάση προϋπολογισμό tokens.
+
+Αντί να κόβουμε τα κείμενα στους πρώτους Ν χαρακτήρες, τα χωρίζουμε σε άρθρα
+και ενότητες, βαθμολογούμε κάθε ενότητα ως προς τα κριτήρια και γεμίζουμε τον
+προϋπολογισμό με τις πιο σχετικές, με ποσοστό (quota) ανά είδος εγγράφου.
+Οι ενότητες εμφανίζονται με την αρχική τους σειρά. Οι υποψήφιες ενότητες
+κρατιούνται ως θέσεις (start, end) στο κείμενο του εγγράφου· αντίγραφο
+γίνεται μόνο για όσες μπαίνουν στο context.
+"""
+import math
+import re
+
+from nomoskor.criteria import CRITERIA
+from nomoskor.lawindex import normalize
+
+# Ποσοστό του προϋπολογισμού ανά είδος εγγράφου (ό,τι περισσέψει μοιράζεται)
+DEFAULT_QUOTAS = {"law": 0.45, "report": 0.35, "amendment": 0.15, "other": 0.05}
+
+# Μέγιστο μέγεθος ενότητας· μεγαλύτερα άρθρα σπάνε σε κομμάτια
+MAX_SECTION_CHARS = 4000
+# Κατά προσέγγιση χαρακτήρες ανά token για ελληνικό κείμενο
+CHARS_PER_TOKEN = 3.0
+
+HEADING_RE = re.compile(
+    r"(?=(?:Άρθρο|ΑΡΘΡΟ)\s+\d+|ΜΕΡΟΣ\s+[Α-ΩA-Z]{1,4}\b|ΚΕΦΑΛΑΙΟ\s+[Α-ΩA-Z]{1,4}\b"
+    r"|ΛΟΙΠΕΣ\s+(?:ΚΑΙ\s+\S+\s+)?ΔΙΑΤΑΞΕΙΣ|Λοιπές\s+διατάξεις|ΕΠΕΙΓΟΥΣΕΣ\s+ΔΙΑΤΑΞΕΙΣ"
+    r"|ΑΝΑΛΥΣΗ\s+ΣΥΝΕΠΕΙΩΝ\s+ΡΥΘΜΙΣΗΣ|ΕΚΘΕΣΗ\s+ΤΟΥ\s+ΓΕΝΙΚΟΥ\s+ΛΟΓΙΣΤΗΡΙΟΥ|ΑΙΤΙΟΛΟΓΙΚΗ\s+ΕΚΘΕΣΗ)")
+
+# Ενότητες που θέλουμε σχεδόν πάντα (ΑΣΡ, ΓΛΚ, "Λοιπές διατάξεις")
+PRIORITY_RE = re.compile(r"^(?:αναλυση συνεπειων ρυθμισης|εκθεση του γενικου λογιστηριου|λοιπες|επειγουσες)")
+
+_KEYWORD_RES = {c["id"]: re.compile("|".join(re.escape(k) for k in c["keywords"])) for c in CRITERIA}
+
+
+def doc_kind(file_type):
+    t = normalize(file_type)
+    if "τροπολογ" in t: return "amendment"
+    if "εκθεσ" in t or "αναλυσ" in t: return "report"
+    if "νομ" in t or "ψηφισθ" in t: return "law"
+    return "other"
+
+
+def estimate_tokens(text):
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+class TokenCounter:
+    """
+    Τοπική εκτίμηση tokens, προαιρετικά διορθωμένη με μία πραγματική μέτρηση
+    (π.χ. `count_tokens` του μοντέλου) πάνω σε δείγμα του κειμένου.
+    """
+
+    def __init__(self, count_fn=None):
+        self.count_fn = count_fn
+        self.ratio = 1.0
+        self.calibrated = False
+
+    def calibrate(self, sample):
+        if not self.count_fn or not sample: return
+        try:
+            real = self.count_fn(sample)
+            self.ratio = real / max(1, estimate_tokens(sample))
+            self.calibrated = True
+        except Exception:
+            pass
+
+    def __call__(self, text):
+        return math.ceil(estimate_tokens(text) * self.ratio)
+
+
+def gemini_counter(model_name):
+    """Μετρητής tokens από το API του Gemini (για το calibrate)."""
+    import google.generativeai as genai
+    model = genai.GenerativeModel(model_name)
+    return TokenCounter(lambda text: model.count_tokens(text).total_tokens)
+
+
+def section_spans(text):
+    """Οι ενότητες (άρθρα, κεφάλαια, εκθέσεις) ενός κειμένου ως (start, end)."""
+    pos = 0
+    bounds = [m.start() for m in HEADING_RE.finditer(text)] + [len(text)]
+    for end in bounds:
+        if end <= pos: continue
+        for s in range(pos, end, MAX_SECTION_CHARS):
+            e = min(end, s + MAX_SECTION_CHARS)
+            if not text[s:e].isspace(): yield s, e
+        pos = end
+
+
+def split_sections(text):
+    """Χωρίζει ένα κείμενο σε ενότητες: λίστα από (start, κείμενο)."""
+    return [(s, text[s:e]) for s, e in section_spans(text)]
+
+
+def score_section(text, criteria=None):
+    """Πυκνότητα λέξεων-κλειδιών των κριτηρίων στην ενότητα."""
+    norm = normalize(text)
+    ids = criteria or _KEYWORD_RES.keys()
+    hits = sum(min(len(_KEYWORD_RES[c].findall(norm)), 5) for c in ids)
+    score = hits / math.sqrt(max(1, len(text) / 1000))
+    if PRIORITY_RE.match(norm.lstrip()):
+        score += 10
+    return score
+
+
+def pack(docs, budget, quotas=None, criteria=None, counter=None):
+    """
+    `docs`: λίστα από dict με "type", "desc", "text" (και προαιρετικά "keep":
+    το κείμενο μπαίνει πάντα, π.χ. σήμανση OCR). Επιστρέφει (context, stats).
+    Με `criteria` (λίστα ids) η βαθμολόγηση γίνεται μόνο για αυτά τα κριτήρια.
+    """
+    quotas = quotas or DEFAULT_QUOTAS
+    counter = counter or TokenCounter()
+    if counter.count_fn and not counter.calibrated:
+        counter.calibrate(" ".join(d["text"][:4000] for d in docs if not d.get("keep"))[:20000])
+
+    headers = [f"\n--- {d['type']} ---\nΠεριγραφή: {d.get('desc', '')}\n" for d in docs]
+    used = sum(counter(h) for h, d in zip(headers, docs) if d["text"])
+    chosen = [set() for _ in docs]
+    candidates = []
+    for di, d in enumerate(docs):
+        if d.get("keep"):
+            used += counter(d["text"])
+            continue
+        kind = doc_kind(d["type"])
+        doc_text = d["text"]
+        for si, (start, end) in enumerate(section_spans(doc_text)):
+            text = doc_text[start:end]
+            # μικρό προβάδισμα στην αρχή κάθε εγγράφου (τίτλος, σκοπός)
+            score = score_section(text, criteria) + (1 if si == 0 else 0)
+            candidates.append((score, di, start, end, counter(text), kind))
+    candidates.sort(key=lambda c: -c[0])
+
+    present = {c[5] for c in candidates}
+    total_quota = sum(quotas.get(k, 0) for k in present) or 1
+    remaining = max(0, budget - used)
+    left = {k: remaining * quotas.get(k, 0) / total_quota for k in present}
+
+    picked = set()
+    # 1ο πέρασμα: ανά είδος εγγράφου, μέσα στο quota του
+    for n, (score, di, start, end, tokens, kind) in enumerate(candidates):
+        if tokens <= left[kind]:
+            left[kind] -= tokens
+            used += tokens
+            picked.add(n)
+            chosen[di].add((start, end))
+    # 2ο πέρασμα: ό,τι περίσσεψε πάει στις καλύτερες ενότητες που έμειναν
+    for n, (score, di, start, end, tokens, kind) in enumerate(candidates):
+        if n not in picked and used + tokens <= budget:
+            used += tokens
+            picked.add(n)
+            chosen[di].add((start, end))
+
+    parts = []
+    for di, d in enumerate(docs):
+        if d.get("keep"):
+            parts.append(headers[di] + d["text"] + "\n")
+            continue
+        if not chosen[di]: continue
+        body = []
+        prev_end = 0
+        for start, end in sorted(chosen[di]):
+            if start > prev_end: body.append("[...]")
+            body.append(d["text"][start:end])
+            prev_end = end
+        parts.append(headers[di] + " ".join(body) + "\n")
+
+    stats = {"tokens": used, "budget": budget, "sections": len(picked), "sections_total": len(candidates)}
+    return "".join(parts), stats
@@ -0,0 +1,131 @@
+"""
+Κλήσεις στο API της Βουλής (api.ashx), χωρίς Streamlit.
+"""
+import json
+import re
+
+from nomoskor.httpclient import get_client
+from nomoskor.pipeline import PARLIAMENT_URL
+
+API_URL = PARLIAMENT_URL + "/api.ashx"
+
+
+def clean_query(query):
+    """Καθαρισμός input (π.χ. αν δόθηκε "4940/2022" κρατάμε το "4940")."""
+    q = query.strip()
+    if "/" in q:
+        q = q.split("/")[0]
+    return q.strip()
+
+
+def query_year(query):
+    """Το έτος ενός "4940/2022" (ή "4940/22"), αλλιώς None."""
+    m = re.fullmatch(r"\s*\d+\s*/\s*(\d{4}|\d{2})\s*", query or "")
+    if not m: return None
+    year = int(m.group(1))
+    return year + 2000 if year < 100 else year
+
+
+def fetch_laws(query, timeout=30):
+    """Επιστρέφει τη λίστα `Data` του API για αριθμό ή ελεύθερο κείμενο."""
+    q = clean_query(query)
+    params = {"q": "laws", "format": "json"}
+    if q.isdigit():
+        params["lawnum"] = q
+    else:
+        params["freetext"] = q
+    r = get_client().get(API_URL, params=params, timeout=timeout)
+    r.raise_for_status()
+    data = r.json()
+    if data.get('TotalRecords', 0) > 0:
+        return data['Data']
+    return []
+
+
+def select_law(items, query):
+    """
+    Αν ψάχνουμε αριθμό, κρατάμε ΑΚΡΙΒΩΣ αυτόν τον νόμο (του έτους, αν δόθηκε
+    π.χ. "4940/2022")· αλλιώς το πρώτο.
+    """
+    if not items:
+        return None
+    q = clean_query(query)
+    if q.isdigit():
+        same = [item for item in items if str(item.get('LawNum')) == q]
+        year = query_year(query)
+        for item in same:
+            if year is None or record_year(item) == year:
+                return item
+        if same: return same[0]
+    return items[0]
+
+
+def collect_files(law):
+    """Όλα τα έγγραφα του φακέλου με σταθερή σειρά ανά τύπο."""
+    all_files = []
+
+    # 1. LawPhotocopy
+    for f in law.get("LawPhotocopy") or []:
+        all_files.append({"url": f.get("File"), "type": f.get("FileType", "Έγγραφο"), "desc": ""})
+
+    # 2. Amendments (Τροπολογίες)
+    for am in law.get("Amendments") or []:
+        desc = (am.get("Description") or "").replace('\r\n', ' ')
+        all_files.append({"url": am.get("File"), "type": "ΤΡΟΠΟΛΟΓΙΑ", "desc": desc})
+
+    # 3. VotedLaws
+    for v in law.get("VotedLaws") or []:
+        all_files.append({"url": v.get("File"), "type": "ΨΗΦΙΣΘΕΙΣ ΝΟΜΟΣ", "desc": "Τελικό Κείμενο"})
+
+    # 4. RecommReport
+    for r in law.get("RecommReport") or []:
+        all_files.append({"url": r.get("File"), "type": "ΕΚΘΕΣΗ ΕΠΙΤΡΟΠΗΣ", "desc": ""})
+
+    return all_files
+
+
+def record_year(law):
+    for k, v in law.items():
+        if "date" in k.lower() and v:
+            m = re.search(r"(19|20)\d{2}", str(v))
+            if m: return int(m.group(0))
+    return None
+
+
+def ministry_of(law):
+    """Το αρμόδιο υπουργείο, αν το record του API έχει τέτοιο πεδίο."""
+    for k, v in law.items():
+        if "ministr" in k.lower() and isinstance(v, str) and v.strip():
+            return v.strip()
+    return None
+
+
+def law_metadata(law):
+    """
+    Σύντομα στοιχεία του νόμου για το prompt: τα απλά πεδία του record (τίτλος,
+    αριθμός, ημερομηνίες, υπουργείο) και πλήθος εγγράφων ανά είδος, χωρίς τις
+    λίστες αρχείων με τα URL και τις περιγραφές των τροπολογιών.
+    """
+    meta = {k: v for k, v in law.items()
+            if isinstance(v, (str, int, float)) and str(v).strip() and not str(v).startswith(("http", "/"))}
+    counts = {}
+    for f in collect_files(law):
+        counts[f["type"]] = counts.get(f["type"], 0) + 1
+    if counts: meta["Έγγραφα"] = counts
+    return json.dumps(meta, ensure_ascii=False, separators=(",", ":"))
+
+
+def law_summary(law):
+    return {
+        "title": law.get("Title"),
+        "law_num": law.get("LawNum"),
+        "year": record_year(law),
+        "ministry": ministry_of(law),
+        "files": collect_files(law),
+    }
+
+
+def get_law(query, timeout=30):
+    """Όπως το `get_law_data_strict` του UI· σφάλματα δικτύου περνούν στον καλούντα."""
+    law = select_law(fetch_laws(query, timeout=timeout), query)
+    return law_summary(law) if law else None
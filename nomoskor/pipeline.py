@@ -0,0 +1,288 @@
+"""
+Παράλληλη λήψη και ανάγνωση όλων των PDF ενός νόμου.
+
+Οι λήψεις τρέχουν σε thread pool με τον κοινό client (nomoskor.httpclient), ενώ η
+εξαγωγή κειμένου με pypdf τρέχει σε process pool γιατί είναι CPU-bound. Τα
+σκαναρισμένα περνούν από τοπικό OCR (nomoskor.ocr) στον ίδιο process pool, αν
+είναι εγκατεστημένο.
+"""
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from io import BytesIO
+
+from pypdf import PdfReader
+
+from nomoskor import ocr as local_ocr
+from nomoskor.documents import join_pages
+from nomoskor.httpclient import get_client
+
+PARLIAMENT_URL = "https://www.hellenicparliament.gr"
+
+# Όριο ταυτόχρονων λήψεων, για να μην "πλημμυρίζουμε" το hellenicparliament.gr
+MAX_DOWNLOADS = int(os.environ.get("NOMOSKOR_MAX_DOWNLOADS", "4"))
+# Processes για την εξαγωγή κειμένου (κοινός pool της διεργασίας, βλ. get_extractor)
+MAX_EXTRACTORS = int(os.environ.get("NOMOSKOR_MAX_EXTRACTORS", str(min(4, os.cpu_count() or 1))))
+
+# Κάτω από τόσους χαρακτήρες θεωρούμε ότι το PDF είναι σκαναρισμένο (OCR)
+OCR_MIN_CHARS = 500
+
+def absolute_url(url):
+    return url if url.startswith("http") else PARLIAMENT_URL + url
+
+
+def download(url, dest, timeout=60):
+    """
+    Γράφει το PDF στο `dest` (file object) σε κομμάτια, με συνέχεια αν κοπεί.
+    Επιστρέφει (bytes που διαβάστηκαν, sha256 του περιεχομένου).
+    """
+    res = get_client().download(absolute_url(url), dest, timeout=timeout)
+    return res["bytes"], res["sha256"]
+
+
+def extract(source, max_pages=None, clean=False, char_budget=None):
+    """
+    Εξαγωγή κειμένου από ένα PDF (bytes, διαδρομή ή file object).
+
+    Σταματά μόλις συγκεντρωθούν `char_budget` χαρακτήρες, αφού τα κείμενα
+    κόβονται έτσι κι αλλιώς πριν πάνε στο μοντέλο. Επιστρέφει dict με
+    "text", "page_offsets" (θέση έναρξης κάθε σελίδας στο "text"),
+    "pages_parsed", "page_count" και τους χρόνους "seconds"/"cpu".
+    Τρέχει σε ξεχωριστό process όταν καλείται από το `iter_bundle`.
+    """
+    started, cpu = time.perf_counter(), time.process_time()
+    parts = []
+    chars = pages = page_count = 0
+    try:
+        reader = PdfReader(BytesIO(source) if isinstance(source, (bytes, bytearray)) else source)
+        page_count = len(reader.pages)
+        for i, page in enumerate(reader.pages):
+            if max_pages is not None and i >= max_pages: break
+            if char_budget is not None and chars >= char_budget: break
+            t = page.extract_text() or ""
+            if clean:
+                t = re.sub(r'\s+', ' ', t).strip()
+            parts.append(t)
+            chars += len(t)
+            pages += 1
+    except Exception:
+        pass
+    text, offsets = join_pages(parts, " " if clean else "")
+    return {"text": text, "page_offsets": offsets, "pages_parsed": pages, "page_count": page_count,
+            "seconds": time.perf_counter() - started, "cpu": time.process_time() - cpu}
+
+
+def text_variant(max_pages=None, clean=False, char_budget=None):
+    """Κλειδί της cache για τις παραμέτρους εξαγωγής."""
+    v = f"p{max_pages or 'all'}{'-clean' if clean else ''}"
+    return f"{v}-c{char_budget}" if char_budget else v
+
+
+def _download(url, variant, cache, held):
+    """
+    Επιστρέφει (sha, πηγή για εξαγωγή, κείμενο από cache ή None, bytes που κατέβηκαν).
+    Χωρίς cache το PDF γράφεται σε προσωρινό αρχείο και όχι στη μνήμη. Με cache
+    το blob κρατιέται (βλ. PdfCache.fetch) και το sha μπαίνει στο `held`.
+    """
+    if cache is not None:
+        sha, nbytes = cache.fetch(url, hold=True)
+        held.append(sha)
+        return sha, cache.blob_path(sha), cache.get_text(sha, variant), nbytes
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as f:
+        path = f.name
+        try:
+            nbytes, sha = download(url, f)
+        except Exception:
+            f.close()
+            os.remove(path)
+            raise
+    return sha, path, None, nbytes
+
+
+def _read(source):
+    if isinstance(source, (bytes, bytearray)):
+        return source
+    try:
+        with open(source, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _is_scanned(text):
+    return len(text.strip()) <= OCR_MIN_CHARS
+
+
+def _scanned_data(source, sha, cache):
+    # Με cache τα bytes μένουν στο αρχείο της (mmap) αντί για αντίγραφο στη μνήμη
+    if cache is not None and sha:
+        try:
+            return cache.map_bytes(sha)
+        except (OSError, ValueError):
+            pass
+    return _read(source)
+
+
+def _cached(text, sha, cache, variant):
+    """Το `ex` ενός κειμένου από την cache (χωρίς στατιστικά σελίδων)."""
+    return {"text": text, "page_offsets": cache.get_pages(sha, variant), "pages_parsed": 0, "page_count": 0}
+
+
+def _result(ex, source, nbytes, sha, ocr=False, timings=None, cache=None):
+    scanned = _is_scanned(ex["text"])
+    return {"text": ex["text"], "page_offsets": ex.get("page_offsets"), "scanned": scanned,
+            "data": _scanned_data(source, sha, cache) if scanned else None, "error": None,
+            "pages_parsed": ex["pages_parsed"], "page_count": ex["page_count"], "bytes_read": nbytes, "sha": sha,
+            "ocr": ocr and not scanned, "timings": timings or {}}
+
+
+def _timed(fn, *args, **kwargs):
+    """(αποτέλεσμα, δευτερόλεπτα) — για χρονομέτρηση μέσα στα worker threads."""
+    started = time.perf_counter()
+    return fn(*args, **kwargs), time.perf_counter() - started
+
+
+def cached_result(sha, cache, variant):
+    """
+    Το αποτέλεσμα ενός PDF με γνωστό sha μόνο από την cache, χωρίς δίκτυο· None
+    αν το κείμενο λείπει ή το PDF είναι σκαναρισμένο (θέλει τα bytes για OCR).
+    """
+    text = cache.get_text(sha, variant) if sha else None
+    if text is None or _is_scanned(text): return None
+    return _result(_cached(text, sha, cache, variant), None, 0, sha)
+
+
+def _cleanup(source, cache):
+    if cache is None and isinstance(source, str) and os.path.exists(source):
+        os.remove(source)
+
+
+_extractor = None
+_extractor_lock = threading.Lock()
+
+
+def get_extractor(max_workers=None):
+    """
+    Κοινός process pool για εξαγωγή και OCR, ώστε κάθε bundle να μην ξεκινά
+    δικές του διεργασίες. Το `max_workers` (αλλιώς MAX_EXTRACTORS) μετράει όταν
+    δημιουργείται ο pool· ένας pool που χάλασε (π.χ. σκοτώθηκε worker) ξαναφτιάχνεται.
+    """
+    global _extractor
+    with _extractor_lock:
+        if _extractor is None or _extractor._broken:
+            _extractor = ProcessPoolExecutor(max_workers=max_workers or MAX_EXTRACTORS)
+    return _extractor
+
+
+def iter_bundle(files, max_pages=None, clean=False, max_downloads=None, cache=None,
+                char_budget=None, ocr=True, known=None):
+    """
+    Κατεβάζει και διαβάζει παράλληλα όλα τα αρχεία (`files`: λίστα από dict με "url").
+
+    Επιστρέφει ζεύγη (index, result) με τη σειρά που ολοκληρώνονται· το index
+    είναι η θέση του αρχείου στο `files`, ώστε ο καλών να κρατά την αρχική σειρά.
+    Το result έχει "text", "page_offsets" (θέση κάθε σελίδας στο "text", None αν
+    δεν είναι γνωστές), "scanned" (πιθανό σκαναρισμένο PDF), "data" (τα bytes,
+    μόνο για τα σκαναρισμένα· με cache memoryview πάνω σε mmap), "error", "sha" (sha256 του PDF) και στατιστικά
+    ("pages_parsed", "page_count", "bytes_read", "timings" σε δευτερόλεπτα ανά φάση). Με `cache` (βλ. nomoskor.cache) ένα ήδη γνωστό
+    αρχείο δεν ξανακατεβαίνει ούτε ξαναδιαβάζεται. Με `char_budget` η ανάγνωση
+    κάθε αρχείου σταματά μόλις μαζευτούν τόσοι χαρακτήρες.
+
+    Με `ocr` (και εγκατεστημένο nomoskor.ocr) τα σκαναρισμένα διαβάζονται
+    τοπικά, σελίδα-σελίδα στον κοινό process pool της εξαγωγής (get_extractor)· τότε "ocr" είναι True
+    και "scanned" False. Αν το OCR δεν βγάλει κείμενο μένουν "scanned" όπως πριν.
+
+    `known`: dict URL -> sha από προηγούμενο έλεγχο (βλ. nomoskor.incremental)·
+    αυτά τα αρχεία διαβάζονται κατευθείαν από την cache, χωρίς καν conditional GET.
+    """
+    max_downloads = max_downloads or MAX_DOWNLOADS
+    variant = text_variant(max_pages, clean, char_budget)
+    failed = {"text": "", "page_offsets": None, "scanned": False, "data": None, "error": None,
+              "pages_parsed": 0, "page_count": 0, "bytes_read": 0, "sha": None, "ocr": False, "timings": {}}
+    ocr = ocr and local_ocr.available()
+
+    extractor = get_extractor()
+    extractions = {}
+    held = []
+    try:
+        with ThreadPoolExecutor(max_workers=max_downloads) as downloader, \
+                ThreadPoolExecutor(max_workers=2) as ocr_runner:
+            downloads = {}
+            for i, f in enumerate(files):
+                if not f.get("url"):
+                    yield i, dict(failed)
+                    continue
+                if cache is not None and known and known.get(f["url"]):
+                    r = cached_result(known[f["url"]], cache, variant)
+                    if r is not None:
+                        yield i, r
+                        continue
+                downloads[downloader.submit(_timed, _download, f["url"], variant, cache, held)] = i
+
+            ocr_jobs = {}
+            timings = {}
+            pending = set(downloads)
+
+            def start_ocr(i, sha, source, nbytes, ex):
+                # Οι σελίδες μπαίνουν στον process pool· το thread απλώς τις μαζεύει
+                job = ocr_runner.submit(_timed, local_ocr.ocr_pdf, source, sha, cache, max_pages, clean, char_budget,
+                                        executor=extractor)
+                ocr_jobs[job] = (i, sha, source, nbytes, ex)
+                pending.add(job)
+
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    if fut in downloads:
+                        i = downloads.pop(fut)
+                        try:
+                            (sha, source, text, nbytes), seconds = fut.result()
+                        except Exception as e:
+                            yield i, dict(failed, error=str(e))
+                            continue
+                        timings[i] = {"download": round(seconds, 4)}
+                        if text is not None:
+                            ex = _cached(text, sha, cache, variant)
+                            if ocr and _is_scanned(text):
+                                start_ocr(i, sha, source, nbytes, ex)
+                            else:
+                                yield i, _result(ex, source, nbytes, sha, timings=timings.pop(i), cache=cache)
+                            continue
+                        job = extractor.submit(extract, source, max_pages, clean, char_budget)
+                        extractions[job] = (i, sha, source, nbytes)
+                        pending.add(job)
+                    elif fut in extractions:
+                        i, sha, source, nbytes = extractions.pop(fut)
+                        try:
+                            ex = fut.result()
+                            timings[i].update(extract=round(ex["seconds"], 4), extract_cpu=round(ex["cpu"], 4))
+                        except Exception:
+                            ex = {"text": "", "pages_parsed": 0, "page_count": 0}
+                        if cache is not None: cache.put_text(sha, variant, ex["text"], ex.get("page_offsets"))
+                        if ocr and _is_scanned(ex["text"]):
+                            start_ocr(i, sha, source, nbytes, ex)
+                            continue
+                        result = _result(ex, source, nbytes, sha, timings=timings.pop(i), cache=cache)
+                        _cleanup(source, cache)
+                        yield i, result
+                    else:
+                        i, sha, source, nbytes, ex = ocr_jobs.pop(fut)
+                        try:
+                            ocr_ex, seconds = fut.result()
+                            timings[i]["ocr"] = round(seconds, 4)
+                        except Exception:
+                            ocr_ex = None
+                        used = ocr_ex is not None and not _is_scanned(ocr_ex["text"])
+                        result = _result(ocr_ex if used else ex, source, nbytes, sha, ocr=used, timings=timings.pop(i),
+                                         cache=cache)
+                        _cleanup(source, cache)
+                        yield i, result
+    finally:
+        # ο pool είναι κοινός: αν ο καλών σταμάτησε νωρίς, οι εξαγωγές που δεν ξεκίνησαν ακυρώνονται
+        # και περιμένουμε τις υπόλοιπες, γιατί τα blobs μένουν στην cache μόνο όσο διαβάζονται
+        for fut in extractions: fut.cancel()
+        wait(extractions)
+        for sha in held: cache.release(sha)
@@ -0,0 +1,51 @@
+"""
+Token bucket για όριο αιτημάτων ανά δευτερόλεπτο, κοινό για όλα τα threads.
+"""
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    def __init__(self, rate, burst=None):
+        """`rate`: αιτήματα/δευτερόλεπτο, `burst`: πόσα επιτρέπονται μονομιάς."""
+        self.rate = float(rate)
+        self.capacity = float(burst or max(1, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _take(self, tokens):
+        """0 αν πήρε τα tokens, αλλιώς πόσα δευτερόλεπτα να περιμένει πριν ξαναδοκιμάσει."""
+        with self._lock:
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0
+            return (tokens - self.tokens) / self.rate
+
+    def acquire(self, tokens=1):
+        """Μπλοκάρει μέχρι να υπάρχει διαθέσιμο token."""
+        while True:
+            wait = self._take(tokens)
+            if not wait: return
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens=1):
+        """Όπως το `acquire`, χωρίς να μπλοκάρει το event loop."""
+        while True:
+            wait = self._take(tokens)
+            if not wait: return
+            await asyncio.sleep(wait)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        return False
@@ -0,0 +1,118 @@
+"""
+Αποθήκη ολοκληρωμένων ελέγχων.
+
+Κάθε έλεγχος αποθηκεύεται με κλειδί το hash του αριθμού νόμου, των hashes
+των εγγράφων (ταξινομημένα), του κειμένου του prompt και του μοντέλου. Αν
+τίποτα από αυτά δεν άλλαξε, το αποτέλεσμα επιστρέφεται αμέσως χωρίς κλήση
+στο LLM.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from nomoskor.cache import CACHE_DIR
+from nomoskor.models import label
+
+DB_PATH = os.path.join(CACHE_DIR, "audits.db")
+DEFAULT_TTL = int(os.environ.get("NOMOSKOR_AUDIT_TTL", str(30 * 24 * 3600)))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS audits (key TEXT PRIMARY KEY, law_num TEXT, model TEXT, created REAL,
+                                   kind TEXT, result TEXT, manifest TEXT);
+CREATE INDEX IF NOT EXISTS audits_law ON audits (law_num);
+"""
+
+
+def audit_key(law_num, doc_hashes, prompt, model):
+    # με "cascade" το κλειδί αλλάζει αν αλλάξουν τα μοντέλα του καταρράκτη
+    h = hashlib.sha256()
+    for part in [str(law_num), *sorted(d for d in doc_hashes if d), prompt, label(model)]:
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def manifest_entry(f):
+    # το 1app_smart δίνει τα αρχεία όπως στο API (File, FileType)
+    return {"url": f.get("url") or f.get("File"), "type": f.get("type") or f.get("FileType") or "",
+            "desc": f.get("desc", ""), "sha": f.get("sha")}
+
+
+def manifest(files, results):
+    """Τα έγγραφα ενός ελέγχου με το sha τους, για τη σύγκριση στον επόμενο (nomoskor.incremental)."""
+    return [dict(manifest_entry(f), sha=r["sha"] if r else None) for f, r in zip(files, results)]
+
+
+class AuditStore:
+    def __init__(self, path=DB_PATH, ttl=DEFAULT_TTL):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self.stats = {"hit": 0, "miss": 0}
+
+    def get(self, key, ttl=None):
+        """Το αποθηκευμένο αποτέλεσμα (dict ή markdown) ή None αν λείπει/έληξε."""
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            row = self._db.execute("SELECT created, kind, result FROM audits WHERE key=?", (key,)).fetchone()
+            if not row or time.time() - row[0] > ttl:
+                self.stats["miss"] += 1
+                return None
+            self.stats["hit"] += 1
+        created, kind, result = row
+        return json.loads(result) if kind == "json" else result
+
+    def put(self, key, law_num, result, model, manifest=None):
+        kind = "text" if isinstance(result, str) else "json"
+        data = result if kind == "text" else json.dumps(result, ensure_ascii=False)
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO audits VALUES (?, ?, ?, ?, ?, ?, ?)",
+                             (key, str(law_num), model, time.time(), kind, data,
+                              json.dumps(manifest or [], ensure_ascii=False)))
+            self._db.commit()
+
+    def latest(self, law_num, kind=None):
+        """
+        Ο πιο πρόσφατος έλεγχος ενός νόμου (όποιου `kind`, αν δεν δοθεί), ως dict
+        με "key", "model", "created", "result", "manifest" ή None.
+        """
+        sql = "SELECT key, model, created, kind, result, manifest FROM audits WHERE law_num=?"
+        params = [str(law_num)]
+        if kind:
+            sql += " AND kind=?"
+            params.append(kind)
+        with self._lock:
+            row = self._db.execute(sql + " ORDER BY created DESC LIMIT 1", params).fetchone()
+        if not row: return None
+        key, model, created, kind, result, manifest = row
+        return {"key": key, "model": model, "created": created,
+                "result": json.loads(result) if kind == "json" else result, "manifest": json.loads(manifest or "[]")}
+
+    def invalidate(self, law_num=None, key=None):
+        """Διαγραφή για έναν νόμο, ένα κλειδί ή (χωρίς ορίσματα) για όλους."""
+        with self._lock:
+            if key is not None:
+                cur = self._db.execute("DELETE FROM audits WHERE key=?", (key,))
+            elif law_num is not None:
+                cur = self._db.execute("DELETE FROM audits WHERE law_num=?", (str(law_num),))
+            else:
+                cur = self._db.execute("DELETE FROM audits")
+            self._db.commit()
+        return cur.rowcount
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = AuditStore()
+    return _store
@@ -0,0 +1,297 @@
+"""
+Προκαταρκτική βαθμολόγηση με κανόνες, χωρίς μοντέλο.
+
+Όλοι οι κανόνες (φράσεις του SYSTEM_INSTRUCTIONS όπως "Λοιπές διατάξεις",
+"εντός ευλόγου χρόνου", "όπως τροποποιήθηκε με", εξουσιοδοτήσεις για
+υπουργικές αποφάσεις κ.λπ.) ενώνονται σε ένα compiled regex με named groups,
+ώστε κάθε έγγραφο να σαρώνεται μία φορά. Τα patterns γράφονται πεζά χωρίς
+τόνους και μετατρέπονται ώστε να ταιριάζουν με ή χωρίς τόνους, χωρίς να
+αλλάζει το κείμενο (τα offsets δείχνουν στο αρχικό κείμενο).
+
+Το αποτέλεσμα είναι μια προσωρινή βαθμολογία ανά κριτήριο με τα ευρήματα
+(πλήθος, θέσεις, αποσπάσματα) που το μοντέλο καλείται απλώς να επιβεβαιώσει,
+ή που εμφανίζεται μόνη της σε λειτουργία "χωρίς AI".
+"""
+import re
+import time
+from datetime import date
+
+from nomoskor.criteria import CRITERIA
+from nomoskor.documents import page_of
+
+# Πόσα ευρήματα κρατάμε ανά κανόνα (το πλήθος μετριέται πάντα ολόκληρο)
+MAX_HITS = 20
+SNIPPET = 60
+# Κριτήριο 1: ελάχιστη διάρκεια διαβούλευσης
+MIN_CONSULTATION_DAYS = 14
+# Κριτήριο 8: μέχρι τόσες εξουσιοδοτήσεις θεωρούνται "λίγες"
+FEW_DELEGATIONS = 5
+# Κριτήριο 10: αοριστίες/παραπομπές ανά 10.000 χαρακτήρες
+VAGUE_OK, VAGUE_MAX = 1.0, 3.0
+
+RULES = [
+    {"id": "delegation", "criterion": "8", "label": "Εξουσιοδότηση για κανονιστική πράξη",
+     "pattern": r"με (κοινη )?αποφαση (του|των) (αρμοδιου )?υπουργ\w*|υπουργικ\w* αποφασ\w*"
+                r"|με προεδρικο διαταγμα|εξουσιοδοτειται"},
+    {"id": "rider", "criterion": "3", "label": "Λοιπές / επείγουσες διατάξεις",
+     "pattern": r"(λοιπες επειγουσες|λοιπες|επειγουσες|ασχετες) (διαταξεις|ρυθμισεις)"},
+    {"id": "amendment", "criterion": "3", "label": "Τροπολογία", "pattern": r"τροπολογι\w*"},
+    {"id": "vague", "criterion": "10", "label": "Αόριστη διατύπωση",
+     "pattern": r"εντος ευλογου (χρονου|προθεσμιας)|κατα την κριση (του|της|των)"
+                r"|οπου (κριθει|απαιτειται) αναγκαιο|κατα περιπτωση"},
+    {"id": "jargon", "criterion": "10", "label": "Ξύλινη γλώσσα",
+     "pattern": r"εξορθολογισμ\w*|βελτιστ\w* πρακτικ\w*"},
+    {"id": "reference_chain", "criterion": "10", "label": "Αλυσίδα παραπομπών",
+     "pattern": r"οπως (τροποποιηθηκε|αντικατασταθηκε|συμπληρωθηκε|ισχυει)"},
+    {"id": "transposition", "criterion": "4", "label": "Ενσωμάτωση ενωσιακού δικαίου",
+     "pattern": r"ενσωματωση (στην ελληνικη νομοθεσια )?(της|των) οδηγι\w*|(οδηγι|κανονισμ)\w* \(εε\)"},
+    {"id": "islands", "criterion": "5", "label": "Νησιωτικότητα / ορεινές περιοχές",
+     "pattern": r"νησιωτικοτητ\w*|νησιωτικ\w* περιοχ\w*|ορειν\w* (περιοχ|ογκ)\w*"},
+    {"id": "amount", "criterion": "6", "label": "Ποσό σε ευρώ",
+     "pattern": r"\d{1,3}(\.\d{3})*(,\d+)?\s*(ευρω|€)"},
+    {"id": "glk", "criterion": "6", "label": "Έκθεση Γενικού Λογιστηρίου", "pattern": r"γενικου λογιστηριου"},
+    {"id": "simplification", "criterion": "7", "label": "Απλούστευση / διοικητικό βάρος",
+     "pattern": r"απλουστευσ\w*|διοικητικ\w* (βαρ|επιβαρυνσ)\w*|καταργειται η υποχρεωση"},
+    {"id": "implementation", "criterion": "9", "label": "Μηχανισμός εφαρμογής",
+     "pattern": r"χρονοδιαγραμμα\w*|ηλεκτρονικ\w* πλατφορμ\w*|παρακολουθηση της εφαρμογης"},
+    {"id": "consultation_report", "criterion": "1", "label": "Έκθεση διαβούλευσης",
+     "pattern": r"εκθεση (επι της|της) (δημοσιας )?διαβουλευσης"},
+    {"id": "consultation", "criterion": "1", "label": "Αναφορά σε διαβούλευση",
+     "pattern": r"διαβουλευσ\w*|opengov"},
+]
+
+RULES_BY_ID = {r["id"]: r for r in RULES}
+
+_ACCENTS = {"α": "αά", "ε": "εέ", "η": "ηή", "ι": "ιίϊΐ", "ο": "οό", "υ": "υύϋΰ", "ω": "ωώ"}
+
+
+def _fold(pattern):
+    """Κάθε φωνήεν ταιριάζει με ή χωρίς τόνο, κάθε κενό με οποιοδήποτε whitespace."""
+    out = []
+    escaped = False
+    for ch in pattern:
+        if escaped:
+            out.append(ch)
+            escaped = False
+        elif ch == "\\":
+            out.append(ch)
+            escaped = True
+        elif ch in _ACCENTS:
+            out.append(f"[{_ACCENTS[ch]}]")
+        elif ch == " ":
+            out.append(r"\s+")
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+# Ένα regex για όλους τους κανόνες· m.lastgroup λέει ποιος ταίριαξε
+SCANNER = re.compile("|".join(f"(?P<{r['id']}>{_fold(r['pattern'])})" for r in RULES), re.IGNORECASE)
+
+
+def scan(docs):
+    """
+    Σαρώνει όλα τα έγγραφα (`docs` όπως στο packer: dict με "text") μία φορά.
+    Επιστρέφει {rule_id: {"count", "docs": {index: πλήθος}, "hits": [...]}} όπου
+    κάθε hit είναι {"doc", "offset", "page", "match", "snippet"}· "page" (από 1)
+    μόνο αν το έγγραφο έχει "page_offsets" (βλ. nomoskor.documents).
+    """
+    evidence = {r["id"]: {"count": 0, "docs": {}, "hits": []} for r in RULES}
+    for i, doc in enumerate(docs):
+        text = doc.get("text") or ""
+        offsets = doc.get("page_offsets")
+        for m in SCANNER.finditer(text):
+            ev = evidence[m.lastgroup]
+            ev["count"] += 1
+            ev["docs"][i] = ev["docs"].get(i, 0) + 1
+            if len(ev["hits"]) < MAX_HITS:
+                start, end = m.span()
+                snippet = re.sub(r"\s+", " ", text[max(0, start - SNIPPET):end + SNIPPET]).strip()
+                ev["hits"].append({"doc": i, "offset": start, "page": page_of(offsets, start), "match": m.group(0),
+                                   "snippet": snippet})
+    return evidence
+
+
+# --- Διάρκεια διαβούλευσης ---
+
+DATE_RE = re.compile(r"\b(\d{1,2})[./-](\d{1,2})[./-](\d{2,4})\b")
+RANGE_RE = re.compile(_fold(r"απο") + r"\s+(?:\w+\s+)?(\d{1,2}[./-]\d{1,2}[./-]\d{2,4})" +
+                      r"(?:\s+\S+)*?\s+" + _fold(r"(εως|μεχρι)") + r"\s+(?:\w+\s+)?(\d{1,2}[./-]\d{1,2}[./-]\d{2,4})",
+                      re.IGNORECASE)
+
+
+def parse_date(s):
+    m = DATE_RE.search(s or "")
+    if not m: return None
+    d, mo, y = (int(g) for g in m.groups())
+    if y < 100: y += 2000
+    try:
+        return date(y, mo, d)
+    except ValueError:
+        return None
+
+
+def consultation_days(dates=(), text=""):
+    """
+    Διάρκεια της διαβούλευσης σε ημέρες: από φράση "από ... έως ..." στο κείμενο
+    του Opengov αν υπάρχει, αλλιώς από την πρώτη ως την τελευταία ημερομηνία
+    (`dates` όπως τις επιστρέφει το scrape_opengov). None αν δεν βγαίνει.
+    """
+    m = RANGE_RE.search(text or "")
+    if m:
+        a, b = parse_date(m.group(1)), parse_date(m.group(3))
+        if a and b and b >= a:
+            return (b - a).days
+    parsed = sorted({d for d in map(parse_date, dates) if d and 2000 <= d.year <= 2100})
+    if len(parsed) < 2: return None
+    return (parsed[-1] - parsed[0]).days
+
+
+# --- Βαθμολόγηση ---
+
+def _count(evidence, *ids):
+    return sum(evidence[i]["count"] for i in ids)
+
+
+def _score_1(ev, chars, days):
+    if days is not None:
+        if days >= MIN_CONSULTATION_DAYS:
+            return 1.0, f"Διαβούλευση {days} ημερών (≥ {MIN_CONSULTATION_DAYS})."
+        return 0.5, f"Διαβούλευση μόνο {days} ημερών (< {MIN_CONSULTATION_DAYS})."
+    if _count(ev, "consultation_report"):
+        return 0.5, "Αναφέρεται έκθεση διαβούλευσης, χωρίς ημερομηνίες."
+    if _count(ev, "consultation"):
+        return 0.5, f"{_count(ev, 'consultation')} αναφορές σε διαβούλευση, χωρίς ημερομηνίες."
+    return 0.0, "Δεν βρέθηκαν ενδείξεις διαβούλευσης."
+
+
+def _score_3(ev, chars, days):
+    riders, amendments = _count(ev, "rider"), _count(ev, "amendment")
+    if riders:
+        return 0.0, f"{riders} αναφορές σε λοιπές/επείγουσες διατάξεις."
+    if amendments:
+        return 0.5, f"{amendments} αναφορές σε τροπολογίες."
+    return 1.0, "Δεν βρέθηκαν λοιπές διατάξεις ή τροπολογίες."
+
+
+def _score_5(ev, chars, days):
+    n = _count(ev, "islands")
+    return (1.0, f"{n} αναφορές σε νησιά/ορεινές περιοχές.") if n else (0.0, "Καμία αναφορά σε νησιωτικότητα.")
+
+
+def _score_6(ev, chars, days):
+    amounts, glk = _count(ev, "amount"), _count(ev, "glk")
+    if glk and amounts >= 3:
+        return 1.0, f"Έκθεση ΓΛΚ και {amounts} ποσά σε ευρώ."
+    if glk or amounts:
+        return 0.5, f"{'Έκθεση ΓΛΚ, ' if glk else ''}{amounts} ποσά σε ευρώ."
+    return 0.0, "Δεν βρέθηκαν ποσοτικά στοιχεία κόστους."
+
+
+def _score_8(ev, chars, days):
+    n = _count(ev, "delegation")
+    if n == 0:
+        return 1.0, "Καμία εξουσιοδότηση για υπουργική απόφαση ή π.δ."
+    if n <= FEW_DELEGATIONS:
+        return 0.5, f"{n} εξουσιοδοτήσεις για κανονιστικές πράξεις."
+    return 0.0, f"{n} εξουσιοδοτήσεις για κανονιστικές πράξεις (\"λευκή επιταγή\")."
+
+
+def _score_9(ev, chars, days):
+    n = _count(ev, "implementation")
+    return (1.0, f"{n} αναφορές σε χρονοδιαγράμματα/πλατφόρμες.") if n else (0.0, "Δεν βρέθηκαν μηχανισμοί εφαρμογής.")
+
+
+def _score_10(ev, chars, days):
+    n = _count(ev, "vague", "jargon", "reference_chain")
+    density = n * 10000 / max(chars, 1)
+    detail = (f"{_count(ev, 'vague')} αοριστίες, {_count(ev, 'jargon')} όροι ξύλινης γλώσσας, "
+              f"{_count(ev, 'reference_chain')} αλυσίδες παραπομπών ({density:.1f} ανά 10.000 χαρακτήρες).")
+    if density < VAGUE_OK: return 1.0, detail
+    if density < VAGUE_MAX: return 0.5, detail
+    return 0.0, detail
+
+
+SCORERS = {"1": _score_1, "3": _score_3, "5": _score_5, "6": _score_6, "8": _score_8, "9": _score_9,
+           "10": _score_10}
+
+SCORE_TEXT = {1.0: "ΝΑΙ", 0.5: "ΜΕΡΙΚΩΣ", 0.0: "ΟΧΙ"}
+
+
+def _confidence(cid, ev, days):
+    """
+    Πόσο βέβαιη είναι η βαθμολογία του κανόνα (0-1). Ψηλά (≥ models.RULES_ACCEPT,
+    άρα χωρίς μοντέλο) μόνο όταν ο κανόνας μετρά όλο το κριτήριο: πάρα πολλές
+    εξουσιοδοτήσεις ("Μέτρα τες"). Η διάρκεια της διαβούλευσης είναι μόνο μέρος
+    του κριτηρίου 1 (λείπει η έκθεση ευρημάτων) και οι "λοιπές διατάξεις"
+    εμφανίζονται και στα περιεχόμενα/επικεφαλίδες, άρα εκεί κρίνει το μοντέλο.
+    Η απουσία ευρημάτων δεν αποδεικνύει τίποτα.
+    """
+    if cid == "1":
+        return 0.7 if days is not None else 0.4
+    if cid == "8" and _count(ev, "delegation") > 2 * FEW_DELEGATIONS:
+        return 0.9
+    hits = sum(_count(ev, r["id"]) for r in RULES if r["criterion"] == cid)
+    return 0.5 if hits else 0.3
+
+
+def prescore(docs, dates=(), opengov_text=""):
+    """
+    Προσωρινή βαθμολογία και ευρήματα για όλα τα κριτήρια, σε χιλιοστά του
+    δευτερολέπτου. Τα κριτήρια χωρίς κανόνα βαθμολόγησης (2, 4, 7) έχουν
+    score_val None και μόνο τα ευρήματά τους. Το "confidence" κάθε κριτηρίου
+    (βλ. `_confidence`) κρίνει αν ο καταρράκτης του nomoskor.models χρειάζεται
+    καθόλου μοντέλο για αυτό. Επιστρέφει
+    {"criteria": [...], "consultation_days", "elapsed_ms"}.
+    """
+    started = time.perf_counter()
+    evidence = scan(docs)
+    chars = sum(len(d.get("text") or "") for d in docs)
+    days = consultation_days(dates, opengov_text)
+
+    criteria = []
+    for c in CRITERIA:
+        ev = {r["id"]: evidence[r["id"]] for r in RULES if r["criterion"] == c["id"]}
+        item = {"id": c["id"], "title": c["title"], "provisional": True, "evidence": ev}
+        if c["id"] in SCORERS:
+            val, reason = SCORERS[c["id"]](evidence, chars, days)
+            item.update(score_val=val, score_text=SCORE_TEXT[val], reason=reason,
+                        confidence=_confidence(c["id"], evidence, days))
+        else:
+            found = ", ".join(f"{RULES_BY_ID[k]['label']}: {v['count']}" for k, v in ev.items())
+            item.update(score_val=None, score_text="—", reason=found or "Χρειάζεται αξιολόγηση.", confidence=0.0)
+        criteria.append(item)
+
+    return {"criteria": criteria, "consultation_days": days,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+
+def hints(card, max_snippets=3):
+    """dict id κριτηρίου -> κείμενο με τα ευρήματα, για το `extra` του παράλληλου ελέγχου."""
+    out = {}
+    for c in card["criteria"]:
+        lines = [f"ΠΡΟΚΑΤΑΡΚΤΙΚΟΣ ΕΛΕΓΧΟΣ ΜΕ ΚΑΝΟΝΕΣ (επιβεβαίωσε ή διόρθωσε): "
+                 f"{c['score_text']} ({c['score_val']}) - {c['reason']}"]
+        for rule_id, ev in c["evidence"].items():
+            for h in ev["hits"][:max_snippets]:
+                lines.append(f"- {RULES_BY_ID[rule_id]['label']}: \"{h['snippet']}\"")
+        out[c["id"]] = "\n".join(lines)
+    return out
+
+
+def summary_text(card):
+    """Μία γραμμή ανά κριτήριο, για τα prompts του ελέγχου με ένα αίτημα."""
+    return "\n".join(f"{c['id']}. {c['title']}: {c['score_text']} - {c['reason']}" for c in card["criteria"])
+
+
+def to_markdown(card):
+    """Η προσωρινή βαθμολογία ως αναφορά markdown (λειτουργία χωρίς AI)."""
+    lines = [f"## Προκαταρκτική βαθμολογία (κανόνες, {card['elapsed_ms']} ms)"]
+    for c in card["criteria"]:
+        lines.append(f"**{c['id']}. {c['title']}** — {c['score_text']}\n\n{c['reason']}\n")
+        for rule_id, ev in c["evidence"].items():
+            for h in ev["hits"][:2]:
+                page = f" (σελ. {h['page']})" if h.get("page") else ""
+                lines.append(f"> {RULES_BY_ID[rule_id]['label']}{page}: …{h['snippet']}…\n")
+    return "\n".join(lines)
+
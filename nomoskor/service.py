@@ -0,0 +1,129 @@
+"""
+Ο πλήρης έλεγχος ενός νόμου χωρίς UI: φάκελος από τη Βουλή, λήψη/ανάγνωση
+PDF, συναρμολόγηση context και βαθμολόγηση με το Gemini.
+"""
+import time
+
+from nomoskor import models
+from nomoskor.analytics import record_audit
+from nomoskor.audit import AUDIT_PROMPT, DEFAULT_MODEL, run_audit
+from nomoskor.cache import get_cache
+from nomoskor.criteria import total_score
+from nomoskor.documents import Document
+from nomoskor.lawindex import get_index
+from nomoskor.opengov import dates_of, get_consultations
+from nomoskor.packer import doc_kind, pack
+from nomoskor.parliament import law_metadata, law_summary
+from nomoskor.pipeline import iter_bundle
+from nomoskor.results import audit_key, get_store, manifest
+from nomoskor.rules import prescore, summary_text
+from nomoskor.trace import Trace, record_documents, span
+
+DOC_CHAR_BUDGET = 200000
+TOKEN_BUDGET = 22000
+LAW_SHARE = 0.55
+
+
+def acquire_limit(limits, name):
+    """Ένα token από το όριο `name` του dict `limits` (βλ. audit_law), αν υπάρχει."""
+    if limits and limits.get(name):
+        limits[name].acquire()
+
+
+def llm_limit(limits):
+    """Το όριο του Gemini για το nomoskor.models.rate_limited: ένα token ανά κλήση στο μοντέλο."""
+    return models.rate_limited(limits.get("gemini") if limits else None)
+
+
+def audit_law(query, token_budget=TOKEN_BUDGET, model_name=DEFAULT_MODEL, limits=None, force=False,
+              rules_only=False):
+    """
+    Επιστρέφει μια εγγραφή (dict) με τη βαθμολογία και τα κριτήρια του νόμου.
+    `limits`: dict με TokenBucket για "parliament" και "gemini" (ανά αίτημα· ένας
+    έλεγχος στον καταρράκτη κάνει πολλά). Με `rules_only` η
+    βαθμολογία είναι η προσωρινή του nomoskor.rules, χωρίς κλήση στο Gemini.
+    Τα σκαναρισμένα PDF διαβάζονται με τοπικό OCR αν είναι διαθέσιμο ("ocr_local")·
+    δεν στέλνονται στο Gemini, όσα μένουν μετριούνται στο "ocr_skipped".
+    Στο "stages" ο χρόνος (s) κάθε σταδίου· το πλήρες trace γράφεται στο
+    nomoskor.trace.TRACE_FILE. Οι επιτυχημένοι έλεγχοι καταγράφονται και στο
+    nomoskor.analytics.
+    """
+    trace = Trace("service", query=str(query)).start()
+    try:
+        record = _audit_law(query, token_budget, model_name, limits, force, rules_only)
+    finally:
+        data = trace.finish()
+    record["stages"] = {name: s["wall"] for name, s in trace.summary().items() if name != "document"}
+    if data["tokens"]: record["tokens"] = data["tokens"]
+    if record["status"] == "ok":
+        record_audit(record, "service", model=None if record.get("provisional") else model_name,
+                     stages=record["stages"], tokens=data["tokens"])
+    return record
+
+
+def _audit_law(query, token_budget, model_name, limits, force, rules_only):
+    started = time.time()
+    record = {"query": str(query), "status": "error"}
+
+    with span("parliament_api"):
+        acquire_limit(limits, "parliament")
+        law = get_index().find(str(query))
+    if not law:
+        return dict(record, status="not_found", elapsed=round(time.time() - started, 2))
+    summary = law_summary(law)
+    record.update(law_num=summary["law_num"], title=summary["title"], year=summary["year"],
+                  ministry=summary["ministry"], files=len(summary["files"]))
+
+    law_docs, report_docs, doc_hashes = [], [], []
+    pages = nbytes = scanned = local = 0
+    results = [None] * len(summary["files"])
+    with span("documents"):
+        for i, r in iter_bundle(summary["files"], cache=get_cache(), char_budget=DOC_CHAR_BUDGET):
+            results[i] = r
+    record_documents(results, summary["files"])
+    for f, r in zip(summary["files"], results):
+        doc_hashes.append(r["sha"])
+        pages += r["pages_parsed"]
+        nbytes += r["bytes_read"]
+        local += r["ocr"]
+        if r["scanned"]:
+            scanned += 1
+        elif r["text"]:
+            doc = Document.from_result(f, r)
+            (law_docs if doc_kind(f["type"]) == "law" else report_docs).append(doc)
+    record.update(pages=pages, bytes=nbytes, ocr_skipped=scanned, ocr_local=local)
+
+    if not law_docs and not report_docs:
+        return dict(record, error="Δεν βρέθηκαν αναγνώσιμα PDF.", elapsed=round(time.time() - started, 2))
+
+    # Διάρκεια διαβούλευσης από το τοπικό ευρετήριο του Opengov (χωρίς δίκτυο)
+    consultation = get_consultations(background_sync=False).best(summary["title"] or "", summary["year"])
+    dates = dates_of(consultation)
+    if consultation:
+        record["opengov"] = consultation["url"]
+        record["ministry"] = record["ministry"] or consultation["ministry"]
+    with span("rules"):
+        card = prescore(law_docs + report_docs, dates)
+    if rules_only:
+        criteria = card["criteria"]
+        return dict(record, status="ok", score=total_score(criteria), criteria=criteria, provisional=True,
+                    summary="", elapsed=round(time.time() - started, 2))
+
+    key = audit_key(summary["law_num"], doc_hashes, AUDIT_PROMPT + f"|{token_budget}", model_name)
+    store = get_store()
+    res = None if force else store.get(key)
+    record["from_store"] = res is not None
+    if res is None:
+        with span("pack"):
+            law_text, _ = pack(law_docs, int(token_budget * LAW_SHARE))
+            reports_text, _ = pack(report_docs, int(token_budget * (1 - LAW_SHARE)))
+        with span("llm"), llm_limit(limits):
+            res = run_audit(law_text, reports_text, law_metadata(law), model_name=model_name,
+                            hints=summary_text(card))
+        if "error" in res:
+            return dict(record, error=res["error"], elapsed=round(time.time() - started, 2))
+        store.put(key, summary["law_num"], res, model_name, manifest=manifest(summary["files"], results))
+
+    criteria = res.get("criteria", [])
+    return dict(record, status="ok", score=total_score(criteria), criteria=criteria,
+                summary=res.get("summary", ""), elapsed=round(time.time() - started, 2))
@@ -0,0 +1,149 @@
+"""
+Ανάγνωση του JSON του μοντέλου ενώ ακόμα γράφεται (streaming) και τοπική
+διόρθωση χαλασμένου JSON, ώστε να μη χρειάζεται δεύτερη κλήση στο μοντέλο.
+
+    parser = CriteriaParser()
+    for chunk in response:
+        for c in parser.feed(chunk.text):   # κάθε κριτήριο μόλις κλείσει το {...}
+            ...
+    res = parser.finish()
+"""
+import json
+import re
+
+CRITERIA_RE = re.compile(r'"criteria"\s*:\s*\[')
+SUMMARY_RE = re.compile(r'"summary"\s*:\s*"((?:[^"\\]|\\.)*)', re.S)
+
+
+def strip_fences(txt):
+    """Αφαιρεί τα ``` του markdown."""
+    txt = txt.strip()
+    if txt.startswith("```json"): txt = txt[7:]
+    if txt.startswith("```"): txt = txt[3:]
+    if txt.endswith("```"): txt = txt[:-3]
+    return txt.strip()
+
+
+def repair_json(txt):
+    """
+    Διορθώνει τα συνηθισμένα λάθη του μοντέλου: κείμενο πριν/μετά το JSON,
+    κόμματα πριν από } ή ], κομμένη απάντηση (ανοιχτά strings και αγκύλες).
+    """
+    txt = strip_fences(txt)
+    start = min((i for i in (txt.find("{"), txt.find("[")) if i >= 0), default=-1)
+    if start < 0: return txt
+    out = []
+    stack = []
+    in_str = escaped = False
+    for ch in txt[start:]:
+        if in_str:
+            out.append(ch)
+            if escaped: escaped = False
+            elif ch == "\\": escaped = True
+            elif ch == '"': in_str = False
+            continue
+        if ch == '"':
+            in_str = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]":
+            _drop_trailing_comma(out)
+            if not stack: break
+            stack.pop()
+            out.append(ch)
+            if not stack: break
+            continue
+        out.append(ch)
+
+    if in_str:
+        if escaped: out.pop()
+        out.append('"')
+    _drop_trailing_comma(out)
+    tail = "".join(out).rstrip()
+    if tail.endswith(":"): tail += " null"
+    return tail + "".join(reversed(stack))
+
+
+def _drop_trailing_comma(out):
+    while out and out[-1].isspace(): out.pop()
+    if out and out[-1] == ",": out.pop()
+
+
+def loads(txt):
+    """json.loads που δέχεται ```, control χαρακτήρες σε strings και επισκευάζει ό,τι χρειάζεται."""
+    txt = strip_fences(txt)
+    try:
+        return json.loads(txt, strict=False)
+    except ValueError:
+        return json.loads(repair_json(txt), strict=False)
+
+
+class CriteriaParser:
+    """Διαβάζει σταδιακά το {"criteria": [...], "summary": ...} του ελέγχου."""
+
+    def __init__(self):
+        self.buf = ""
+        self.items = []
+        self._pos = None        # θέση μέσα στον πίνακα "criteria"
+        self._depth = 0
+        self._obj_start = None
+        self._in_str = self._escaped = False
+        self._closed = False
+
+    def feed(self, text):
+        """Προσθέτει ένα κομμάτι και επιστρέφει τα κριτήρια που ολοκληρώθηκαν."""
+        self.buf += text or ""
+        if self._closed: return []
+        if self._pos is None:
+            m = CRITERIA_RE.search(self.buf)
+            if not m: return []
+            self._pos = m.end()
+
+        done = []
+        buf = self.buf
+        i = self._pos
+        while i < len(buf):
+            ch = buf[i]
+            if self._in_str:
+                if self._escaped: self._escaped = False
+                elif ch == "\\": self._escaped = True
+                elif ch == '"': self._in_str = False
+            elif ch == '"':
+                self._in_str = True
+            elif ch == "{":
+                if self._depth == 0: self._obj_start = i
+                self._depth += 1
+            elif ch == "}" and self._depth:
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        item = loads(buf[self._obj_start:i + 1])
+                    except ValueError:
+                        item = None
+                    if isinstance(item, dict):
+                        self.items.append(item)
+                        done.append(item)
+            elif ch == "]" and self._depth == 0:
+                self._closed = True
+                i += 1
+                break
+            i += 1
+        self._pos = i
+        return done
+
+    def finish(self):
+        """Το πλήρες αποτέλεσμα· αν το JSON δεν διορθώνεται, ό,τι κριτήρια πρόλαβαν να κλείσουν."""
+        try:
+            res = loads(self.buf)
+            if isinstance(res, dict) and res.get("criteria"):
+                return res
+        except ValueError:
+            pass
+        if not self.items:
+            return {"error": f"Μη αναγνώσιμη απάντηση: {self.buf[:200]}"}
+        m = SUMMARY_RE.search(self.buf)
+        try:
+            summary = json.loads(f'"{m.group(1)}"', strict=False) if m else ""
+        except ValueError:
+            summary = m.group(1)
+        return {"criteria": list(self.items), "summary": summary}
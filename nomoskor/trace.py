@@ -0,0 +1,272 @@
+"""
+Χρονομέτρηση των σταδίων ενός ελέγχου (spans) και αναφορά απόδοσης.
+
+    tr = Trace("testapp", query="4940").start()
+    with span("parliament_api"):
+        ...
+    with span("pack") as attrs:
+        attrs["tokens"] = ...
+    tr.finish()          # γράφει μία γραμμή JSON στο TRACE_FILE
+
+Κάθε span κρατά wall και CPU χρόνο (του thread) και ό,τι μεγέθη δώσει ο
+καλών (bytes, pages, chars, tokens). Τα `span()`/`record_usage()` δουλεύουν
+στο "τρέχον" trace (contextvar), ώστε τα modules να μη χρειάζεται να το
+παίρνουν ως παράμετρο· χωρίς ενεργό trace δεν κάνουν τίποτα. Στο τέλος κάθε
+span μετριέται και η μνήμη (RSS) της διεργασίας· το trace κρατά την αρχική και
+τη μέγιστη τιμή ("rss").
+
+Από τη γραμμή εντολών, για p50/p95 ανά στάδιο από όλα τα αποθηκευμένα traces:
+
+    python -m nomoskor.trace report
+    python -m nomoskor.trace metrics      # OpenMetrics
+"""
+import argparse
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+
+from nomoskor.cache import CACHE_DIR
+
+TRACE_FILE = os.environ.get("NOMOSKOR_TRACE_FILE", os.path.join(CACHE_DIR, "traces.jsonl"))
+SIZES = ("bytes", "pages", "chars", "tokens")
+
+_current = contextvars.ContextVar("nomoskor_trace", default=None)
+
+try:
+    PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    PAGE_SIZE = 4096
+
+
+def rss():
+    """Η τρέχουσα μνήμη (RSS) της διεργασίας σε bytes· αν δεν μετριέται, η μέγιστη μέχρι τώρα."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return max_rss()
+
+
+def max_rss():
+    """Η μέγιστη μνήμη της διεργασίας από την εκκίνησή της (0 στα Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Trace:
+    def __init__(self, name, **attrs):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.attrs = attrs
+        self.started = time.time()
+        self.spans = []
+        self.tokens = defaultdict(int)
+        self.llm_calls = 0
+        self.rss_start = self.rss_peak = rss()
+        self._t0 = time.perf_counter()
+        self._token = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Κάνει αυτό το trace "τρέχον" για το thread (και τα asyncio tasks του)."""
+        self._token = _current.set(self)
+        return self
+
+    @contextmanager
+    def span(self, name, **attrs):
+        t, c = time.perf_counter(), time.thread_time()
+        try:
+            yield attrs
+        finally:
+            self.add(name, time.perf_counter() - t, time.thread_time() - c, offset=t - self._t0, **attrs)
+
+    def add(self, name, wall, cpu=None, offset=None, **attrs):
+        """Span που χρονομετρήθηκε αλλού (π.χ. σε worker process)."""
+        rec = {"name": name, "wall": round(wall, 4), "cpu": None if cpu is None else round(cpu, 4),
+               "offset": round(offset if offset is not None else time.perf_counter() - self._t0 - wall, 4)}
+        rec.update({k: v for k, v in attrs.items() if v is not None})
+        now = rss()
+        with self._lock:
+            self.spans.append(rec)
+            self.rss_peak = max(self.rss_peak, now)
+
+    def record_usage(self, usage):
+        """Tokens από το usage_metadata μιας απάντησης του Gemini."""
+        with self._lock:
+            self.llm_calls += 1
+            self.tokens["prompt"] += getattr(usage, "prompt_token_count", 0) or 0
+            self.tokens["output"] += getattr(usage, "candidates_token_count", 0) or 0
+            self.tokens["total"] += getattr(usage, "total_token_count", 0) or 0
+
+    def summary(self):
+        """{στάδιο: {"count", "wall", "cpu", bytes/pages/chars/tokens}}"""
+        out = {}
+        with self._lock:
+            spans = list(self.spans)
+        for s in spans:
+            agg = out.setdefault(s["name"], {"count": 0, "wall": 0.0, "cpu": 0.0})
+            agg["count"] += 1
+            agg["wall"] = round(agg["wall"] + s["wall"], 4)
+            agg["cpu"] = round(agg["cpu"] + (s["cpu"] or 0), 4)
+            for k in SIZES:
+                if isinstance(s.get(k), (int, float)):
+                    agg[k] = agg.get(k, 0) + s[k]
+        return out
+
+    def to_dict(self):
+        with self._lock:
+            return {"id": self.id, "name": self.name, "attrs": self.attrs, "started": self.started,
+                    "wall": round(time.perf_counter() - self._t0, 4), "spans": list(self.spans),
+                    "tokens": dict(self.tokens), "llm_calls": self.llm_calls,
+                    "rss": {"start": self.rss_start, "peak": max(self.rss_peak, rss()), "max": max_rss()}}
+
+    def finish(self, path=TRACE_FILE):
+        """Επαναφέρει το προηγούμενο τρέχον trace και γράφει μία γραμμή JSON."""
+        if self._token is not None:
+            try:
+                _current.reset(self._token)
+            except ValueError:
+                _current.set(None)  # άλλο context (π.χ. άλλο thread)
+            self._token = None
+        data = self.to_dict()
+        if path:
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(data, ensure_ascii=False) + "\n")
+            except OSError:
+                pass
+        return data
+
+
+def current():
+    return _current.get()
+
+
+@contextmanager
+def span(name, **attrs):
+    """Span στο τρέχον trace (ή τίποτα, αν δεν υπάρχει)."""
+    tr = _current.get()
+    if tr is None:
+        yield attrs
+        return
+    with tr.span(name, **attrs) as a:
+        yield a
+
+
+def record_usage(response):
+    """Καταγράφει το usage_metadata της απάντησης (ή του τελευταίου chunk σε streaming)."""
+    tr = _current.get()
+    usage = getattr(response, "usage_metadata", None)
+    if tr is not None and usage is not None:
+        tr.record_usage(usage)
+
+
+def record_documents(results, files=()):
+    """Ένα span "document" ανά αποτέλεσμα του pipeline.iter_bundle, με τους χρόνους του."""
+    tr = _current.get()
+    if tr is None: return
+    files = list(files) or [{}] * len(results)
+    for f, r in zip(files, results):
+        if r is None: continue
+        t = r.get("timings") or {}
+        tr.add("document", sum(v for k, v in t.items() if not k.endswith("_cpu")), t.get("extract_cpu"),
+               type=f.get("type"), bytes=r["bytes_read"], pages=r["pages_parsed"], chars=len(r["text"]),
+               download=t.get("download"), extract=t.get("extract"), ocr=t.get("ocr"),
+               scanned=r["scanned"] or None, error=r["error"])
+
+
+# --- Αναφορές από το TRACE_FILE ---
+
+def load(path=TRACE_FILE, last=None):
+    if not os.path.exists(path): return []
+    with open(path, encoding="utf-8") as f:
+        rows = []
+        for line in f:
+            try:
+                rows.append(json.loads(line))
+            except ValueError:
+                continue
+    return rows[-last:] if last else rows
+
+
+def quantile(values, q):
+    if not values: return 0.0
+    values = sorted(values)
+    i = (len(values) - 1) * q
+    lo, hi = int(i), min(int(i) + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (i - lo)
+
+
+def stage_stats(traces):
+    """{στάδιο: {"count", "p50", "p95", "sum"}} από τα wall times όλων των spans."""
+    walls = defaultdict(list)
+    for t in traces:
+        walls["total"].append(t.get("wall", 0))
+        for s in t.get("spans", []):
+            walls[s["name"]].append(s["wall"])
+    return {name: {"count": len(v), "p50": round(quantile(v, 0.5), 4), "p95": round(quantile(v, 0.95), 4),
+                   "sum": round(sum(v), 4)} for name, v in walls.items()}
+
+
+def openmetrics(traces):
+    """Κείμενο σε μορφή OpenMetrics (summary ανά στάδιο + tokens του μοντέλου)."""
+    lines = ["# TYPE nomoskor_stage_seconds summary",
+             "# HELP nomoskor_stage_seconds Wall time per audit stage."]
+    for name, s in sorted(stage_stats(traces).items()):
+        for q in ("0.5", "0.95"):
+            value = s["p50"] if q == "0.5" else s["p95"]
+            lines.append(f'nomoskor_stage_seconds{{stage="{name}",quantile="{q}"}} {value}')
+        lines.append(f'nomoskor_stage_seconds_sum{{stage="{name}"}} {s["sum"]}')
+        lines.append(f'nomoskor_stage_seconds_count{{stage="{name}"}} {s["count"]}')
+    tokens = defaultdict(int)
+    for t in traces:
+        for k, v in (t.get("tokens") or {}).items():
+            tokens[k] += v
+    peaks = [t["rss"]["peak"] for t in traces if t.get("rss")]
+    if peaks:
+        lines.append("# TYPE nomoskor_trace_rss_peak_bytes summary")
+        lines.append("# HELP nomoskor_trace_rss_peak_bytes Peak process RSS seen during an audit.")
+        for q in (0.5, 0.95):
+            lines.append(f'nomoskor_trace_rss_peak_bytes{{quantile="{q}"}} {round(quantile(peaks, q))}')
+        lines.append(f"nomoskor_trace_rss_peak_bytes_count {len(peaks)}")
+    lines.append("# TYPE nomoskor_llm_tokens counter")
+    for k, v in sorted(tokens.items()):
+        lines.append(f'nomoskor_llm_tokens_total{{kind="{k}"}} {v}')
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m nomoskor.trace")
+    parser.add_argument("command", choices=["report", "metrics"])
+    parser.add_argument("--file", default=TRACE_FILE)
+    parser.add_argument("--last", type=int, help="μόνο τα τελευταία N traces")
+    args = parser.parse_args(argv)
+
+    traces = load(args.file, args.last)
+    if args.command == "metrics":
+        sys.stdout.write(openmetrics(traces))
+        return 0
+    print(f"{len(traces)} traces")
+    peaks = [t["rss"]["peak"] for t in traces if t.get("rss")]
+    if peaks:
+        print(f"μνήμη (peak RSS): p50 {quantile(peaks, 0.5) / 2**20:.0f} MB · p95 {quantile(peaks, 0.95) / 2**20:.0f} MB")
+    print(f"{'στάδιο':<20}{'πλήθος':>8}{'p50 (s)':>10}{'p95 (s)':>10}")
+    for name, s in sorted(stage_stats(traces).items(), key=lambda kv: -kv[1]["sum"]):
+        print(f"{name:<20}{s['count']:>8}{s['p50']:>10.3f}{s['p95']:>10.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""
+Ανέβασμα σκαναρισμένων PDF στο Gemini (OCR) στο background.
+
+Κάθε upload ξεκινά μόλις εντοπιστεί σκαναρισμένο PDF, ώστε να τρέχει όσο
+διαβάζονται τα υπόλοιπα έγγραφα. Η αναμονή μέχρι το αρχείο να γίνει ACTIVE
+γίνεται επίσης στο background, με exponential backoff· ο καλών περιμένει μόνο
+στο τέλος, με συνολικό timeout. Τα αρχεία που έχουν ήδη ανέβει ξαναχρησιμοποιούνται
+με βάση το sha256 του περιεχομένου (το Gemini τα κρατά 48 ώρες).
+"""
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from nomoskor.cache import CACHE_DIR
+
+DB_PATH = os.path.join(CACHE_DIR, "uploads.db")
+MAX_UPLOADS = 3
+# Συνολικός χρόνος αναμονής για OCR
+OCR_TIMEOUT = 300
+# Τα αρχεία του Gemini λήγουν στις 48 ώρες· τα ξαναχρησιμοποιούμε λίγο λιγότερο
+REUSE_FOR = 46 * 3600
+
+
+class OcrFailed(Exception):
+    pass
+
+
+class UploadRegistry:
+    """sha256 -> όνομα αρχείου στο Gemini."""
+
+    def __init__(self, path=DB_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS uploads (sha TEXT PRIMARY KEY, name TEXT, uploaded REAL)")
+
+    def get(self, sha):
+        with self._lock:
+            row = self._db.execute("SELECT name, uploaded FROM uploads WHERE sha=?", (sha,)).fetchone()
+        if row and time.time() - row[1] < REUSE_FOR:
+            return row[0]
+        return None
+
+    def put(self, sha, name):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO uploads VALUES (?, ?, ?)", (sha, name, time.time()))
+            self._db.commit()
+
+    def forget(self, sha):
+        with self._lock:
+            self._db.execute("DELETE FROM uploads WHERE sha=?", (sha,))
+            self._db.commit()
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = UploadRegistry()
+    return _registry
+
+
+def upload(data, sha=None):
+    """Ανεβάζει το PDF (ή επιστρέφει το ήδη ανεβασμένο) χωρίς να περιμένει OCR."""
+    import google.generativeai as genai
+
+    sha = sha or hashlib.sha256(data).hexdigest()
+    registry = get_registry()
+    name = registry.get(sha)
+    if name:
+        try:
+            f = genai.get_file(name)
+            if f.state.name != "FAILED":
+                return f
+        except Exception:
+            pass
+        registry.forget(sha)
+
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
+        tmp.write(data)
+        tmp_path = tmp.name
+    try:
+        f = genai.upload_file(tmp_path, mime_type="application/pdf", display_name=sha[:16])
+    finally:
+        os.remove(tmp_path)
+    registry.put(sha, f.name)
+    return f
+
+
+def wait_active(f, deadline, first_delay=1.0, max_delay=15.0):
+    """Περιμένει (με exponential backoff) μέχρι το αρχείο να γίνει ACTIVE."""
+    import google.generativeai as genai
+
+    delay = first_delay
+    while f.state.name != "ACTIVE":
+        if f.state.name == "FAILED":
+            raise OcrFailed(f"OCR failed: {f.name}")
+        if time.time() + delay > deadline:
+            raise TimeoutError(f"OCR timeout: {f.name}")
+        time.sleep(delay)
+        delay = min(max_delay, delay * 2)
+        f = genai.get_file(f.name)
+    return f
+
+
+class OcrUploader:
+    """
+    uploader = OcrUploader()
+    uploader.submit(data, sha)        # μόλις βρεθεί σκαναρισμένο PDF
+    files, errors = uploader.wait()   # πριν την κλήση στο μοντέλο
+    """
+
+    def __init__(self, max_workers=MAX_UPLOADS, timeout=OCR_TIMEOUT):
+        self.timeout = timeout
+        self.deadline = None
+        self._pool = ThreadPoolExecutor(max_workers=max_workers)
+        self._futures = {}
+
+    def submit(self, data, sha=None):
+        sha = sha or hashlib.sha256(data).hexdigest()
+        if sha not in self._futures:
+            if self.deadline is None:
+                self.deadline = time.time() + self.timeout
+            self._futures[sha] = self._pool.submit(self._run, data, sha)
+        return self._futures[sha]
+
+    def _run(self, data, sha):
+        return wait_active(upload(data, sha), self.deadline)
+
+    def __len__(self):
+        return len(self._futures)
+
+    def wait(self):
+        """Επιστρέφει (αρχεία έτοιμα για το μοντέλο, λίστα σφαλμάτων) με τη σειρά υποβολής."""
+        futures = list(self._futures.values())
+        if futures:
+            wait(futures, timeout=max(0, self.deadline - time.time()) + 5)
+        files, errors = [], []
+        for fut in futures:
+            if not fut.done():
+                errors.append("OCR timeout")
+            elif fut.exception():
+                errors.append(str(fut.exception()))
+            else:
+                files.append(fut.result())
+        self.cancel()
+        return files, errors
+
+    def cancel(self):
+        """Ακυρώνει ό,τι δεν έχει ξεκινήσει· όσα τρέχουν ολοκληρώνονται στο background."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,90 @@
+"""
+Ανάλυση όλων των αποθηκευμένων ελέγχων (nomoskor.analytics): τάση ανά
+υπουργείο και έτος, κατανομή ανά κριτήριο, χειρότεροι νόμοι.
+"""
+import altair as alt
+import streamlit as st
+
+from nomoskor.analytics import available, get_analytics
+
+st.set_page_config(page_title="Ανάλυση ελέγχων", page_icon="📊", layout="wide")
+
+
+# Τα συγκεντρωτικά ξαναϋπολογίζονται μόνο όταν αλλάξει η αποθήκη (νέος έλεγχος)
+@st.cache_data(show_spinner=False, max_entries=64)
+def load_aggregates(version, provisional, years, ministries):
+    return get_analytics().aggregates(provisional=provisional, years=years, ministries=ministries)
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def load_facets(version):
+    return get_analytics().facets()
+
+
+st.title("📊 Ανάλυση ελέγχων")
+if not available():
+    st.warning("Η ανάλυση χρειάζεται το pyarrow (pip install -r requirements.txt).")
+    st.stop()
+version = get_analytics().version()
+years_span, all_ministries = load_facets(version)
+if not all_ministries:
+    st.info("Δεν υπάρχουν ακόμα αποθηκευμένοι έλεγχοι.")
+    st.stop()
+
+with st.sidebar:
+    st.header("Φίλτρα")
+    provisional = st.toggle("Με προσωρινές βαθμολογίες (κανόνες)", value=True)
+    years = None
+    if years_span and years_span[0] < years_span[1]:
+        years = st.slider("Έτη", years_span[0], years_span[1], years_span)
+    ministries = st.multiselect("Υπουργεία", all_ministries)
+
+agg = load_aggregates(version, provisional, tuple(years) if years else None, tuple(ministries))
+kpis = agg['kpis']
+if not kpis['laws']:
+    st.info("Κανένας έλεγχος με αυτά τα φίλτρα.")
+    st.stop()
+
+c1, c2, c3, c4 = st.columns(4)
+c1.metric("Νόμοι", kpis['laws'])
+c2.metric("Μέση βαθμολογία", f"{kpis['score']:.1f}/100")
+c3.metric("Προσωρινές", f"{kpis['provisional']:.0%}")
+c4.metric("Υπουργεία", kpis['ministries'])
+
+st.subheader("Τάση ανά έτος")
+by_year = agg['by_year']
+if not by_year.empty:
+    band = alt.Chart(by_year).mark_area(opacity=0.2).encode(x='year:O', y='p25:Q', y2='p75:Q')
+    line = alt.Chart(by_year).mark_line(point=True).encode(
+        x=alt.X('year:O', title="Έτος"), y=alt.Y('score:Q', title="Βαθμολογία", scale=alt.Scale(domain=[0, 100])),
+        tooltip=['year', 'laws', alt.Tooltip('score', format=".1f")])
+    st.altair_chart(band + line, use_container_width=True)
+
+trend = agg['trend']
+if not trend.empty and trend['ministry'].nunique() > 1:
+    st.subheader("Ανά υπουργείο")
+    st.altair_chart(alt.Chart(trend).mark_line(point=True).encode(
+        x=alt.X('year:O', title="Έτος"), y=alt.Y('score:Q', title="Βαθμολογία"), color=alt.Color('ministry:N', title="Υπουργείο"),
+        tooltip=['ministry', 'year', 'laws', alt.Tooltip('score', format=".1f")]), use_container_width=True)
+
+st.subheader("Κριτήρια")
+c1, c2 = st.columns(2)
+with c1:
+    st.caption("Μέσο ποσοστό των πόντων κάθε κριτηρίου")
+    st.altair_chart(alt.Chart(agg['criteria']).mark_bar().encode(
+        x=alt.X('share:Q', title="Ποσοστό", axis=alt.Axis(format="%"), scale=alt.Scale(domain=[0, 1])),
+        y=alt.Y('title:N', title=None, sort=None), color=alt.value("#2e7d32"),
+        tooltip=['criterion', 'title', 'weight', alt.Tooltip('points', format=".2f")]), use_container_width=True)
+with c2:
+    st.caption("Κατανομή βαθμών (? = χωρίς βαθμό)")
+    st.altair_chart(alt.Chart(agg['distribution']).mark_bar().encode(
+        x=alt.X('sum(laws):Q', title="Νόμοι", stack="normalize"), y=alt.Y('title:N', title=None, sort=None),
+        color=alt.Color('score_val:N', title="Βαθμός"), tooltip=['title', 'score_val', 'laws']),
+        use_container_width=True)
+
+st.subheader("Χειρότεροι νόμοι")
+st.dataframe(agg['worst'], hide_index=True, use_container_width=True)
+
+if not agg['stages'].empty:
+    with st.expander("⏱️ Χρόνοι σταδίων (s)"):
+        st.dataframe(agg['stages'], hide_index=True)
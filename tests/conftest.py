@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Οι δοκιμές τρέχουν και με σκέτο `pytest`, χωρίς εγκατάσταση του πακέτου
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,101 @@
+import hashlib
+import itertools
+import os
+import time
+
+import pytest
+import requests
+
+from nomoskor.cache import PdfCache
+from nomoskor.httpclient import set_client
+
+URL = "https://www.hellenicparliament.gr/UserFiles/a.pdf"
+
+
+class FakeClient:
+    """Ο `download` του HttpClient πάνω σε dict URL -> bytes."""
+
+    def __init__(self, files):
+        self.files = files
+        self.requests = []
+
+    def download(self, url, dest, headers=None, timeout=60):
+        self.requests.append((url, headers))
+        if url not in self.files: raise requests.ConnectionError(url)
+        if headers and headers.get("If-None-Match") == "v1":
+            return {"status": 304, "bytes": 0, "sha256": None, "headers": {}}
+        body = self.files[url]
+        dest.write(body)
+        return {"status": 200, "bytes": len(body), "sha256": hashlib.sha256(body).hexdigest(),
+                "headers": {"ETag": "v1"}}
+
+
+@pytest.fixture
+def client():
+    c = FakeClient({URL: b"%PDF a", URL.replace("a.pdf", "b.pdf"): b"%PDF bb"})
+    previous = set_client(c)
+    yield c
+    set_client(previous)
+
+
+def test_fetch_downloads_once(tmp_path, client):
+    cache = PdfCache(root=str(tmp_path))
+    sha, n = cache.fetch(URL)
+    assert n == 6
+    assert cache.get_bytes(sha) == b"%PDF a"
+    assert cache.fetch(URL) == (sha, 0)
+    assert len(client.requests) == 1
+
+
+def test_revalidation_keeps_unchanged_blob(tmp_path, client):
+    cache = PdfCache(root=str(tmp_path), revalidate_after=0)
+    sha, _ = cache.fetch(URL)
+    assert cache.fetch(URL) == (sha, 0)
+    assert client.requests[-1][1] == {"If-None-Match": "v1"}
+    assert cache.stats["revalidated"] == 1
+
+
+def test_failed_revalidation_serves_cached_copy(tmp_path, client):
+    cache = PdfCache(root=str(tmp_path), revalidate_after=0)
+    sha, _ = cache.fetch(URL)
+    del client.files[URL]
+    assert cache.fetch(URL) == (sha, 0)
+    assert cache.stats["stale"] == 1
+    with pytest.raises(requests.ConnectionError):
+        cache.fetch(URL.replace("a.pdf", "missing.pdf"))
+
+
+def test_lru_evicts_least_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setattr(time, "time", itertools.count(1).__next__)
+    cache = PdfCache(root=str(tmp_path), max_bytes=10)
+    cache.put_text("a" * 64, "p1", "12345")
+    cache.put_text("b" * 64, "p1", "67890")
+    assert cache.get_text("a" * 64, "p1") == "12345"
+    cache.put_text("c" * 64, "p1", "abcde")
+    assert cache.get_text("b" * 64, "p1") is None
+    assert cache.get_text("a" * 64, "p1") == "12345"
+    assert cache.size() <= 10
+
+
+def test_eviction_skips_held_blobs(tmp_path, client):
+    cache = PdfCache(root=str(tmp_path), max_bytes=1)
+    held, _ = cache.fetch(URL, hold=True)
+    other, _ = cache.fetch(URL.replace("a.pdf", "b.pdf"))
+    assert os.path.exists(cache.blob_path(held))
+    assert not os.path.exists(cache.blob_path(other))
+    cache.release(held)
+    cache.put_text("d" * 64, "p1", "x")
+    assert not os.path.exists(cache.blob_path(held))
+
+
+def test_failed_fetch_releases_hold(tmp_path, client, monkeypatch):
+    cache = PdfCache(root=str(tmp_path), revalidate_after=0)
+    cache.fetch(URL)
+
+    def broken(*args, **kwargs):
+        raise OSError("δίσκος γεμάτος")
+
+    monkeypatch.setattr(cache, "_store", broken)
+    with pytest.raises(OSError):
+        cache.fetch(URL, hold=True)
+    assert not cache._in_use
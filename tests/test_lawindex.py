@@ -0,0 +1,28 @@
+from nomoskor.lawindex import LawIndex
+from nomoskor.parliament import query_year, select_law
+
+OLD = {"Id": "a", "LawNum": "4940", "Title": "Παλιός νόμος", "Date": "2011-05-02"}
+NEW = {"Id": "b", "LawNum": "4940", "Title": "Νέος νόμος", "Date": "2022-06-09"}
+
+
+def test_query_year():
+    assert query_year("4940/2022") == 2022
+    assert query_year(" 4940 / 22 ") == 2022
+    assert query_year("4940") is None
+    assert query_year("νόμος για την ενέργεια/2022") is None
+
+
+def test_select_law_honours_the_year():
+    assert select_law([OLD, NEW], "4940/2022") is NEW
+    assert select_law([NEW, OLD], "4940/2011") is OLD
+    assert select_law([OLD, NEW], "4940/1999") is OLD
+    assert select_law([OLD, NEW], "4940") is OLD
+
+
+def test_find_by_number_and_year_uses_the_local_index(tmp_path):
+    index = LawIndex(path=str(tmp_path / "laws.db"))
+    index.upsert([OLD, NEW])
+    assert [law["Id"] for law in index.by_number("4940")] == ["b", "a"]
+    assert index.find("4940/2011")["Id"] == "a"
+    assert index.find("4940/2022")["Id"] == "b"
+    assert index.find("4940")["Id"] == "b"
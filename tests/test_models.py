@@ -0,0 +1,167 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from nomoskor import models
+from nomoskor.models import CircuitBreaker, MockModel, ModelUnavailable, Slots
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = Clock()
+    monkeypatch.setattr(models.time, "monotonic", c)
+    return c
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    b = CircuitBreaker(failures=2, cooldown=10)
+    b.record(False)
+    b.record(True)
+    b.record(False)
+    assert b.state == "closed"
+    b.record(False)
+    assert b.state == "open"
+    assert not b.allow()
+    assert not b.available()
+
+
+def test_breaker_half_open_lets_one_probe_through(clock):
+    b = CircuitBreaker(failures=1, cooldown=10)
+    b.record(False)
+    clock.now += 10
+    assert b.state == "half_open"
+    assert b.allow()
+    assert not b.allow()
+    b.record(True)
+    assert b.state == "closed"
+
+
+def test_breaker_failed_probe_reopens(clock):
+    b = CircuitBreaker(failures=3, cooldown=10)
+    for _ in range(3): b.record(False)
+    clock.now += 10
+    assert b.allow()
+    b.record(False)
+    assert b.state == "open"
+
+
+def test_slow_calls_count_as_failures(clock):
+    b = CircuitBreaker(failures=1, cooldown=10, slow_after=5)
+    b.record(True, seconds=4)
+    assert b.state == "closed"
+    b.record(True, seconds=6)
+    assert b.state == "open"
+
+
+def test_plan_and_label():
+    assert models.plan("models/gemini-2.0-flash") == [["models/gemini-2.0-flash", "models/gemini-2.0-flash-exp"]]
+    assert models.plan("mock:a") == [["mock:a"]]
+    tiers = models.plan(models.CASCADE_NAME)
+    assert [n for t in tiers for n in t] == sorted(models.CASCADE, key=lambda n: models.spec(n)["tier"])
+    assert models.label("mock:a") == "mock:a"
+    assert models.label(models.CASCADE_NAME).startswith(models.CASCADE_NAME + ":")
+
+
+def test_chain_skips_small_contexts_and_open_breakers():
+    small, big, broken = "mock:chain-small?context=100", "mock:chain-big?tier=1", "mock:chain-broken?tier=1"
+    for _ in range(models.BREAKER_FAILURES): models.health(broken).breaker.record(False)
+    tiers = [[small], [broken, big]]
+    assert models.chain(tiers, 50) == [small, big]
+    assert models.chain(tiers, 500) == [big]
+
+
+def test_confidence():
+    assert models.confidence({"confidence": "0.7"}) == 0.7
+    assert models.confidence({}) == 0.5
+    assert models.confidence(None, default=0.1) == 0.1
+    assert models.confident({"confidence": models.ESCALATE_BELOW})
+
+
+def test_slots_limit_threads():
+    slots = Slots(2)
+    running = peak = 0
+    lock = threading.Lock()
+
+    def work():
+        nonlocal running, peak
+        slots.acquire()
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.01)
+        with lock:
+            running -= 1
+        slots.release()
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert peak == 2
+    assert slots.free == 2
+
+
+def test_slots_cancelled_waiter_gives_back_nothing():
+    async def main():
+        slots = Slots(1)
+        await slots.acquire_async()
+        waiter = asyncio.ensure_future(slots.acquire_async())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        slots.release()
+        return slots
+
+    slots = asyncio.run(main())
+    assert slots.free == 1
+    assert not slots._waiters
+
+
+def test_mock_model_answers_every_criterion():
+    prompt = "ΚΡΙΤΗΡΙΑ (απάντησε σε JSON):\n1. Διαβούλευση\n2. Χρόνος Ακρόασης\n"
+    res = json.loads(MockModel("mock:t", confidence=0.4).generate_content(prompt).text)
+    assert [c["id"] for c in res["criteria"]] == ["1", "2"]
+    assert all(c["confidence"] == 0.4 for c in res["criteria"])
+    # ντετερμινιστικό ανά prompt
+    assert MockModel("mock:t").respond(prompt) == MockModel("mock:t").respond(prompt)
+
+
+def test_mock_options_from_name():
+    assert models.spec("mock:x?context=10&concurrency=1")["context"] == 10
+    assert models.get_model("mock:x?latency=0&confidence=0.3").confidence == 0.3
+
+
+def test_stream_charges_the_rate_limit_and_closes_the_slot():
+    class Bucket:
+        taken = 0
+
+        def acquire(self, tokens=1):
+            self.taken += tokens
+
+    bucket = Bucket()
+    name = "mock:stream?chunk_chars=5"
+    with models.rate_limited(bucket):
+        text = "".join(c.text for c in models.stream(name, "ΚΡΙΤΗΡΙΟ 1. Διαβούλευση"))
+    assert json.loads(text)["id"] == "1"
+    assert bucket.taken == 1
+    status = models.health(name).status()
+    assert status["in_flight"] == 0
+    assert status["errors"] == 0
+
+
+def test_open_breaker_refuses_calls():
+    name = "mock:refused"
+    for _ in range(models.BREAKER_FAILURES): models.health(name).breaker.record(False)
+    with pytest.raises(ModelUnavailable):
+        list(models.stream(name, "x"))
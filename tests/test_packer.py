@@ -0,0 +1,67 @@
+from nomoskor.packer import (MAX_SECTION_CHARS, TokenCounter, doc_kind, estimate_tokens, pack, section_spans,
+                             split_sections)
+
+FILLER = "Γενικές ρυθμίσεις για την οργάνωση των υπηρεσιών. " * 40
+
+
+def law(n):
+    return "".join(f"Άρθρο {i}\n{FILLER}\n" for i in range(1, n + 1))
+
+
+def test_doc_kind():
+    assert doc_kind("Ψηφισθέν νομοσχέδιο") == "law"
+    assert doc_kind("Ανάλυση Συνεπειών Ρύθμισης") == "report"
+    assert doc_kind("Τροπολογία") == "amendment"
+    assert doc_kind("Πρακτικά") == "other"
+
+
+def test_sections_follow_headings_and_cover_the_text():
+    text = law(3)
+    spans = list(section_spans(text))
+    assert len(spans) == 3
+    assert all(text[s:].startswith("Άρθρο") for s, _ in spans)
+    assert "".join(t for _, t in split_sections(text)) == text
+
+
+def test_long_sections_are_split():
+    text = "Άρθρο 1\n" + "α" * (2 * MAX_SECTION_CHARS + 10)
+    assert all(e - s <= MAX_SECTION_CHARS for s, e in section_spans(text))
+    assert len(list(section_spans(text))) == 3
+
+
+def test_pack_stays_within_budget():
+    docs = [{"type": "Νομοσχέδιο", "desc": "", "text": law(30)},
+            {"type": "Ανάλυση Συνεπειών Ρύθμισης", "desc": "", "text": law(20)}]
+    context, stats = pack(docs, budget=3000)
+    assert stats["tokens"] <= 3000
+    assert 0 < stats["sections"] < stats["sections_total"]
+
+
+def test_pack_prefers_sections_relevant_to_the_criteria():
+    text = law(10) + "Άρθρο 11\nΔιαβούλευση στο opengov με 300 σχόλια για τη διαβούλευση.\n"
+    docs = [{"type": "Νομοσχέδιο", "desc": "", "text": text}]
+    budget = estimate_tokens(FILLER) + 200
+    context, _ = pack(docs, budget=budget, criteria=["1"])
+    assert "opengov" in context
+    # τα άρθρα που έμειναν έξω σημειώνονται
+    assert "[...]" in context
+
+
+def test_pack_keeps_marked_documents_whole():
+    note = "[Σκαναρισμένο PDF: διαβάστηκε με OCR]"
+    docs = [{"type": "Νομοσχέδιο", "desc": "", "text": law(20)},
+            {"type": "Έκθεση", "desc": "", "text": note, "keep": True}]
+    context, stats = pack(docs, budget=500)
+    assert note in context
+    assert stats["tokens"] <= 500
+
+
+def test_token_counter_calibration():
+    counter = TokenCounter(lambda text: 2 * estimate_tokens(text))
+    counter.calibrate("δείγμα κειμένου " * 10)
+    assert counter.calibrated
+    assert counter("α" * 300) == 200
+    broken = TokenCounter(lambda text: 1 / 0)
+    broken.calibrate("δείγμα")
+    assert not broken.calibrated
+    assert broken("α" * 300) == 100
@@ -0,0 +1,81 @@
+from datetime import date
+
+from nomoskor import models
+from nomoskor.rules import FEW_DELEGATIONS, consultation_days, parse_date, prescore, scan
+
+
+def by_id(card):
+    return {c["id"]: c for c in card["criteria"]}
+
+
+def test_scan_matches_with_and_without_accents():
+    ev = scan([{"text": "Λοιπές διατάξεις. ΛΟΙΠΕΣ ΔΙΑΤΑΞΕΙΣ. λοιπες   διαταξεις."}])
+    assert ev["rider"]["count"] == 3
+    assert ev["rider"]["docs"] == {0: 3}
+
+
+def test_scan_offsets_point_into_original_text():
+    text = "Άρθρο 1\nΜε απόφαση του Υπουργού ορίζονται τα σχετικά."
+    hit = scan([{"text": text}])["delegation"]["hits"][0]
+    assert text[hit["offset"]:].startswith(hit["match"])
+    assert hit["page"] is None
+
+
+def test_scan_reports_page_when_offsets_known():
+    text = "πρώτη σελίδα\nεντός ευλόγου χρόνου"
+    hit = scan([{"text": text, "page_offsets": [0, 13]}])["vague"]["hits"][0]
+    assert hit["page"] == 2
+
+
+def test_parse_date():
+    assert parse_date("12/03/2024") == date(2024, 3, 12)
+    assert parse_date("1.2.24") == date(2024, 2, 1)
+    assert parse_date("31/02/2024") is None
+    assert parse_date("") is None
+
+
+def test_consultation_days_from_range_phrase():
+    assert consultation_days(text="Η διαβούλευση θα διαρκέσει από 01/03/2024 έως 15/03/2024.") == 14
+
+
+def test_consultation_days_from_dates():
+    assert consultation_days(["10/01/2024", "01/01/2024", "05/01/2024"]) == 9
+    assert consultation_days(["10/01/2024"]) is None
+    assert consultation_days() is None
+
+
+def test_prescore_covers_every_criterion():
+    card = prescore([{"text": "Κείμενο χωρίς ευρήματα."}])
+    items = by_id(card)
+    assert len(items) == 10
+    # χωρίς κανόνα βαθμολόγησης
+    for cid in ("2", "4", "7"):
+        assert items[cid]["score_val"] is None
+        assert items[cid]["confidence"] == 0.0
+    assert items["8"]["score_val"] == 1.0
+
+
+def test_prescore_consultation_duration():
+    short = by_id(prescore([], dates=["01/03/2024", "08/03/2024"]))["1"]
+    long = by_id(prescore([], dates=["01/03/2024", "20/03/2024"]))["1"]
+    assert short["score_val"] == 0.5
+    assert long["score_val"] == 1.0
+    # η διάρκεια δεν αρκεί για όλο το κριτήριο 1 (λείπει η έκθεση)
+    assert long["confidence"] < models.RULES_ACCEPT
+
+
+def test_only_many_delegations_skip_the_model():
+    def card(n):
+        return by_id(prescore([{"text": "Με απόφαση του Υπουργού ορίζεται. " * n}]))["8"]
+
+    few, many = card(FEW_DELEGATIONS), card(2 * FEW_DELEGATIONS + 1)
+    assert few["score_val"] == 0.5
+    assert few["confidence"] < models.RULES_ACCEPT
+    assert many["score_val"] == 0.0
+    assert many["confidence"] >= models.RULES_ACCEPT
+
+
+def test_riders_are_left_to_the_model():
+    item = by_id(prescore([{"text": "ΜΕΡΟΣ Δ΄ ΛΟΙΠΕΣ ΔΙΑΤΑΞΕΙΣ " * 5}]))["3"]
+    assert item["score_val"] == 0.0
+    assert item["confidence"] < models.RULES_ACCEPT
@@ -0,0 +1,58 @@
+import json
+
+from nomoskor.streaming import CriteriaParser, loads, repair_json, strip_fences
+
+RESPONSE = json.dumps({
+    "criteria": [
+        {"id": "1", "score_val": 1, "reason": "Διαβούλευση 20 ημερών {με αγκύλες}."},
+        {"id": "2", "score_val": 0.5, "reason": "Με \"εισαγωγικά\" και ] μέσα."},
+    ],
+    "summary": "Συνολικό πόρισμα.",
+}, ensure_ascii=False)
+
+
+def test_strip_fences():
+    assert strip_fences('```json\n{"a": 1}\n```') == '{"a": 1}'
+    assert strip_fences('```\n[1]\n```') == "[1]"
+
+
+def test_repair_json_trailing_commas_and_surrounding_text():
+    assert json.loads(repair_json('Ορίστε: {"a": [1, 2,], "b": 3,} τέλος')) == {"a": [1, 2], "b": 3}
+
+
+def test_repair_json_truncated_response():
+    assert json.loads(repair_json('{"criteria": [{"id": "1", "reason": "κομμέν')) == \
+        {"criteria": [{"id": "1", "reason": "κομμέν"}]}
+    assert json.loads(repair_json('{"a": {"b":')) == {"a": {"b": None}}
+
+
+def test_loads_accepts_control_characters():
+    assert loads('```json\n{"reason": "γραμμή 1\nγραμμή 2"}\n```') == {"reason": "γραμμή 1\nγραμμή 2"}
+
+
+def test_parser_yields_each_criterion_once_as_it_closes():
+    parser = CriteriaParser()
+    seen = []
+    for i in range(0, len(RESPONSE), 7):
+        seen.extend(parser.feed(RESPONSE[i:i + 7]))
+    assert [c["id"] for c in seen] == ["1", "2"]
+    assert parser.finish() == json.loads(RESPONSE)
+
+
+def test_parser_ignores_text_before_criteria():
+    parser = CriteriaParser()
+    assert parser.feed('```json\n{"note": "{όχι κριτήριο}", ') == []
+    assert [c["id"] for c in parser.feed('"criteria": [{"id": "3"}]}')] == ["3"]
+
+
+def test_finish_keeps_closed_criteria_of_a_broken_response():
+    parser = CriteriaParser()
+    cut = RESPONSE.index('{"id": "2"')
+    parser.feed(RESPONSE[:cut] + 'χαλασμένο} ], "summary": "Σύνοψη')
+    assert parser.finish() == {"criteria": json.loads(RESPONSE)["criteria"][:1], "summary": "Σύνοψη"}
+
+
+def test_finish_reports_unreadable_response():
+    parser = CriteriaParser()
+    parser.feed("Δεν μπορώ να απαντήσω.")
+    assert "error" in parser.finish()